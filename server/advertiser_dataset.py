@@ -0,0 +1,106 @@
+"""
+Advertiser Response Dataset Accessor
+Projected, predicate-pushdown reads of resp.parquet via pyarrow.dataset
+
+resp.parquet is wide (one zip_* and network_* column per zip/network), so
+callers ask for the columns they need and filter on adomain; row groups whose
+statistics can't match the filter are skipped instead of decoded.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESP_PATH = Path(__file__).parent / "data" / "real_data" / "resp.parquet"
+
+# Per-advertiser summary columns shared by the preferences DB and vector DB
+SUMMARY_COLUMNS = ['adomain', 'total_packets', 'avg_cpm', 'median_cpm', 'max_cpm', 'min_cpm']
+
+
+class AdvertiserResponseDataset:
+    """Column-projected, filterable view over resp.parquet"""
+
+    def __init__(self, parquet_path: Union[str, Path] = None):
+        """
+        Open the dataset (reads only the footer/schema)
+
+        Args:
+            parquet_path: Path to resp.parquet (defaults to data/real_data/resp.parquet)
+        """
+        self.path = Path(parquet_path) if parquet_path is not None else DEFAULT_RESP_PATH
+        self.dataset = ds.dataset(str(self.path), format='parquet')
+        self.column_names: List[str] = self.dataset.schema.names
+        self.zip_columns = [col for col in self.column_names if col.startswith('zip_')]
+        self.network_columns = [col for col in self.column_names if col.startswith('network_')]
+
+    def count_rows(self) -> int:
+        """Row count from parquet metadata"""
+        return self.dataset.count_rows()
+
+    def read(self,
+             columns: Optional[List[str]] = None,
+             adomains: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Read a projection of the dataset
+
+        Args:
+            columns: Columns to materialise (None reads all - avoid on the hot path)
+            adomains: Only rows for these advertiser domains (pushed down to row groups)
+        """
+        filter_expr = None
+        if adomains is not None:
+            filter_expr = ds.field('adomain').isin(list(adomains))
+        return self.dataset.to_table(columns=columns, filter=filter_expr).to_pandas()
+
+    def get_advertiser_rows(self, adomain: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """All rows for one advertiser domain, without loading the rest of the file"""
+        return self.dataset.to_table(columns=columns, filter=ds.field('adomain') == adomain).to_pandas()
+
+    def aggregate_by_advertiser(self, aggregations: Dict[str, str]) -> pd.DataFrame:
+        """
+        Group by adomain reading only the aggregated columns
+
+        Args:
+            aggregations: Column -> Arrow aggregate ('sum', 'mean', 'min', 'max')
+
+        Returns:
+            DataFrame with adomain plus one column per aggregation, sorted by adomain
+            (matching pandas groupby ordering)
+        """
+        table = self.dataset.to_table(columns=['adomain'] + list(aggregations))
+        grouped = table.group_by('adomain').aggregate(list(aggregations.items()))
+        grouped = grouped.sort_by('adomain')
+        return grouped.to_pandas().rename(
+            columns={f"{column}_{function}": column for column, function in aggregations.items()}
+        )
+
+
+_datasets: Dict[Path, AdvertiserResponseDataset] = {}
+_datasets_lock = threading.Lock()
+
+
+def get_advertiser_dataset(parquet_path: Union[str, Path] = None) -> Optional[AdvertiserResponseDataset]:
+    """
+    Shared accessor per parquet path, or None when the file is missing/unreadable
+    """
+    path = Path(parquet_path) if parquet_path is not None else DEFAULT_RESP_PATH
+    path = path.resolve()
+
+    with _datasets_lock:
+        if path in _datasets:
+            return _datasets[path]
+        if not path.exists():
+            return None
+        try:
+            dataset = AdvertiserResponseDataset(path)
+        except Exception as e:
+            logger.warning(f"Could not open advertiser dataset {path}: {e}")
+            return None
+        _datasets[path] = dataset
+        return dataset
@@ -0,0 +1,288 @@
+"""
+Advertiser Record Store for the Vector Database
+Typed SQLite table holding the full advertiser records next to the vector
+store, so search hits hydrate just the requested fields instead of decoding
+a JSON copy of every record from the vector metadata
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Record fields in the order the advertiser dicts have always used
+RECORD_FIELDS = (
+    'advertiser_id', 'domain', 'brand', 'category', 'total_packets', 'avg_cpm', 'median_cpm',
+    'max_cpm', 'min_cpm', 'geographic_data', 'activity_score', 'searchable_text'
+)
+
+# Field -> backing columns (geographic_data is split into its reach and top-ZIP list)
+_FIELD_COLUMNS = {field: (field,) for field in RECORD_FIELDS}
+_FIELD_COLUMNS['geographic_data'] = ('geographic_reach', 'top_zip_codes')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS advertisers (
+    advertiser_id TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total_packets INTEGER NOT NULL,
+    avg_cpm REAL NOT NULL,
+    median_cpm REAL NOT NULL,
+    max_cpm REAL NOT NULL,
+    min_cpm REAL NOT NULL,
+    activity_score REAL NOT NULL,
+    geographic_reach INTEGER NOT NULL,
+    top_zip_codes TEXT NOT NULL,
+    searchable_text TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS advertisers_by_packets ON advertisers (total_packets DESC, advertiser_id DESC);
+CREATE INDEX IF NOT EXISTS advertisers_by_activity ON advertisers (activity_score DESC, advertiser_id DESC);
+CREATE INDEX IF NOT EXISTS advertisers_category_by_packets
+    ON advertisers (category, total_packets DESC, advertiser_id DESC);
+CREATE INDEX IF NOT EXISTS advertisers_category_by_activity
+    ON advertisers (category, activity_score DESC, advertiser_id DESC);
+CREATE TABLE IF NOT EXISTS store_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Listing orders (each backed by an index, descending with advertiser_id as tie-break)
+SORT_COLUMNS = ('total_packets', 'activity_score')
+
+_COLUMNS = (
+    'advertiser_id', 'domain', 'brand', 'category', 'total_packets', 'avg_cpm', 'median_cpm', 'max_cpm',
+    'min_cpm', 'activity_score', 'geographic_reach', 'top_zip_codes', 'searchable_text', 'content_hash'
+)
+
+
+class AdvertiserRecordStore:
+    """
+    advertiser_id -> advertiser record, one typed column per field
+
+    Top ZIP codes are stored as compact [zip, activity] pairs; every other
+    field is a native SQLite column, so projections read only what they need.
+    """
+
+    def __init__(self, db_file: Union[str, Path]):
+        """
+        Open (or create) the store
+
+        Args:
+            db_file: SQLite database file
+        """
+        self.path = Path(db_file)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def columns_for(fields: Optional[Sequence[str]]) -> List[str]:
+        """
+        Columns needed to build the given record fields (all fields when None)
+
+        Raises:
+            ValueError: For unknown field names
+        """
+        if fields is None:
+            fields = RECORD_FIELDS
+        unknown = [field for field in fields if field not in _FIELD_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown advertiser fields: {unknown}; available: {list(RECORD_FIELDS)}")
+
+        columns = ['advertiser_id']
+        for field in RECORD_FIELDS:
+            if field in fields:
+                columns.extend(column for column in _FIELD_COLUMNS[field] if column not in columns)
+        return columns
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row, fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+        record = {}
+        for field in RECORD_FIELDS:
+            if fields is not None and field not in fields and field != 'advertiser_id':
+                continue
+            if field == 'geographic_data':
+                record[field] = {
+                    'top_zip_codes': [
+                        {'zip': zip_code, 'activity': activity}
+                        for zip_code, activity in json.loads(row['top_zip_codes'])
+                    ],
+                    'geographic_reach': row['geographic_reach']
+                }
+            else:
+                record[field] = row[field]
+        return record
+
+    def _rows(self, columns: Sequence[str], sql_tail: str, params: Sequence[Any]) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(f"SELECT {', '.join(columns)} FROM advertisers {sql_tail}", params).fetchall()
+
+    def _select(self, sql_tail: str, params: Sequence[Any], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+        rows = self._rows(self.columns_for(fields), sql_tail, params)
+        return [self._to_record(row, fields) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM advertisers").fetchone()[0]
+
+    def content_hashes(self) -> Dict[str, str]:
+        """advertiser_id -> content hash of the stored record"""
+        with self._lock:
+            rows = self._conn.execute("SELECT advertiser_id, content_hash FROM advertisers").fetchall()
+        return {row['advertiser_id']: row['content_hash'] for row in rows}
+
+    def upsert(self, records: Iterable[Dict[str, Any]], content_hashes: Iterable[str]):
+        """Insert or replace full advertiser records"""
+        rows = []
+        for record, content_hash in zip(records, content_hashes):
+            geo = record.get('geographic_data', {})
+            rows.append((
+                record['advertiser_id'], record['domain'], record['brand'], record['category'],
+                record['total_packets'], record['avg_cpm'], record['median_cpm'], record['max_cpm'],
+                record['min_cpm'], record['activity_score'], geo.get('geographic_reach', 0),
+                json.dumps([[z['zip'], z['activity']] for z in geo.get('top_zip_codes', [])], separators=(',', ':')),
+                record['searchable_text'], content_hash
+            ))
+        placeholders = ', '.join('?' for _ in _COLUMNS)
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO advertisers ({', '.join(_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            self._conn.commit()
+
+    def delete(self, advertiser_ids: Sequence[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM advertisers WHERE advertiser_id = ?", [(i,) for i in advertiser_ids])
+            self._conn.commit()
+
+    def get(self, advertiser_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """One record (projected to fields), or None"""
+        records = self._select("WHERE advertiser_id = ?", (advertiser_id,), fields)
+        return records[0] if records else None
+
+    def get_many(self, advertiser_ids: Sequence[str], fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Records for advertiser_ids in the given order (missing IDs are skipped)
+
+        Args:
+            advertiser_ids: IDs to fetch
+            fields: Record fields to hydrate (advertiser_id is always included)
+        """
+        if not advertiser_ids:
+            return []
+        by_id = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(advertiser_ids), 500):
+            chunk = advertiser_ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            for record in self._select(f"WHERE advertiser_id IN ({placeholders})", chunk, fields):
+                by_id[record['advertiser_id']] = record
+        return [by_id[advertiser_id] for advertiser_id in advertiser_ids if advertiser_id in by_id]
+
+    def page(self,
+             limit: int,
+             sort_by: str = 'total_packets',
+             after: Optional[Tuple[Any, str]] = None,
+             category: Optional[str] = None,
+             offset: int = 0,
+             fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, str]]]:
+        """
+        One page of records, highest sort_by first
+
+        Keyset pagination: pass the key returned for the previous page as
+        after, and the sorted index seeks straight to the next row, so every
+        page costs the same however deep it is.
+
+        Args:
+            limit: Page size
+            sort_by: 'total_packets' or 'activity_score'
+            after: (sort value, advertiser_id) of the previous page's last row
+            category: Only this category
+            offset: Rows to skip (plain OFFSET, for callers without a key)
+            fields: Record fields to hydrate
+
+        Returns:
+            (records, key of the last row or None when there are no more rows)
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort '{sort_by}', expected one of {list(SORT_COLUMNS)}")
+
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if after is not None:
+            clauses.append(f"({sort_by}, advertiser_id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        columns = self.columns_for(fields)
+        key_columns = [column for column in (sort_by,) if column not in columns]
+        # One extra row tells whether another page follows
+        rows = self._rows(
+            columns + key_columns,
+            f"{where} ORDER BY {sort_by} DESC, advertiser_id DESC LIMIT ? OFFSET ?",
+            params + [limit + 1, offset]
+        )
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        records = [self._to_record(row, fields) for row in rows]
+        last_key = (rows[-1][sort_by], rows[-1]['advertiser_id']) if has_more and rows else None
+        return records, last_key
+
+    def top_by_activity(self,
+                        category: str,
+                        limit: int,
+                        fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Most active advertisers in a category (served by the category index)"""
+        records, _ = self.page(limit, sort_by='activity_score', category=category, fields=fields)
+        return records
+
+    def generation(self) -> int:
+        """Data generation, bumped by whichever process last changed the advertisers"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_state WHERE key = 'generation'").fetchone()
+        return int(row['value']) if row else 0
+
+    def bump_generation(self, stats: Dict[str, Any]) -> int:
+        """
+        Publish a change: increment the generation and store the matching stats
+
+        Args:
+            stats: AdvertiserVectorDB.get_stats() snapshot for the new generation
+
+        Returns:
+            The new generation
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_state WHERE key = 'generation'").fetchone()
+            generation = (int(row['value']) if row else 0) + 1
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO store_state (key, value) VALUES (?, ?)",
+                [('generation', str(generation)), ('stats', json.dumps(stats))]
+            )
+            self._conn.commit()
+        return generation
+
+    def published_stats(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """(generation, stats) as last published by bump_generation (stats None if never)"""
+        with self._lock:
+            rows = dict(self._conn.execute("SELECT key, value FROM store_state").fetchall())
+        stats = rows.get('stats')
+        return int(rows.get('generation', 0)), json.loads(stats) if stats is not None else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
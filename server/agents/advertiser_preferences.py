@@ -3,12 +3,11 @@ Advertiser Preferences Agent - Step 2: Historical Data Analysis
 Neural Ads - Connected TV Advertising Platform
 """
 
-import json
 import os
 from typing import Dict, Any, List
 from dataclasses import dataclass
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from resources import get_llm_client, get_fallback_advertiser_db
 
 load_dotenv()
 
@@ -35,28 +34,13 @@ class AdvertiserPreferencesAgent:
     """
     
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY", "your_api_key_here")
-        )
+        self.client = get_llm_client()
         self.model = os.getenv("AGENT_MODEL", "gpt-4o-mini")
         self.advertiser_data = self._load_advertiser_database()
     
     def _load_advertiser_database(self) -> List[Dict]:
-        """Load the advertiser vector database from JSON file"""
-        try:
-            # Try local file first
-            db_path = os.path.join(os.path.dirname(__file__), "../advertiser_vector_database_full.json")
-            if not os.path.exists(db_path):
-                # Fallback to original path
-                db_path = os.path.join(os.path.dirname(__file__), "../../advertiser_vector_database_full.json")
-            
-            with open(db_path, 'r') as f:
-                data = json.load(f)
-                print(f"✅ Loaded advertiser database with {len(data)} advertisers")
-                return data
-        except Exception as e:
-            print(f"❌ Error loading advertiser database: {e}")
-            return []
+        """Advertiser vector database from JSON (shared, loaded once per process)"""
+        return get_fallback_advertiser_db()
     
     def _find_advertiser_data(self, advertiser_name: str) -> Dict[str, Any]:
         """Find advertiser data by name (fuzzy matching)"""
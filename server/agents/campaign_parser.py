@@ -7,8 +7,8 @@ import json
 import os
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from resources import get_llm_client
 
 load_dotenv()
 
@@ -35,9 +35,7 @@ class CampaignParserAgent:
     """
     
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY", "your_api_key_here")
-        )
+        self.client = get_llm_client()
         self.model = os.getenv("AGENT_MODEL", "gpt-4o-mini")
     
     async def parse_campaign_brief(self, user_input: str) -> CampaignParameters:
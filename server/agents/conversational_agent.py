@@ -3,10 +3,9 @@ import re
 import requests
 import asyncio
 from typing import Dict, List, Optional, Tuple, Any
-from openai import AsyncOpenAI
 import os
 from .multi_agent_orchestrator import MultiAgentOrchestrator
-from .real_data_advertiser_preferences import RealDataAdvertiserPreferencesAgent
+from resources import get_llm_client, get_preferences_agent
 
 class ConversationalAgent:
     """
@@ -15,13 +14,18 @@ class ConversationalAgent:
     and triggering the appropriate workflows.
     """
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.orchestrator = MultiAgentOrchestrator()
+    def __init__(self, orchestrator: Optional[MultiAgentOrchestrator] = None):
+        """
+        Args:
+            orchestrator: Workflow orchestrator to share (the app's instance);
+                          a new one is only built when none is passed
+        """
+        self.client = get_llm_client()
+        self.orchestrator = orchestrator or MultiAgentOrchestrator()
         self.conversation_history = []
         
-        # Initialize real data agents for accessing advertiser intelligence
-        self.advertiser_agent = RealDataAdvertiserPreferencesAgent()
+        # Shared real data agent for accessing advertiser intelligence
+        self.advertiser_agent = get_preferences_agent()
         self.vector_api_base = "http://localhost:8000/vector"  # Vector database API
         
         # Enhanced intent detection with specific workflow triggers
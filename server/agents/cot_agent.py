@@ -9,8 +9,8 @@ import os
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from resources import get_llm_client
 
 # Load environment variables
 load_dotenv()
@@ -59,9 +59,7 @@ class COTReasoningAgent:
         self.agents = {}  # Will hold references to specialized agents
         
         # Initialize OpenAI client
-        self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY", "your_api_key_here")
-        )
+        self.client = get_llm_client()
         self.model = os.getenv("AGENT_MODEL", "gpt-4o-mini")
         self.temperature = float(os.getenv("AGENT_TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("AGENT_MAX_TOKENS", "2000"))
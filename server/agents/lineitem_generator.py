@@ -7,8 +7,8 @@ import json
 import os
 from typing import Dict, Any, List
 from dataclasses import dataclass
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from resources import get_llm_client
 
 load_dotenv()
 
@@ -47,9 +47,7 @@ class LineItemGeneratorAgent:
     """
     
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY", "your_api_key_here")
-        )
+        self.client = get_llm_client()
         self.model = os.getenv("AGENT_MODEL", "gpt-4o-mini")
     
     async def generate_line_items(self, 
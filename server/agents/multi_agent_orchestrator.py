@@ -17,6 +17,7 @@ from .audience_generation import AudienceGenerationAgent, AudienceAnalysis
 from .lineitem_generator import LineItemGeneratorAgent, CampaignStructure
 from .forecasting_agent import ForecastingAgent, ForecastingResult
 from .real_data_forecasting_agent import RealDataForecastingAgent
+from resources import get_preferences_agent
 
 class WorkflowStep(Enum):
     CAMPAIGN_DATA = "campaign_data"
@@ -60,7 +61,7 @@ class MultiAgentOrchestrator:
         
         # Initialize specialized agents
         self.campaign_parser = CampaignParserAgent()
-        self.preferences_agent = RealDataAdvertiserPreferencesAgent()  # Use real data preferences
+        self.preferences_agent = get_preferences_agent()  # Use real data preferences (shared)
         self.audience_agent = AudienceGenerationAgent()
         self.lineitem_agent = LineItemGeneratorAgent()
         self.forecasting_agent = RealDataForecastingAgent()  # Use real data forecasting
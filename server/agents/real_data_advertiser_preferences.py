@@ -7,18 +7,17 @@ This agent uses real advertiser response data from resp.parquet to provide accur
 
 import pandas as pd
 import numpy as np
-import json
 import os
 import sys
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import logging
 
 # Add parent directory to path to import data_loader
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from data_loader import get_real_data_loader
+from resources import get_llm_client, get_fallback_advertiser_db
 
 load_dotenv()
 
@@ -43,78 +42,92 @@ class RealDataAdvertiserPreferencesAgent:
     """
     
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY", "your_api_key_here")
-        )
+        self.client = get_llm_client()
         self.model = os.getenv("AGENT_MODEL", "gpt-4o-mini")
         self.logger = logging.getLogger(__name__)
         
-        # Load real data
-        self.data_loader = None
-        self.advertiser_response_data = None
+        # Real data is looked up per request (see _current_data_loader), so
+        # this shared instance follows snapshot hot reloads
         self._initialize_real_data()
         
         # Fallback to original database
         self.fallback_data = self._load_fallback_database()
     
     def _initialize_real_data(self):
-        """Initialize real advertiser response data"""
+        """Report whether real advertiser response data is available"""
+        response_data = self._response_data(self._current_data_loader())
+        if response_data is not None:
+            self.logger.info(f"✅ Loaded real advertiser response data: {len(response_data)} records")
+        else:
+            self.logger.warning("⚠️ Real advertiser data not available, using fallback")
+    
+    def _current_data_loader(self):
+        """Return the active real data snapshot (picks up hot reloads)"""
         try:
-            self.data_loader = get_real_data_loader()
-            if self.data_loader and not self.data_loader.preferences_data.empty:
-                self.advertiser_response_data = self.data_loader.preferences_data
-                self.logger.info(f"✅ Loaded real advertiser response data: {len(self.advertiser_response_data)} records")
-            else:
-                self.logger.warning("⚠️ Real advertiser data not available, using fallback")
+            return get_real_data_loader()
         except Exception as e:
             self.logger.error(f"❌ Failed to load real advertiser data: {e}")
+            return None
+    
+    @staticmethod
+    def _response_data(data_loader) -> Optional[pd.DataFrame]:
+        """The snapshot's advertiser lookup frame, or None when it has no preferences data"""
+        if data_loader is None or data_loader.preferences_data is None or data_loader.preferences_data.empty:
+            return None
+        return data_loader.preferences_data
     
     def _load_fallback_database(self) -> List[Dict]:
-        """Load the fallback advertiser database"""
-        try:
-            db_path = os.path.join(os.path.dirname(__file__), "../advertiser_vector_database_full.json")
-            if not os.path.exists(db_path):
-                db_path = os.path.join(os.path.dirname(__file__), "../../advertiser_vector_database_full.json")
-            
-            with open(db_path, 'r') as f:
-                data = json.load(f)
-                self.logger.info(f"✅ Loaded fallback advertiser database with {len(data)} advertisers")
-                return data
-        except Exception as e:
-            self.logger.warning(f"⚠️ Could not load fallback database: {e}")
-            return []
+        """Fallback advertiser database (shared, loaded once per process)"""
+        return get_fallback_advertiser_db()
     
     def _find_advertiser_in_real_data(self, advertiser_name: str) -> Optional[pd.Series]:
         """Find advertiser in real response data"""
-        if self.advertiser_response_data is None or self.advertiser_response_data.empty:
+        # One snapshot for the whole lookup, even if a reload lands meanwhile
+        data_loader = self._current_data_loader()
+        response_data = self._response_data(data_loader)
+        if response_data is None:
             return None
         
         advertiser_lower = advertiser_name.lower()
         
         # Try exact domain match
-        exact_match = self.advertiser_response_data[
-            self.advertiser_response_data['adomain'].str.lower() == advertiser_lower
+        exact_match = response_data[
+            response_data['adomain'].str.lower() == advertiser_lower
         ]
         if not exact_match.empty:
-            return exact_match.iloc[0]
+            return self._load_advertiser_row(data_loader, exact_match.iloc[0])
         
         # Try partial domain match
-        partial_matches = self.advertiser_response_data[
-            self.advertiser_response_data['adomain'].str.lower().str.contains(advertiser_lower, na=False)
+        partial_matches = response_data[
+            response_data['adomain'].str.lower().str.contains(advertiser_lower, na=False)
         ]
         if not partial_matches.empty:
             # Return the one with highest total_packets (most active)
-            return partial_matches.loc[partial_matches['total_packets'].idxmax()]
+            return self._load_advertiser_row(data_loader, partial_matches.loc[partial_matches['total_packets'].idxmax()])
         
         # Try reverse partial match (advertiser name contains domain)
-        for idx, row in self.advertiser_response_data.iterrows():
+        for idx, row in response_data.iterrows():
             domain_parts = row['adomain'].lower().split('.')
             for part in domain_parts:
                 if len(part) > 3 and part in advertiser_lower:
-                    return row
+                    return self._load_advertiser_row(data_loader, row)
         
         return None
     
+    def _load_advertiser_row(self, data_loader, index_row: pd.Series) -> Optional[pd.Series]:
+        """Fetch the full resp.parquet row behind a match in the slim lookup frame"""
+        dataset = data_loader.preferences_dataset if data_loader else None
+        if dataset is None:
+            return index_row
+        
+        rows = dataset.get_advertiser_rows(index_row['adomain'])
+        if rows.empty:
+            return None
+        
+        # A domain can span several rows; keep the one that matched
+        matched = rows[rows['total_packets'] == index_row['total_packets']]
+        return (matched if not matched.empty else rows).iloc[0]
+    
     def _extract_network_preferences(self, advertiser_data: pd.Series) -> Tuple[List[str], Dict[str, float]]:
         """Extract network preferences from real data"""
         network_preferences = []
@@ -7,7 +7,9 @@ This agent uses real fill rate and inventory data to provide accurate forecastin
 
 import json
 import asyncio
-from typing import Dict, List, Any, Optional
+import copy
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import os
@@ -16,7 +18,10 @@ import logging
 
 # Add parent directory to path to import data_loader
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from data_loader import get_real_data_loader, RealDataLoader
+from data_loader import get_real_data_loader, RealDataLoader, normalize_targeting_criteria
+
+# Forecasts kept per agent (least recently used evicted first)
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "256"))
 
 @dataclass
 class CampaignForecast:
@@ -47,10 +52,15 @@ class RealDataForecastingAgent:
     to provide accurate campaign forecasting and spend projections.
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = FORECAST_CACHE_SIZE):
         self.logger = logging.getLogger(__name__)
         self.data_loader = None
         self._initialize_data_loader()
+        
+        # LRU of finished forecasts, valid for one data snapshot
+        self.cache_size = cache_size
+        self._forecast_cache: "OrderedDict[Tuple, RealDataForecastingResult]" = OrderedDict()
+        self._cache_snapshot_version: Optional[int] = None
     
     def _initialize_data_loader(self):
         """Initialize the real data loader"""
@@ -89,16 +99,32 @@ class RealDataForecastingAgent:
         
         self.logger.info(f"🔮 Generating real-data forecast for {advertiser} - ${campaign_budget:,.2f} budget")
         
+        # Pin the current data snapshot so a background reload can't change it mid-forecast
+        data_loader = self._current_data_loader()
+        
         # Parse timeline to get number of weeks
         num_weeks = self._parse_timeline_to_weeks(campaign_timeline)
         
         # Extract targeting criteria from line items if not provided
         if targeting_criteria is None:
             targeting_criteria = self._extract_targeting_from_line_items(line_items)
+        # Forecast from the canonical criteria the cache key is built from, so
+        # requests sharing a key always share a result
+        targeting_criteria = {
+            target_type: list(values) for target_type, values in normalize_targeting_criteria(targeting_criteria)
+        }
+        
+        cache_key = self._forecast_cache_key(
+            advertiser, targeting_criteria, campaign_budget, num_weeks, campaign_timeline, target_frequency
+        )
+        cached = self._get_cached_forecast(cache_key, data_loader)
+        if cached is not None:
+            self.logger.info(f"♻️ Reusing cached forecast for {advertiser}")
+            return cached
         
         # Get real data forecasting information
         real_data_info = self._get_real_data_forecasting_info(
-            targeting_criteria, campaign_budget, num_weeks
+            targeting_criteria, campaign_budget, num_weeks, data_loader
         )
         
         # Generate single campaign forecast instead of weekly breakdowns
@@ -124,19 +150,72 @@ class RealDataForecastingAgent:
         
         # Calculate confidence based on real data availability
         confidence = self._calculate_real_data_confidence(
-            targeting_criteria, real_data_info
+            targeting_criteria, real_data_info, data_loader
         )
         
-        return RealDataForecastingResult(
+        result = RealDataForecastingResult(
             advertiser=advertiser,
             campaign_total_budget=campaign_budget,
             campaign_forecast=campaign_forecast,
             performance_breakdown=performance_breakdown,
             forecasting_insights=insights,
             confidence=confidence,
-            data_source="real_data" if self.data_loader else "mock_data",
+            data_source="real_data" if data_loader else "mock_data",
             targeting_breakdown=real_data_info.get('targeting_breakdown', {})
         )
+        self._store_cached_forecast(cache_key, result)
+        return result
+    
+    def _forecast_cache_key(self,
+                            advertiser: str,
+                            targeting_criteria: Dict[str, List[str]],
+                            campaign_budget: float,
+                            num_weeks: int,
+                            campaign_timeline: str,
+                            target_frequency: float) -> Tuple:
+        """
+        Forecast inputs as the computation sees them (campaign dates are
+        relative to today, so the day is part of the key)
+        
+        Only targeting is canonicalized, and forecast() computes from that
+        canonical form too; every other input is keyed exactly as given.
+        """
+        return (
+            advertiser,
+            normalize_targeting_criteria(targeting_criteria),
+            float(campaign_budget),
+            int(num_weeks),
+            campaign_timeline,
+            float(target_frequency),
+            datetime.now().date().isoformat(),
+        )
+    
+    def _get_cached_forecast(self, cache_key: Tuple,
+                             data_loader: Optional[RealDataLoader]) -> Optional[RealDataForecastingResult]:
+        """Cached forecast for the key, dropping the whole cache when the data snapshot changed"""
+        snapshot_version = data_loader.snapshot_version if data_loader else None
+        if snapshot_version != self._cache_snapshot_version:
+            if self._forecast_cache:
+                self.logger.info(f"🧹 Data snapshot changed, clearing {len(self._forecast_cache)} cached forecasts")
+            self._forecast_cache.clear()
+            self._cache_snapshot_version = snapshot_version
+            return None
+        
+        cached = self._forecast_cache.get(cache_key)
+        if cached is None:
+            return None
+        self._forecast_cache.move_to_end(cache_key)
+        # Hand out a copy so callers can't mutate the cached entry
+        return copy.deepcopy(cached)
+    
+    def _store_cached_forecast(self, cache_key: Tuple, result: RealDataForecastingResult):
+        """Insert a forecast, evicting the least recently used beyond cache_size"""
+        if self.cache_size <= 0:
+            return
+        self._forecast_cache[cache_key] = copy.deepcopy(result)
+        self._forecast_cache.move_to_end(cache_key)
+        while len(self._forecast_cache) > self.cache_size:
+            self._forecast_cache.popitem(last=False)
     
     def _extract_targeting_from_line_items(self, line_items: List[Dict[str, Any]]) -> Dict[str, List[str]]:
         """Extract targeting criteria from line items"""
@@ -180,17 +259,29 @@ class RealDataForecastingAgent:
         
         return targeting
     
+    def _current_data_loader(self) -> Optional[RealDataLoader]:
+        """Return the active real data snapshot (picks up hot reloads)"""
+        if self.data_loader is None:
+            return None
+        try:
+            self.data_loader = get_real_data_loader()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not refresh real data snapshot: {e}")
+        return self.data_loader
+    
     def _get_real_data_forecasting_info(self, 
                                       targeting_criteria: Dict[str, List[str]], 
                                       budget: float,
-                                      weeks: int) -> Dict[str, Any]:
+                                      weeks: int,
+                                      data_loader: Optional[RealDataLoader] = None) -> Dict[str, Any]:
         """Get forecasting information from real data"""
-        if not self.data_loader or self.data_loader.fill_data is None:
+        data_loader = data_loader or self.data_loader
+        if not data_loader or data_loader.fill_data is None:
             # Fallback to mock data
             return self._generate_mock_forecasting_info(targeting_criteria, budget, weeks)
         
         try:
-            return self.data_loader.get_forecasting_data_for_campaign(
+            return data_loader.get_forecasting_data_for_campaign(
                 targeting_criteria, budget, weeks
             )
         except Exception as e:
@@ -373,22 +464,24 @@ class RealDataForecastingAgent:
     
     def _calculate_real_data_confidence(self,
                                       targeting_criteria: Dict[str, List[str]],
-                                      real_data_info: Dict[str, Any]) -> float:
+                                      real_data_info: Dict[str, Any],
+                                      data_loader: Optional[RealDataLoader] = None) -> float:
         """Calculate confidence score based on real data availability"""
         
         base_confidence = real_data_info.get('confidence_score', 0.75)
+        data_loader = data_loader or self.data_loader
         
         # Adjust confidence based on data source
-        if not self.data_loader or self.data_loader.fill_data is None:
+        if not data_loader or data_loader.fill_data is None:
             return max(0.6, base_confidence - 0.2)  # Lower confidence for mock data
         
         # Boost confidence for well-covered targeting
         confidence_adjustments = []
         
         for target_type in targeting_criteria.keys():
-            if hasattr(self.data_loader, '_processed_fill_rates'):
-                if target_type in self.data_loader._processed_fill_rates:
-                    type_data = self.data_loader._processed_fill_rates[target_type]
+            if hasattr(data_loader, '_processed_fill_rates'):
+                if target_type in data_loader._processed_fill_rates:
+                    type_data = data_loader._processed_fill_rates[target_type]
                     # Higher confidence for more data points
                     data_confidence = min(0.95, 0.7 + (type_data['records_count'] / 1000))
                     confidence_adjustments.append(data_confidence)
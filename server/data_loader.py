@@ -5,12 +5,408 @@ Handles loading and processing of real fill rate, inventory, and advertiser pref
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Any
 import os
 from pathlib import Path
 import logging
 from datetime import datetime, timedelta
 import json
+import hashlib
+import threading
+import itertools
+
+from geo_hierarchy import GeoRollups, GEO_LEVELS
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow ships with requirements.txt
+    pa = None
+    feather = None
+
+if TYPE_CHECKING:
+    from advertiser_dataset import AdvertiserResponseDataset
+
+# Bump whenever the parsed table layout changes so stale caches are ignored
+PARSED_CACHE_VERSION = 2
+PARSED_CACHE_SUFFIX = ".parsed.feather"
+PARSED_CACHE_METADATA_KEY = b"neural_ads_parsed_cache"
+
+# Targeting index arrays published once per data version for every worker to map
+SHARED_INDEX_VERSION = 2
+SHARED_INDEX_FILE = "targeting_index.shared.arrow"
+SHARED_INDEX_METADATA_KEY = b"neural_ads_shared_index"
+
+# Load-time dtype compaction: strings repeated often enough become categoricals,
+# integers shrink while the column total still fits (so grouped sums can't
+# overflow) and ratio columns drop to float32
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+FLOAT32_COLUMNS = ('fill_rate',)
+
+# Rows per chunk when streaming day_fill.csv (0 = read the whole file at once)
+FILL_CHUNK_ROWS = int(os.getenv("REAL_DATA_FILL_CHUNK_ROWS", "0"))
+FILL_COLUMNS = ['field_combination', 'summary_value', 'request_count', 'fill_rate']
+
+# Targeting types whose values are areas (states, regions, zip prefixes)
+GEO_ROLLUP_TARGETING_TYPES = ('geo', 'state', 'region')
+
+TargetingKey = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def normalize_targeting_criteria(targeting_criteria: Optional[Dict[str, List[str]]]) -> TargetingKey:
+    """
+    Canonical, hashable form of targeting criteria
+
+    Types and values are sorted so requests differing only in ordering map to
+    the same key (repeated values are kept - they weight the inventory sums).
+    """
+    if not targeting_criteria:
+        return ()
+    return tuple(
+        (str(target_type), tuple(sorted(str(value).strip() for value in (values or []))))
+        for target_type, values in sorted(targeting_criteria.items(), key=lambda item: str(item[0]))
+    )
+
+
+def stable_seed(*parts: Any) -> int:
+    """Process-independent 64-bit seed from hashable inputs (unlike hash())"""
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class _LatestFillValues:
+    """
+    Latest numeric fill values per field_combination, for streamed loads
+
+    Each key string is held once (in the code dict); the per-key values live
+    in growable numpy columns, so the running state costs a few machine words
+    per unique key instead of a full DataFrame row.
+    """
+
+    _NUMERIC = ('summary_value', 'request_count', 'fill_rate')
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self._values = {col: np.zeros(1024, dtype=np.float64 if col == 'fill_rate' else np.int64)
+                        for col in self._NUMERIC}
+
+    def update(self, chunk: pd.DataFrame):
+        """Record a chunk's rows (later rows win, as in the full-file path)"""
+        latest = chunk.drop_duplicates('field_combination', keep='last')
+        codes = np.fromiter(
+            (self.codes.setdefault(key, len(self.codes)) for key in latest['field_combination']),
+            dtype=np.int64, count=len(latest)
+        )
+        capacity = len(self._values['fill_rate'])
+        if len(self.codes) > capacity:
+            size = max(len(self.codes), 2 * capacity)
+            for col, column in self._values.items():
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[:capacity] = column
+                self._values[col] = grown
+        for col in self._NUMERIC:
+            self._values[col][codes] = latest[col].to_numpy()
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per key, in first-seen order"""
+        count = len(self.codes)
+        df = pd.DataFrame({'field_combination': list(self.codes)})
+        for col in self._NUMERIC:
+            df[col] = self._values[col][:count]
+        return df
+
+
+class TargetingIndex:
+    """
+    Dictionary-encoded index over the fill and avails key space.
+    
+    Targeting types are interned to integer codes and every (type, value) key
+    gets a row in aligned NumPy arrays sorted by (type, value). Each type owns
+    a contiguous slice with its own hash index, so a batch of values resolves
+    with one vectorized get_indexer call instead of a dict lookup per value.
+    
+    The arrays are the joined fill/avails table: request_count, fill_rate and
+    summary_value from day_fill.csv, avails from all_avails.csv, with
+    has_fill / has_avails flagging keys present on only one side.
+    """
+    
+    def __init__(self,
+                 type_names: np.ndarray,
+                 type_bounds: Dict[str, Tuple[int, int]],
+                 values: np.ndarray,
+                 fill_rate: np.ndarray,
+                 request_count: np.ndarray,
+                 avails: np.ndarray,
+                 has_fill: np.ndarray,
+                 has_avails: np.ndarray,
+                 summary_value: Optional[np.ndarray] = None):
+        self.type_names = type_names
+        self.type_codes = {name: code for code, name in enumerate(type_names)}
+        self.type_bounds = type_bounds
+        self.values = values
+        self.fill_rate = fill_rate
+        self.request_count = request_count
+        self.avails = avails
+        self.has_fill = has_fill
+        self.has_avails = has_avails
+        self.summary_value = (
+            summary_value if summary_value is not None else np.zeros(len(values), dtype=np.int64)
+        )
+        self._type_indexes: Dict[str, pd.Index] = {}
+    
+    @classmethod
+    def build(cls, fill_data: Optional[pd.DataFrame], avails_data: Optional[pd.DataFrame]) -> 'TargetingIndex':
+        """Join fill and avails on (type, value) and encode the result"""
+        keys = ['targeting_type', 'targeting_value']
+        frames = []
+        
+        if fill_data is not None and not fill_data.empty:
+            # Later rows win, matching the dict(zip(...)) by_value maps
+            frames.append(
+                fill_data[keys + ['fill_rate', 'request_count', 'summary_value']]
+                .drop_duplicates(keys, keep='last')
+                .assign(_has_fill=True)
+            )
+        if avails_data is not None and not avails_data.empty:
+            frames.append(
+                avails_data[keys + ['Count']]
+                .drop_duplicates(keys, keep='last')
+                .assign(_has_avails=True)
+            )
+        
+        if not frames:
+            joined = pd.DataFrame(columns=keys)
+        elif len(frames) == 1:
+            joined = frames[0]
+        else:
+            joined = frames[0].merge(frames[1], on=keys, how='outer')
+        
+        joined = joined.dropna(subset=keys).sort_values(keys, kind='stable')
+        
+        type_codes, type_names = pd.factorize(joined['targeting_type'], sort=True)
+        starts = np.searchsorted(type_codes, np.arange(len(type_names)), side='left')
+        stops = np.searchsorted(type_codes, np.arange(len(type_names)), side='right')
+        type_bounds = {
+            name: (int(start), int(stop))
+            for name, start, stop in zip(type_names, starts, stops)
+        }
+        
+        def column(name: str, dtype, missing):
+            if name not in joined:
+                return np.full(len(joined), missing, dtype=dtype)
+            return joined[name].fillna(missing).to_numpy(dtype=dtype)
+        
+        def flag(name: str):
+            if name not in joined:
+                return np.zeros(len(joined), dtype=bool)
+            return joined[name].eq(True).to_numpy(dtype=bool)
+        
+        return cls(
+            type_names=np.asarray(type_names, dtype=str),
+            type_bounds=type_bounds,
+            values=joined['targeting_value'].to_numpy(dtype=str),
+            fill_rate=column('fill_rate', np.float64, np.nan),
+            request_count=column('request_count', np.int64, 0),
+            avails=column('Count', np.int64, 0),
+            has_fill=flag('_has_fill'),
+            has_avails=flag('_has_avails'),
+            summary_value=column('summary_value', np.int64, 0),
+        )
+    
+    def to_arrow(self, fingerprint: str) -> 'pa.Table':
+        """
+        Arrow table of the index arrays for publishing to other processes
+        
+        Args:
+            fingerprint: Identity of the source data the index was built from
+        """
+        type_codes = np.zeros(len(self.values), dtype=np.int32)
+        for code, name in enumerate(self.type_names):
+            start, stop = self.type_bounds[name]
+            type_codes[start:stop] = code
+        
+        table = pa.table({
+            'type_code': type_codes,
+            'value': pa.array(self.values.astype(object), type=pa.string()),
+            'fill_rate': self.fill_rate,
+            'request_count': self.request_count,
+            'summary_value': self.summary_value,
+            'avails': self.avails,
+            # uint8 rather than Arrow's bit-packed bool so flags map zero-copy
+            'has_fill': self.has_fill.astype(np.uint8),
+            'has_avails': self.has_avails.astype(np.uint8),
+        })
+        meta = {
+            'version': SHARED_INDEX_VERSION,
+            'fingerprint': fingerprint,
+            'type_names': [str(name) for name in self.type_names],
+        }
+        return table.replace_schema_metadata({SHARED_INDEX_METADATA_KEY: json.dumps(meta).encode()})
+    
+    @classmethod
+    def from_arrow(cls, table: 'pa.Table', fingerprint: str) -> Optional['TargetingIndex']:
+        """
+        Index over a (memory-mapped) published table
+        
+        Numeric columns and flags are zero-copy read-only views of the table's
+        buffers, so processes mapping the same file share those pages.
+        
+        Returns:
+            TargetingIndex, or None when the table was built from other data
+        """
+        raw_meta = (table.schema.metadata or {}).get(SHARED_INDEX_METADATA_KEY)
+        if raw_meta is None:
+            return None
+        meta = json.loads(raw_meta)
+        if meta.get('version') != SHARED_INDEX_VERSION or meta.get('fingerprint') != fingerprint:
+            return None
+        
+        def view(name: str) -> np.ndarray:
+            return table.column(name).combine_chunks().to_numpy()
+        
+        type_names = np.asarray(meta['type_names'], dtype=str)
+        type_codes = view('type_code')
+        starts = np.searchsorted(type_codes, np.arange(len(type_names)), side='left')
+        stops = np.searchsorted(type_codes, np.arange(len(type_names)), side='right')
+        
+        return cls(
+            type_names=type_names,
+            type_bounds={
+                name: (int(start), int(stop))
+                for name, start, stop in zip(type_names, starts, stops)
+            },
+            values=table.column('value').to_numpy().astype(str),
+            fill_rate=view('fill_rate'),
+            request_count=view('request_count'),
+            avails=view('avails'),
+            has_fill=view('has_fill').view(bool),
+            has_avails=view('has_avails').view(bool),
+            summary_value=view('summary_value'),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def _type_index(self, targeting_type: str) -> Optional[pd.Index]:
+        """Hash index over one type's value slice, built on first use"""
+        type_index = self._type_indexes.get(targeting_type)
+        if type_index is None and targeting_type in self.type_bounds:
+            start, stop = self.type_bounds[targeting_type]
+            type_index = pd.Index(self.values[start:stop].astype(object))
+            self._type_indexes[targeting_type] = type_index
+        return type_index
+    
+    def lookup(self, targeting_type: str, values) -> np.ndarray:
+        """
+        Resolve many values of one targeting type to row positions
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'zip')
+            values: Iterable of targeting values
+        
+        Returns:
+            Int64 array of row positions, -1 where the key is unknown
+        """
+        values = pd.Index(list(values), dtype=object)
+        type_index = self._type_index(targeting_type)
+        if type_index is None or len(values) == 0:
+            return np.full(len(values), -1, dtype=np.int64)
+        
+        positions = type_index.get_indexer(values).astype(np.int64)
+        start = self.type_bounds[targeting_type][0]
+        return np.where(positions >= 0, positions + start, -1)
+    
+    def metrics(self, targeting_type: str, values) -> Dict[str, np.ndarray]:
+        """
+        Every joined metric for many values of one type from a single lookup
+        
+        Returns:
+            Dict of per-value arrays: request_count, fill_rate, summary_value,
+            avails, has_fill, has_avails (unknown keys: zeros / NaN / False)
+        """
+        positions = self.lookup(targeting_type, values)
+        found = positions >= 0
+        rows = positions[found]
+        
+        def gather(column: np.ndarray, missing) -> np.ndarray:
+            out = np.full(len(positions), missing, dtype=column.dtype)
+            out[found] = column[rows]
+            return out
+        
+        return {
+            'request_count': gather(self.request_count, 0),
+            'fill_rate': gather(self.fill_rate, np.nan),
+            'summary_value': gather(self.summary_value, 0),
+            'avails': gather(self.avails, 0),
+            'has_fill': gather(self.has_fill, False),
+            'has_avails': gather(self.has_avails, False),
+        }
+
+
+class TargetingCatalog:
+    """
+    Sorted, prefix-searchable targeting values per type
+    
+    Values are kept in two layouts: code-point order (what get_targeting_options
+    has always returned) and case-folded order for typeahead, where a prefix
+    maps to a contiguous slice found with two binary searches.
+    """
+    
+    # Sorts after every real character, so prefix + _PREFIX_END bounds a prefix range
+    _PREFIX_END = '\U0010ffff'
+    
+    def __init__(self, options: Dict[str, np.ndarray]):
+        self.options = options
+        self._folded: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for targeting_type, values in options.items():
+            folded = np.char.lower(values) if len(values) else values
+            order = np.argsort(folded, kind='stable')
+            self._folded[targeting_type] = (folded[order], values[order])
+    
+    @classmethod
+    def from_index(cls, index: 'TargetingIndex', type_order: List[str]) -> 'TargetingCatalog':
+        """Catalog of every value with fill data, in index (sorted) order"""
+        options = {}
+        for targeting_type in type_order:
+            if targeting_type not in index.type_bounds:
+                continue
+            start, stop = index.type_bounds[targeting_type]
+            options[targeting_type] = index.values[start:stop][index.has_fill[start:stop]]
+        return cls(options)
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of values per targeting type"""
+        return {targeting_type: len(values) for targeting_type, values in self.options.items()}
+    
+    def search(self, targeting_type: str, prefix: str = '', limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        Case-insensitive prefix search within one targeting type
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'genre')
+            prefix: Leading characters to match ('' matches everything)
+            limit: Maximum values to return
+            offset: Position within the matches to start from
+        
+        Returns:
+            Dict with the page of values, total matches and the next offset (or None)
+        """
+        if targeting_type not in self._folded:
+            return {'values': [], 'total_matches': 0, 'next_offset': None}
+        
+        folded, ordered = self._folded[targeting_type]
+        prefix = prefix.lower()
+        start = int(np.searchsorted(folded, prefix, side='left'))
+        stop = int(np.searchsorted(folded, prefix + self._PREFIX_END, side='left')) if prefix else len(folded)
+        
+        page_start = start + max(0, offset)
+        page_stop = min(stop, page_start + max(0, limit))
+        return {
+            'values': ordered[page_start:page_stop].tolist(),
+            'total_matches': stop - start,
+            'next_offset': page_stop - start if page_stop < stop else None,
+        }
+
 
 class RealDataLoader:
     """
@@ -20,12 +416,17 @@ class RealDataLoader:
     - Advertiser preferences
     """
     
-    def __init__(self, data_directory: str = None):
+    def __init__(self, data_directory: str = None, use_parsed_cache: bool = True,
+                 fill_chunk_rows: Optional[int] = None):
         """
         Initialize the data loader
         
         Args:
             data_directory: Path to directory containing the data files
+            use_parsed_cache: Read/write parsed Feather caches next to the CSVs
+            fill_chunk_rows: Stream day_fill.csv in chunks of this many rows, keeping
+                             only running per-key / per-type aggregates (defaults to
+                             REAL_DATA_FILL_CHUNK_ROWS; 0 reads the whole file)
         """
         if data_directory is None:
             # Default to the real data directory
@@ -33,14 +434,38 @@ class RealDataLoader:
         else:
             self.data_dir = Path(data_directory)
         
+        self.use_parsed_cache = use_parsed_cache and feather is not None
+        self.fill_chunk_rows = FILL_CHUNK_ROWS if fill_chunk_rows is None else fill_chunk_rows
+        
+        # Dated daily snapshots for trailing-window queries (opened lazily)
+        self._history_store = None
+        
         self.fill_data = None
         self.avails_data = None
         self.preferences_data = None
+        self.preferences_dataset: Optional['AdvertiserResponseDataset'] = None
         
         # Cache processed data
         self._processed_fill_rates = {}
         self._inventory_by_category = {}
         self._advertiser_preferences = {}
+        self._targeting_index: Optional[TargetingIndex] = None
+        self._geo_rollups: Optional[GeoRollups] = None
+        self._targeting_catalog: Optional[TargetingCatalog] = None
+        
+        # Per-type fill stats and overall rate accumulated while streaming
+        self._streamed_fill_stats: Optional[pd.DataFrame] = None
+        self._overall_fill_rate: Optional[float] = None
+        
+        # Deep memory of each loaded table before/after dtype compaction
+        self.memory_usage: Dict[str, Dict[str, int]] = {}
+        
+        # Memory-mapped files backing this snapshot's arrays (shared across workers)
+        self.shared_mappings: List[str] = []
+        
+        # Set when this loader is published as the active snapshot
+        self.snapshot_version = 0
+        self.loaded_at: Optional[datetime] = None
         
         self.logger = logging.getLogger(__name__)
         
@@ -68,6 +493,12 @@ class RealDataLoader:
             # Process and cache data
             self._process_fill_rates()
             self._process_inventory_data()
+            self._targeting_index = self._attach_or_build_targeting_index()
+            self._build_geo_rollups()
+            self._targeting_catalog = TargetingCatalog.from_index(
+                self._targeting_index, pd.unique(self.fill_data['targeting_type']).tolist()
+            )
+            self.loaded_at = datetime.now()
             
             self.logger.info("🎉 All real data loaded successfully!")
             return True
@@ -83,6 +514,13 @@ class RealDataLoader:
         if not fill_path.exists():
             raise FileNotFoundError(f"Fill data not found at {fill_path}")
         
+        if self.fill_chunk_rows > 0:
+            return self._stream_fill_data(fill_path)
+        
+        cached = self._read_parsed_cache(fill_path)
+        if cached is not None:
+            return cached
+        
         df = pd.read_csv(fill_path)
         
         # Validate required columns
@@ -91,12 +529,88 @@ class RealDataLoader:
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
         
-        # Parse field combinations
-        df['targeting_type'] = df['field_combination'].str.split(':').str[0]
-        df['targeting_value'] = df['field_combination'].str.split(':').str[1]
+        # Parse field combinations (single split for both columns)
+        self._split_targeting_key(df, 'field_combination')
+        df = self._compact_loaded_frame(fill_path, df)
         
+        self._write_parsed_cache(fill_path, df)
+        return self._attach_written_cache(fill_path, df)
+    
+    def _stream_fill_data(self, fill_path: Path) -> pd.DataFrame:
+        """
+        Aggregate day_fill.csv chunk by chunk
+        
+        Peak memory is one chunk plus the running aggregates: per-type sums,
+        request-weighted sums, counts and min/max, and the latest numeric
+        values per field_combination (later rows win, as in the full-file
+        path). The per-key state is O(unique keys) - each key string once plus
+        three numbers - since the returned frame needs one row per key; for
+        zip x network x genre exports that approaches the row count, so only
+        the per-row overhead (not the key count) is bounded by the chunk size.
+        
+        Returns:
+            Per-key fill frame (per-type stats are kept for _process_fill_rates)
+        """
+        self.logger.info(f"🌊 Streaming {fill_path.name} in chunks of {self.fill_chunk_rows:,} rows")
+        
+        type_stats = None
+        latest_values = _LatestFillValues()
+        total_rows = 0
+        
+        reader = pd.read_csv(fill_path, chunksize=self.fill_chunk_rows, usecols=lambda col: col in FILL_COLUMNS)
+        for chunk in reader:
+            missing_cols = [col for col in FILL_COLUMNS if col not in chunk.columns]
+            if missing_cols:
+                raise ValueError(f"Missing required columns: {missing_cols}")
+            
+            self._split_targeting_key(chunk, 'field_combination')
+            total_rows += len(chunk)
+            
+            chunk_stats = chunk.assign(
+                _weighted_fill=chunk['fill_rate'] * chunk['request_count']
+            ).groupby('targeting_type', sort=False, observed=True).agg(
+                fill_sum=('fill_rate', 'sum'),
+                fill_count=('fill_rate', 'count'),
+                weighted_sum=('_weighted_fill', 'sum'),
+                total_requests=('request_count', 'sum'),
+                records_count=('fill_rate', 'size'),
+                min_fill_rate=('fill_rate', 'min'),
+                max_fill_rate=('fill_rate', 'max'),
+            )
+            type_stats = chunk_stats if type_stats is None else self._merge_fill_stats(type_stats, chunk_stats)
+            
+            latest_values.update(chunk)
+        
+        if type_stats is None:
+            raise ValueError(f"Fill data at {fill_path} is empty")
+        
+        df = latest_values.to_frame()
+        del latest_values
+        self._split_targeting_key(df, 'field_combination')
+        df = self._compact_loaded_frame(fill_path, df)
+        
+        self._streamed_fill_stats = type_stats
+        total_requests = type_stats['total_requests'].sum()
+        self._overall_fill_rate = (
+            float(type_stats['weighted_sum'].sum() / total_requests) if total_requests > 0 else None
+        )
+        
+        self.logger.info(f"🌊 Aggregated {total_rows:,} fill rows into {len(df):,} keys")
         return df
     
+    @staticmethod
+    def _merge_fill_stats(running: pd.DataFrame, chunk_stats: pd.DataFrame) -> pd.DataFrame:
+        """Combine two per-type partial aggregates"""
+        return pd.concat([running, chunk_stats]).groupby(level=0, sort=False).agg({
+            'fill_sum': 'sum',
+            'fill_count': 'sum',
+            'weighted_sum': 'sum',
+            'total_requests': 'sum',
+            'records_count': 'sum',
+            'min_fill_rate': 'min',
+            'max_fill_rate': 'max',
+        })
+    
     def _load_avails_data(self) -> pd.DataFrame:
         """Load and validate inventory availability data"""
         avails_path = self.data_dir / "all_avails.csv"
@@ -104,6 +618,10 @@ class RealDataLoader:
         if not avails_path.exists():
             raise FileNotFoundError(f"Avails data not found at {avails_path}")
         
+        cached = self._read_parsed_cache(avails_path)
+        if cached is not None:
+            return cached
+        
         df = pd.read_csv(avails_path)
         
         # Validate required columns
@@ -112,17 +630,214 @@ class RealDataLoader:
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
         
+        # Handle summary row
+        df = df[df['Category_Value'] != 'SUMMARY_TOTAL'].reset_index(drop=True)
+        
         # Parse categories (similar to fill data)
-        df['targeting_type'] = df['Category_Value'].str.split(':').str[0]
-        df['targeting_value'] = df['Category_Value'].str.split(':').str[1]
+        self._split_targeting_key(df, 'Category_Value')
+        df = self._compact_loaded_frame(avails_path, df)
         
-        # Handle summary row
-        df = df[df['Category_Value'] != 'SUMMARY_TOTAL']
+        self._write_parsed_cache(avails_path, df)
+        return self._attach_written_cache(avails_path, df)
+    
+    @staticmethod
+    def _split_targeting_key(df: pd.DataFrame, key_column: str):
+        """Split a 'type:value' key column into targeting_type / targeting_value in one pass"""
+        parts = df[key_column].str.split(':', n=1, expand=True)
+        df['targeting_type'] = parts[0]
+        df['targeting_value'] = parts[1] if parts.shape[1] > 1 else None
+    
+    @staticmethod
+    def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Shrink column dtypes in place
         
+        Object columns with at most CATEGORY_MAX_UNIQUE_RATIO distinct values per
+        row become categoricals (near-unique keys stay strings, where a category
+        would only add codes), integers take the smallest type holding the
+        column's absolute total and FLOAT32_COLUMNS become float32.
+        """
+        for col in df.columns:
+            series = df[col]
+            if series.dtype == object:
+                if len(series) and series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                    df[col] = series.astype('category')
+            elif pd.api.types.is_integer_dtype(series.dtype):
+                total = int(series.abs().sum())
+                for dtype in (np.int8, np.int16, np.int32):
+                    if total <= np.iinfo(dtype).max:
+                        if np.dtype(dtype).itemsize < series.dtype.itemsize:
+                            df[col] = series.astype(dtype)
+                        break
+            elif col in FLOAT32_COLUMNS and series.dtype == np.float64:
+                df[col] = series.astype(np.float32)
         return df
     
+    def _compact_loaded_frame(self, source_path: Path, df: pd.DataFrame) -> pd.DataFrame:
+        """Compact a parsed table's dtypes, recording its memory before and after"""
+        before = int(df.memory_usage(deep=True).sum())
+        df = self._compact_dtypes(df)
+        self.memory_usage[source_path.name] = {
+            'before_bytes': before,
+            'after_bytes': int(df.memory_usage(deep=True).sum()),
+        }
+        return df
+    
+    @staticmethod
+    def _parsed_cache_path(source_path: Path) -> Path:
+        """Location of the parsed Feather cache for a source CSV"""
+        return source_path.with_name(source_path.stem + PARSED_CACHE_SUFFIX)
+    
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """SHA-256 of a file, streamed in 1MB blocks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _read_parsed_cache(self, source_path: Path) -> Optional[pd.DataFrame]:
+        """
+        Load the parsed table for a CSV from its Feather cache if it is still valid
+        
+        The cache is keyed by source size, mtime and SHA-256. Size + mtime is the
+        fast path; when only the mtime moved (copy, checkout) the hash decides.
+        
+        Returns:
+            Parsed DataFrame, or None on a cache miss
+        """
+        if not self.use_parsed_cache:
+            return None
+        
+        cache_path = self._parsed_cache_path(source_path)
+        if not cache_path.exists():
+            return None
+        
+        try:
+            # The map stays open for as long as the frame's columns reference it
+            source = pa.memory_map(str(cache_path), 'r')
+            reader = pa.ipc.open_file(source)
+            raw_meta = (reader.schema.metadata or {}).get(PARSED_CACHE_METADATA_KEY)
+            if raw_meta is None:
+                return None
+            
+            meta = json.loads(raw_meta)
+            stat = source_path.stat()
+            if meta.get('version') != PARSED_CACHE_VERSION or meta.get('size') != stat.st_size:
+                return None
+            if meta.get('mtime_ns') != stat.st_mtime_ns and meta.get('sha256') != self._hash_file(source_path):
+                return None
+            if meta.get('memory'):
+                self.memory_usage[source_path.name] = meta['memory']
+            
+            # split_blocks keeps numeric columns as read-only views of the mapped
+            # file, so every worker shares one copy through the page cache
+            df = reader.read_all().to_pandas(split_blocks=True)
+            
+            self.shared_mappings.append(cache_path.name)
+            self.logger.info(f"⚡ Mapped parsed cache {cache_path.name}")
+            return df
+        except Exception as e:
+            self.logger.warning(f"⚠️ Ignoring unreadable parsed cache {cache_path}: {e}")
+            return None
+    
+    def _write_parsed_cache(self, source_path: Path, df: pd.DataFrame):
+        """Persist a parsed table next to its CSV (atomic replace, best effort)"""
+        if not self.use_parsed_cache:
+            return
+        
+        cache_path = self._parsed_cache_path(source_path)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        
+        try:
+            stat = source_path.stat()
+            meta = {
+                'version': PARSED_CACHE_VERSION,
+                'source': source_path.name,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': self._hash_file(source_path),
+                'memory': self.memory_usage.get(source_path.name),
+            }
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                PARSED_CACHE_METADATA_KEY: json.dumps(meta).encode(),
+            })
+            # Uncompressed so warm starts can memory-map the columns directly
+            feather.write_feather(table, str(tmp_path), compression='uncompressed')
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not write parsed cache {cache_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    def _attach_written_cache(self, source_path: Path, df: pd.DataFrame) -> pd.DataFrame:
+        """Swap a freshly parsed frame for the mapped view of the cache just written"""
+        mapped = self._read_parsed_cache(source_path)
+        return mapped if mapped is not None else df
+    
+    def _source_fingerprint(self) -> str:
+        """Identity of the fill/avails CSVs (size + mtime) for shared artifacts"""
+        parts = []
+        for name in ("day_fill.csv", "all_avails.csv"):
+            stat = (self.data_dir / name).stat()
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+    
+    def _attach_or_build_targeting_index(self) -> TargetingIndex:
+        """
+        Map the targeting index another worker already published for this data,
+        otherwise build it and publish it for the rest
+        """
+        if not self.use_parsed_cache:
+            return TargetingIndex.build(self.fill_data, self.avails_data)
+        
+        shared_path = self.data_dir / SHARED_INDEX_FILE
+        try:
+            fingerprint = self._source_fingerprint()
+        except OSError:
+            return TargetingIndex.build(self.fill_data, self.avails_data)
+        
+        if shared_path.exists():
+            try:
+                table = pa.ipc.open_file(pa.memory_map(str(shared_path), 'r')).read_all()
+                index = TargetingIndex.from_arrow(table, fingerprint)
+                if index is not None:
+                    self.shared_mappings.append(shared_path.name)
+                    self.logger.info(f"⚡ Mapped shared targeting index ({len(index)} keys)")
+                    return index
+            except Exception as e:
+                self.logger.warning(f"⚠️ Ignoring unreadable shared index {shared_path}: {e}")
+        
+        index = TargetingIndex.build(self.fill_data, self.avails_data)
+        tmp_path = shared_path.with_name(f"{shared_path.name}.{os.getpid()}.tmp")
+        try:
+            feather.write_feather(index.to_arrow(fingerprint), str(tmp_path), compression='uncompressed')
+            os.replace(tmp_path, shared_path)
+            table = pa.ipc.open_file(pa.memory_map(str(shared_path), 'r')).read_all()
+            mapped = TargetingIndex.from_arrow(table, fingerprint)
+            if mapped is not None:
+                self.shared_mappings.append(shared_path.name)
+                index = mapped
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not publish shared index {shared_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        return index
+    
     def _load_preferences_data(self) -> pd.DataFrame:
-        """Load advertiser preferences from parquet file"""
+        """
+        Open advertiser preferences from parquet file
+        
+        Only the (adomain, total_packets) lookup columns are materialised;
+        full advertiser rows are read on demand through preferences_dataset.
+        """
         prefs_path = self.data_dir / "resp.parquet"
         
         if not prefs_path.exists():
@@ -130,37 +845,67 @@ class RealDataLoader:
             return pd.DataFrame()
         
         try:
-            df = pd.read_parquet(prefs_path)
-            return df
+            # Imported here so the loader still works where pyarrow is unavailable
+            from advertiser_dataset import get_advertiser_dataset
+            self.preferences_dataset = get_advertiser_dataset(prefs_path)
+            if self.preferences_dataset is None:
+                return pd.DataFrame()
+            return self.preferences_dataset.read(columns=['adomain', 'total_packets'])
         except Exception as e:
             self.logger.warning(f"Could not load parquet file: {e}")
             return pd.DataFrame()
     
+    @staticmethod
+    def _group_value_maps(df: pd.DataFrame, indices: Dict[str, np.ndarray], metric_col: str) -> Dict[str, Dict[str, Any]]:
+        """Build per-type {targeting_value: metric} maps from precomputed group positions"""
+        values = df['targeting_value'].to_numpy()
+        metrics = df[metric_col].to_numpy()
+        return {
+            targeting_type: dict(zip(values[positions].tolist(), metrics[positions].tolist()))
+            for targeting_type, positions in indices.items()
+        }
+    
     def _process_fill_rates(self):
         """Process fill rate data into usable format"""
         if self.fill_data is None:
             return
         
-        # Group by targeting type for easy lookup
-        for targeting_type in self.fill_data['targeting_type'].unique():
-            type_data = self.fill_data[self.fill_data['targeting_type'] == targeting_type]
-            
-            self._processed_fill_rates[targeting_type] = {
-                'avg_fill_rate': type_data['fill_rate'].mean(),
-                'weighted_fill_rate': np.average(
-                    type_data['fill_rate'], 
-                    weights=type_data['request_count']
+        # One grouped pass over the table instead of a boolean mask per type
+        df = self.fill_data
+        # Aggregate in float64 even though fill_rate is stored as float32
+        fill_rate = df['fill_rate'].astype(np.float64)
+        grouped = df.assign(
+            _fill=fill_rate,
+            _weighted_fill=fill_rate * df['request_count']
+        ).groupby('targeting_type', sort=False, observed=True)
+        
+        if self._streamed_fill_stats is not None:
+            # Row-level stats were accumulated while streaming; fill_data is per key
+            streamed = self._streamed_fill_stats
+            stats = streamed.drop(columns=['fill_sum', 'fill_count']).assign(
+                avg_fill_rate=streamed['fill_sum'] / streamed['fill_count'].where(streamed['fill_count'] > 0)
+            )
+        else:
+            stats = grouped.agg(
+                avg_fill_rate=('_fill', 'mean'),
+                weighted_sum=('_weighted_fill', 'sum'),
+                total_requests=('request_count', 'sum'),
+                records_count=('_fill', 'size'),
+                min_fill_rate=('_fill', 'min'),
+                max_fill_rate=('_fill', 'max'),
+            )
+        by_value = self._group_value_maps(df, grouped.indices, 'fill_rate')
+        
+        for row in stats.itertuples():
+            self._processed_fill_rates[row.Index] = {
+                'avg_fill_rate': row.avg_fill_rate,
+                'weighted_fill_rate': (
+                    row.weighted_sum / row.total_requests if row.total_requests > 0 else row.avg_fill_rate
                 ),
-                'total_requests': type_data['request_count'].sum(),
-                'records_count': len(type_data),
-                'fill_rate_range': [
-                    type_data['fill_rate'].min(),
-                    type_data['fill_rate'].max()
-                ],
-                'by_value': dict(zip(
-                    type_data['targeting_value'], 
-                    type_data['fill_rate']
-                ))
+                'total_requests': int(row.total_requests),
+                'records_count': int(row.records_count),
+                'fill_rate_range': [row.min_fill_rate, row.max_fill_rate],
+                'by_value': by_value[row.Index]
             }
     
     def _process_inventory_data(self):
@@ -168,24 +913,61 @@ class RealDataLoader:
         if self.avails_data is None:
             return
         
-        # Group by targeting type
-        for targeting_type in self.avails_data['targeting_type'].unique():
-            type_data = self.avails_data[self.avails_data['targeting_type'] == targeting_type]
-            
-            self._inventory_by_category[targeting_type] = {
-                'total_inventory': type_data['Count'].sum(),
-                'avg_per_value': type_data['Count'].mean(),
-                'values_count': len(type_data),
-                'inventory_range': [
-                    type_data['Count'].min(),
-                    type_data['Count'].max()
-                ],
-                'by_value': dict(zip(
-                    type_data['targeting_value'], 
-                    type_data['Count']
-                ))
+        # One grouped pass over the table instead of a boolean mask per type
+        df = self.avails_data
+        grouped = df.groupby('targeting_type', sort=False, observed=True)
+        
+        stats = grouped.agg(
+            total_inventory=('Count', 'sum'),
+            avg_per_value=('Count', 'mean'),
+            values_count=('Count', 'size'),
+            min_count=('Count', 'min'),
+            max_count=('Count', 'max'),
+        )
+        by_value = self._group_value_maps(df, grouped.indices, 'Count')
+        
+        for row in stats.itertuples():
+            self._inventory_by_category[row.Index] = {
+                'total_inventory': int(row.total_inventory),
+                'avg_per_value': row.avg_per_value,
+                'values_count': int(row.values_count),
+                'inventory_range': [int(row.min_count), int(row.max_count)],
+                'by_value': by_value[row.Index]
             }
     
+    def _build_geo_rollups(self):
+        """Roll zip-level avails and fill up to zip3 / state / region"""
+        index = self._targeting_index
+        start, stop = index.type_bounds.get('zip', (0, 0))
+        self._geo_rollups = GeoRollups.build(
+            zip_values=index.values[start:stop],
+            avails=index.avails[start:stop],
+            request_count=index.request_count[start:stop],
+            fill_rate=index.fill_rate[start:stop],
+            has_fill=index.has_fill[start:stop]
+        )
+    
+    def get_geo_rollup(self, area: str, level: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Avails and request-weighted fill for a geographic area
+        
+        Args:
+            area: ZIP prefix ('902'), state code or name ('TX', 'Texas') or region ('West')
+            level: Optionally restrict to 'zip3', 'state' or 'region'
+        
+        Returns:
+            Rollup dict (avails, request_count, fill_rate, zip_count) or None if unknown
+        """
+        if self._geo_rollups is None:
+            return None
+        return self._geo_rollups.get(area, level)
+    
+    def list_geo_rollups(self, level: str = 'state') -> List[Dict[str, Any]]:
+        """All rollups for one level ('zip3', 'state' or 'region'), largest avails first"""
+        if self._geo_rollups is None or level not in GEO_LEVELS:
+            return []
+        return self._geo_rollups.list(level)
+    
     def get_fill_rate_for_targeting(self, targeting_type: str, targeting_value: str = None) -> float:
         """
         Get fill rate for specific targeting criteria
@@ -232,11 +1014,162 @@ class RealDataLoader:
             # Return average inventory for the targeting type
             return int(type_data['avg_per_value'])
     
+    def get_targeting_metrics(self, targeting_type: str, targeting_values: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Fill and inventory for many values of one type from one joined-table lookup
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'zip')
+            targeting_values: Values to resolve (e.g., thousands of uploaded zips)
+        
+        Returns:
+            Dict of per-value arrays: 'fill_rate' and 'inventory' with the same
+            fallbacks as the scalar lookups, plus the raw request_count,
+            summary_value, avails, has_fill and has_avails columns
+        """
+        targeting_values = list(targeting_values)
+        size = len(targeting_values)
+        
+        if self._targeting_index is not None:
+            metrics = self._targeting_index.metrics(targeting_type, targeting_values)
+        else:
+            metrics = {
+                'request_count': np.zeros(size, dtype=np.int64),
+                'fill_rate': np.full(size, np.nan, dtype=np.float64),
+                'summary_value': np.zeros(size, dtype=np.int64),
+                'avails': np.zeros(size, dtype=np.int64),
+                'has_fill': np.zeros(size, dtype=bool),
+                'has_avails': np.zeros(size, dtype=bool),
+            }
+        
+        if targeting_type in self._processed_fill_rates:
+            fill_fallback = self._processed_fill_rates[targeting_type]['weighted_fill_rate']
+            has_fill = metrics['has_fill']
+        else:
+            fill_fallback = self.get_overall_fill_rate()
+            has_fill = np.zeros(size, dtype=bool)
+        metrics['fill_rate'] = np.where(has_fill, metrics['fill_rate'], fill_fallback).astype(np.float64)
+        
+        if targeting_type in self._inventory_by_category:
+            inventory_fallback = int(self._inventory_by_category[targeting_type]['avg_per_value'])
+            has_avails = metrics['has_avails']
+        else:
+            inventory_fallback = int(self.get_total_inventory() * 0.01)
+            has_avails = np.zeros(size, dtype=bool)
+        metrics['inventory'] = np.where(has_avails, metrics['avails'], inventory_fallback).astype(np.int64)
+        
+        return metrics
+    
+    def get_fill_rates_for_targeting_values(self, targeting_type: str, targeting_values: List[str]) -> np.ndarray:
+        """
+        Batch version of get_fill_rate_for_targeting
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'zip')
+            targeting_values: Values to resolve (e.g., thousands of uploaded zips)
+        
+        Returns:
+            Fill rate per value, with the same fallbacks as the scalar lookup
+        """
+        return self.get_targeting_metrics(targeting_type, targeting_values)['fill_rate']
+    
+    def get_inventory_for_targeting_values(self, targeting_type: str, targeting_values: List[str]) -> np.ndarray:
+        """
+        Batch version of get_inventory_for_targeting
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'zip')
+            targeting_values: Values to resolve (e.g., thousands of uploaded zips)
+        
+        Returns:
+            Available inventory per value, with the same fallbacks as the scalar lookup
+        """
+        return self.get_targeting_metrics(targeting_type, targeting_values)['inventory']
+    
+    def get_targeting_type_summary(self, targeting_type: str) -> Dict[str, Any]:
+        """
+        Type-level fill rate and inventory in one lookup
+        
+        Returns:
+            Dict with 'fill_rate' and 'inventory', matching get_fill_rate_for_targeting
+            and get_inventory_for_targeting called without a value
+        """
+        fill = self._processed_fill_rates.get(targeting_type)
+        inventory = self._inventory_by_category.get(targeting_type)
+        return {
+            'fill_rate': fill['weighted_fill_rate'] if fill else self.get_overall_fill_rate(),
+            'inventory': int(inventory['avg_per_value']) if inventory else int(self.get_total_inventory() * 0.01),
+        }
+    
+    @property
+    def history_store(self):
+        """FillHistoryStore for trailing-window queries, or None without pyarrow"""
+        if self._history_store is None and pa is not None:
+            # Imported here so the loader still works where pyarrow is unavailable
+            from fill_history import FillHistoryStore
+            self._history_store = FillHistoryStore(self.data_dir / "history")
+        return self._history_store
+    
+    def get_fill_rate_for_window(self,
+                                 targeting_type: str,
+                                 targeting_value: str,
+                                 start_date,
+                                 end_date) -> float:
+        """
+        Request-weighted fill rate for one key across stored daily snapshots
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'network')
+            targeting_value: Specific value (e.g., 'aetv')
+            start_date: First day of the window (date or ISO string, inclusive)
+            end_date: Last day of the window (date or ISO string, inclusive)
+        
+        Returns:
+            Fill rate over the window, or the current snapshot's rate when
+            the history has no requests for the key (or is unavailable)
+        """
+        if self.history_store is None:
+            return self.get_fill_rate_for_targeting(targeting_type, targeting_value)
+        totals = self.history_store.window_totals(targeting_type, [targeting_value], start_date, end_date)
+        requests = int(totals['request_count'][0])
+        if requests > 0:
+            return float(totals['summary_value'][0] / requests)
+        return self.get_fill_rate_for_targeting(targeting_type, targeting_value)
+    
+    def get_inventory_for_window(self,
+                                 targeting_type: str,
+                                 targeting_value: str,
+                                 start_date,
+                                 end_date) -> int:
+        """
+        Total avails for one key summed across stored daily snapshots
+        
+        Args:
+            targeting_type: Type of targeting (e.g., 'zip')
+            targeting_value: Specific value (e.g., '90210')
+            start_date: First day of the window (date or ISO string, inclusive)
+            end_date: Last day of the window (date or ISO string, inclusive)
+        
+        Returns:
+            Avails over the window, or the current snapshot's inventory when
+            no stored day has the key (or the history is unavailable)
+        """
+        if self.history_store is None:
+            return self.get_inventory_for_targeting(targeting_type, targeting_value)
+        totals = self.history_store.window_totals(targeting_type, [targeting_value], start_date, end_date)
+        if totals['days_present'][0] > 0:
+            return int(totals['avails'][0])
+        return self.get_inventory_for_targeting(targeting_type, targeting_value)
+    
     def get_overall_fill_rate(self) -> float:
         """Get overall weighted fill rate across all targeting"""
         if self.fill_data is None:
             return 0.12  # Fallback to 12%
         
+        if self._overall_fill_rate is not None:
+            # Streamed loads keep row-level totals; fill_data is one row per key
+            return self._overall_fill_rate
+        
         return np.average(
             self.fill_data['fill_rate'], 
             weights=self.fill_data['request_count']
@@ -251,14 +1184,40 @@ class RealDataLoader:
     
     def get_targeting_options(self) -> Dict[str, List[str]]:
         """Get all available targeting options"""
-        options = {}
+        if self._targeting_catalog is None:
+            return {}
         
-        if self.fill_data is not None:
-            for targeting_type in self.fill_data['targeting_type'].unique():
-                type_data = self.fill_data[self.fill_data['targeting_type'] == targeting_type]
-                options[targeting_type] = sorted(type_data['targeting_value'].unique().tolist())
+        return {
+            targeting_type: values.tolist()
+            for targeting_type, values in self._targeting_catalog.options.items()
+        }
+    
+    def search_targeting_options(self,
+                                 targeting_type: str,
+                                 prefix: str = '',
+                                 limit: int = 50,
+                                 offset: int = 0) -> Dict[str, Any]:
+        """
+        Paginated prefix search over targeting values for UI typeahead
         
-        return options
+        Args:
+            targeting_type: Type of targeting (e.g., 'zip', 'genre')
+            prefix: Case-insensitive leading characters ('' lists everything)
+            limit: Page size
+            offset: Position within the matches (from a previous next_offset)
+        
+        Returns:
+            Dict with 'values', 'total_matches' and 'next_offset'
+        """
+        if self._targeting_catalog is None:
+            return {'values': [], 'total_matches': 0, 'next_offset': None}
+        return self._targeting_catalog.search(targeting_type, prefix, limit, offset)
+    
+    def get_targeting_option_counts(self) -> Dict[str, int]:
+        """Number of available values per targeting type"""
+        if self._targeting_catalog is None:
+            return {}
+        return self._targeting_catalog.counts()
     
     def get_forecasting_data_for_campaign(self, 
                                         targeting_criteria: Dict[str, List[str]], 
@@ -275,11 +1234,18 @@ class RealDataLoader:
         Returns:
             Forecasting data structure for use by ForecastingAgent
         """
+        # One joined-table lookup per targeted type serves both fill and inventory
+        metrics = {
+            target_type: self.get_targeting_metrics(target_type, values)
+            for target_type, values in targeting_criteria.items()
+            if values and target_type not in GEO_ROLLUP_TARGETING_TYPES
+        }
+        
         # Calculate combined fill rate based on targeting
-        combined_fill_rate = self._calculate_combined_fill_rate(targeting_criteria)
+        combined_fill_rate = self._calculate_combined_fill_rate(targeting_criteria, metrics)
         
         # Calculate available inventory
-        available_inventory = self._calculate_available_inventory(targeting_criteria)
+        available_inventory = self._calculate_available_inventory(targeting_criteria, metrics)
         
         # Estimate CPM based on targeting selectivity
         estimated_cpm = self._estimate_cpm(targeting_criteria)
@@ -290,19 +1256,25 @@ class RealDataLoader:
             'estimated_cpm': estimated_cpm,
             'confidence_score': self._calculate_confidence(targeting_criteria),
             'weekly_distribution': self._distribute_inventory_weekly(
-                available_inventory, timeline_weeks
+                available_inventory, timeline_weeks,
+                seed=stable_seed(normalize_targeting_criteria(targeting_criteria), int(timeline_weeks))
             ),
             'targeting_breakdown': {
-                target_type: {
-                    'fill_rate': self.get_fill_rate_for_targeting(target_type),
-                    'inventory': self.get_inventory_for_targeting(target_type)
-                }
+                target_type: self.get_targeting_type_summary(target_type)
                 for target_type in targeting_criteria.keys()
             }
         }
     
-    def _calculate_combined_fill_rate(self, targeting_criteria: Dict[str, List[str]]) -> float:
-        """Calculate combined fill rate for multiple targeting criteria"""
+    def _calculate_combined_fill_rate(self, targeting_criteria: Dict[str, List[str]],
+                                      metrics: Optional[Dict[str, Dict[str, np.ndarray]]] = None) -> float:
+        """
+        Calculate combined fill rate for multiple targeting criteria
+        
+        Args:
+            targeting_criteria: Dict of targeting types and their values
+            metrics: Per-type get_targeting_metrics results already looked up
+        """
+        metrics = metrics or {}
         if not targeting_criteria:
             return self.get_overall_fill_rate()
         
@@ -311,11 +1283,17 @@ class RealDataLoader:
         weights = []
         
         for target_type, values in targeting_criteria.items():
-            if values:  # If specific values are targeted
-                avg_fill_rate = np.mean([
-                    self.get_fill_rate_for_targeting(target_type, value) 
-                    for value in values
-                ])
+            if values and target_type in GEO_ROLLUP_TARGETING_TYPES:
+                rollups = [self.get_geo_rollup(value) for value in values]
+                fill_rates.append(np.mean([
+                    rollup['fill_rate'] if rollup and rollup['fill_rate'] is not None
+                    else self.get_fill_rate_for_targeting(target_type)
+                    for rollup in rollups
+                ]))
+                weights.append(len(values))
+            elif values:  # If specific values are targeted
+                type_metrics = metrics.get(target_type) or self.get_targeting_metrics(target_type, values)
+                avg_fill_rate = type_metrics['fill_rate'].mean()
                 fill_rates.append(avg_fill_rate)
                 weights.append(len(values))  # More values = higher weight
             else:
@@ -327,8 +1305,16 @@ class RealDataLoader:
         
         return np.average(fill_rates, weights=weights)
     
-    def _calculate_available_inventory(self, targeting_criteria: Dict[str, List[str]]) -> int:
-        """Calculate available inventory for targeting criteria"""
+    def _calculate_available_inventory(self, targeting_criteria: Dict[str, List[str]],
+                                       metrics: Optional[Dict[str, Dict[str, np.ndarray]]] = None) -> int:
+        """
+        Calculate available inventory for targeting criteria
+        
+        Args:
+            targeting_criteria: Dict of targeting types and their values
+            metrics: Per-type get_targeting_metrics results already looked up
+        """
+        metrics = metrics or {}
         if not targeting_criteria:
             return self.get_total_inventory()
         
@@ -336,11 +1322,15 @@ class RealDataLoader:
         min_inventory = float('inf')
         
         for target_type, values in targeting_criteria.items():
-            if values:
-                total_for_type = sum([
-                    self.get_inventory_for_targeting(target_type, value) 
-                    for value in values
-                ])
+            if values and target_type in GEO_ROLLUP_TARGETING_TYPES:
+                rollups = [self.get_geo_rollup(value) for value in values]
+                total_for_type = sum(
+                    rollup['avails'] if rollup else self.get_inventory_for_targeting(target_type)
+                    for rollup in rollups
+                )
+            elif values:
+                type_metrics = metrics.get(target_type) or self.get_targeting_metrics(target_type, values)
+                total_for_type = int(type_metrics['inventory'].sum())
             else:
                 total_for_type = self._inventory_by_category.get(
                     target_type, {}
@@ -385,13 +1375,26 @@ class RealDataLoader:
         
         return np.mean(confidence_scores) if confidence_scores else 0.75
     
-    def _distribute_inventory_weekly(self, total_inventory: int, weeks: int) -> List[float]:
-        """Distribute inventory across weeks with realistic patterns"""
+    def _distribute_inventory_weekly(self, total_inventory: int, weeks: int,
+                                     seed: Optional[int] = None) -> List[float]:
+        """
+        Distribute inventory across weeks with realistic patterns
+        
+        Args:
+            total_inventory: Inventory to spread over the campaign
+            weeks: Number of weeks
+            seed: Seed for the weekly variation; derived from the inputs when omitted
+                  so identical requests always get the same curve
+        """
+        if seed is None:
+            seed = stable_seed(int(total_inventory), int(weeks))
+        rng = np.random.default_rng(seed)
+        
         # Simulate weekly variation (some weeks have more inventory)
         weekly_multipliers = []
-        for week in range(weeks):
+        for week, jitter in enumerate(rng.uniform(-0.1, 0.1, size=max(weeks, 0))):
             # Slight random variation around 1.0
-            multiplier = 0.85 + (week % 2) * 0.3 + np.random.uniform(-0.1, 0.1)
+            multiplier = 0.85 + (week % 2) * 0.3 + jitter
             weekly_multipliers.append(max(0.5, min(1.5, multiplier)))
         
         # Normalize to ensure total equals expected
@@ -405,6 +1408,9 @@ class RealDataLoader:
         summary = {
             'data_loaded': self.fill_data is not None and self.avails_data is not None,
             'load_timestamp': datetime.now().isoformat(),
+            'snapshot_version': self.snapshot_version,
+            'snapshot_loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'shared_mappings': list(self.shared_mappings),
         }
         
         if self.fill_data is not None:
@@ -422,28 +1428,155 @@ class RealDataLoader:
                 'targeting_categories': self.avails_data['targeting_type'].nunique()
             }
         
-        if not self.preferences_data.empty:
+        if self.memory_usage:
+            summary['memory_usage'] = {
+                name: {
+                    'before_mb': round(usage['before_bytes'] / 1_048_576, 2),
+                    'after_mb': round(usage['after_bytes'] / 1_048_576, 2),
+                    'saved_percent': round(
+                        100 * (1 - usage['after_bytes'] / usage['before_bytes']), 1
+                    ) if usage['before_bytes'] else 0.0,
+                }
+                for name, usage in self.memory_usage.items()
+            }
+        
+        if self.preferences_data is not None and not self.preferences_data.empty:
             summary['preferences_data'] = {
                 'records': len(self.preferences_data),
-                'columns': list(self.preferences_data.columns)
+                'columns': (
+                    self.preferences_dataset.column_names if self.preferences_dataset is not None
+                    else list(self.preferences_data.columns)
+                )
             }
         
         return summary
 
 
-# Global instance for use across the application
+# Global instance for use across the application.
+# The active loader is treated as an immutable snapshot: reloads build a fresh
+# RealDataLoader off to the side and swap the reference in one assignment, so
+# callers holding the previous snapshot keep a consistent view.
 _real_data_loader = None
+_snapshot_lock = threading.Lock()
+_snapshot_versions = itertools.count(1)
 
-def get_real_data_loader() -> RealDataLoader:
-    """Get singleton instance of the real data loader"""
+logger = logging.getLogger(__name__)
+
+def _publish_snapshot(loader: RealDataLoader):
+    """Atomically make a fully loaded snapshot the active one"""
     global _real_data_loader
-    if _real_data_loader is None:
-        _real_data_loader = RealDataLoader()
-        _real_data_loader.load_all_data()
-    return _real_data_loader
+    loader.snapshot_version = next(_snapshot_versions)
+    _real_data_loader = loader
+
+def get_real_data_loader() -> RealDataLoader:
+    """Get the active real data snapshot, loading it on first use"""
+    loader = _real_data_loader
+    if loader is not None:
+        return loader
+    
+    with _snapshot_lock:
+        if _real_data_loader is None:
+            loader = RealDataLoader()
+            loader.load_all_data()
+            _publish_snapshot(loader)
+        return _real_data_loader
 
 def initialize_real_data(data_directory: str = None) -> bool:
-    """Initialize the real data loader with custom directory"""
-    global _real_data_loader
-    _real_data_loader = RealDataLoader(data_directory)
-    return _real_data_loader.load_all_data()
+    """
+    Load a new snapshot and swap it in once every derived index is built
+    
+    A failed load keeps the current snapshot active (if there is one).
+    """
+    with _snapshot_lock:
+        loader = RealDataLoader(data_directory)
+        success = loader.load_all_data()
+        
+        if success or _real_data_loader is None:
+            _publish_snapshot(loader)
+            logger.info(f"🔁 Real data snapshot v{loader.snapshot_version} active ({loader.data_dir})")
+        else:
+            logger.warning(f"⚠️ Reload from {loader.data_dir} failed, keeping snapshot v{_real_data_loader.snapshot_version}")
+        
+        return success
+
+def reload_real_data_in_background(data_directory: str = None) -> threading.Thread:
+    """Start initialize_real_data on a daemon thread and return the thread"""
+    thread = threading.Thread(
+        target=initialize_real_data,
+        args=(data_directory,),
+        name="real-data-reload",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+class RealDataSnapshotWatcher:
+    """
+    Polls the data directory and reloads the snapshot when the source files change
+    
+    Change detection uses (size, mtime) of the fill and avails CSVs, so a new
+    daily drop copied over the old files is picked up without a restart.
+    """
+    
+    WATCHED_FILES = ("day_fill.csv", "all_avails.csv")
+    
+    def __init__(self, data_directory: str = None, interval_seconds: float = 60.0):
+        if data_directory is None:
+            self.data_dir = Path(__file__).parent / "data" / "real_data"
+        else:
+            self.data_dir = Path(data_directory)
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_signature = None
+    
+    def _signature(self) -> Tuple:
+        signature = []
+        for name in self.WATCHED_FILES:
+            path = self.data_dir / name
+            try:
+                stat = path.stat()
+                signature.append((name, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append((name, None, None))
+        return tuple(signature)
+    
+    def check_once(self) -> bool:
+        """Reload synchronously if the files changed since the last check"""
+        signature = self._signature()
+        if self._last_signature is None:
+            self._last_signature = signature
+            return False
+        if signature == self._last_signature:
+            return False
+        
+        logger.info(f"📂 Detected new real data in {self.data_dir}, reloading snapshot")
+        # Only advance the signature on success so a half-copied drop is retried
+        if initialize_real_data(str(self.data_dir)):
+            self._last_signature = signature
+            return True
+        return False
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"❌ Real data watcher error: {e}")
+    
+    def start(self):
+        """Start polling on a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._last_signature = self._signature()
+        self._thread = threading.Thread(target=self._run, name="real-data-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop polling"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds)
+            self._thread = None
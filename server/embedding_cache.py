@@ -0,0 +1,122 @@
+"""
+Persistent Embedding Cache for Neural Ads CTV Platform
+Content-hash keyed sentence embeddings stored on disk, so re-ingesting the
+vector DB only runs the encoder for text it has never seen
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    text hash -> embedding vector, persisted as one .npz file per model
+
+    Keys are SHA-256 of the model name and text, so a model change never
+    serves stale vectors. Writes are atomic (temp file + os.replace).
+    """
+
+    def __init__(self, cache_path: Union[str, Path], model_name: str):
+        """
+        Initialize the cache (the file is read on first use)
+
+        Args:
+            cache_path: .npz file holding the cached vectors
+            model_name: Sentence transformer model the vectors come from
+        """
+        self.path = Path(cache_path)
+        self.model_name = model_name
+        self._vectors: Optional[Dict[str, np.ndarray]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        """Content hash for one document"""
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode('utf-8')).hexdigest()
+
+    def _load(self) -> Dict[str, np.ndarray]:
+        if self._vectors is not None:
+            return self._vectors
+
+        self._vectors = {}
+        if self.path.exists():
+            try:
+                with np.load(self.path, allow_pickle=False) as data:
+                    keys, vectors = data['keys'], data['vectors']
+                self._vectors = {str(key): vectors[i] for i, key in enumerate(keys)}
+                logger.info(f"Loaded {len(self._vectors)} cached embeddings from {self.path}")
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable embedding cache {self.path}: {e}")
+        return self._vectors
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embeddings for texts, calling encoder only for cache misses
+
+        Args:
+            texts: Documents to embed
+            encoder: Batch encoder (e.g. SentenceTransformer.encode) for the misses
+
+        Returns:
+            float32 matrix with one row per text
+        """
+        with self._lock:
+            vectors = self._load()
+            keys = [self.key(text) for text in texts]
+            missing = [i for i, key in enumerate(keys) if key not in vectors]
+
+            if missing:
+                encoded = np.asarray(encoder([texts[i] for i in missing]), dtype=np.float32)
+                for row, i in enumerate(missing):
+                    vectors[keys[i]] = encoded[row]
+                self._dirty = True
+
+            if not texts:
+                return np.zeros((0, 0), dtype=np.float32)
+            return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+
+    def retain(self, texts: Iterable[str]):
+        """Drop cached vectors for any text not in texts (keeps the file bounded)"""
+        with self._lock:
+            vectors = self._load()
+            keep = {self.key(text) for text in texts}
+            stale = [key for key in vectors if key not in keep]
+            for key in stale:
+                del vectors[key]
+            if stale:
+                self._dirty = True
+
+    def save(self):
+        """Persist the cache if it changed"""
+        with self._lock:
+            if not self._dirty or self._vectors is None:
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            keys = np.array(list(self._vectors), dtype=str)
+            vectors = (
+                np.stack(list(self._vectors.values())).astype(np.float32)
+                if self._vectors else np.zeros((0, 0), dtype=np.float32)
+            )
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp.npz")
+            try:
+                np.savez(tmp_path, keys=keys, vectors=vectors)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.warning(f"Could not write embedding cache {self.path}: {e}")
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,162 @@
+"""
+Embedding Service for Neural Ads CTV Platform
+Background worker that coalesces concurrent query-encode requests into
+micro-batches, so request handlers never run the sentence transformer on the
+event loop and concurrent searches share one forward pass
+"""
+
+import os
+import queue
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Most texts encoded in one forward pass, and how long the first request in a
+# batch waits for company before the batch is dispatched
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "2"))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for a batch encoder
+
+    submit() queues one text and returns a Future; a dispatcher thread groups
+    queued texts into batches of up to max_batch_size (waiting at most
+    max_wait_ms after the first) and runs them on a small worker pool. While
+    every worker is busy the dispatcher holds the batch open, so batches grow
+    with load instead of queueing up behind each other. Duplicate texts within
+    a batch are encoded once.
+    """
+
+    def __init__(self,
+                 encoder: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+                 max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+                 workers: int = EMBEDDING_WORKERS):
+        """
+        Start the dispatcher and worker pool
+
+        Args:
+            encoder: Batch encoder, e.g. SentenceTransformer.encode
+            max_batch_size: Most texts per encoder call
+            max_wait_ms: Longest a queued text waits for the batch to fill
+            workers: Threads running encoder calls
+        """
+        self.encoder = encoder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="embedding-worker")
+        self._free_workers = threading.Semaphore(max(1, workers))
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._largest_batch = 0
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-batcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the Future resolves to its float32 embedding"""
+        if self._closed:
+            raise RuntimeError("Embedding service is shut down")
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Blocking batch encode through the shared queue (one row per text)"""
+        futures = [self.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures]) if futures else np.zeros((0, 0), dtype=np.float32)
+
+    async def encode_async(self, text: str) -> np.ndarray:
+        """Awaitable embedding for one text, without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _dispatch(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            # Keep collecting until a worker can take the batch
+            self._free_workers.acquire()
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._executor.submit(self._run_batch, batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[tuple]):
+        try:
+            self._encode_batch(batch)
+        finally:
+            self._free_workers.release()
+
+    def _encode_batch(self, batch: List[tuple]):
+        pending = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+
+        texts = list(dict.fromkeys(text for text, _ in pending))
+        try:
+            vectors = np.asarray(self.encoder(texts), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        rows = {text: row for row, text in enumerate(texts)}
+        for text, future in pending:
+            future.set_result(vectors[rows[text]])
+
+        with self._stats_lock:
+            self._batches += 1
+            self._texts += len(pending)
+            self._largest_batch = max(self._largest_batch, len(pending))
+
+    def stats(self) -> Dict[str, float]:
+        """Batches run, texts served and batching efficiency so far"""
+        with self._stats_lock:
+            return {
+                'batches': self._batches,
+                'texts': self._texts,
+                'largest_batch': self._largest_batch,
+                'avg_batch_size': self._texts / self._batches if self._batches else 0.0,
+                'queued': self._queue.qsize()
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work, flush queued texts and stop the workers"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        if wait:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,299 @@
+"""
+Time-partitioned fill rate / avails history for Neural Ads CTV Platform
+Keeps N dated daily snapshots as memory-mapped Arrow partitions and answers
+trailing-window questions with vectorized reductions across partitions
+"""
+
+import os
+import re
+import shutil
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "date="
+PARTITION_FILE = "metrics.arrow"
+
+# "Fill Data (8.19.25, 11.02 AM)" -> 2025-08-19
+_EXPORT_DATE_PATTERN = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{2,4})")
+
+DateLike = Union[date, datetime, str]
+
+
+def _to_date(value: DateLike) -> date:
+    """Normalize a date, datetime or ISO string to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def infer_snapshot_date(directory: Union[str, Path]) -> date:
+    """
+    Work out which day an export directory holds
+
+    Uses the M.D.YY stamp in export folder names when present, otherwise the
+    mtime of the fill CSV.
+    """
+    directory = Path(directory)
+    match = _EXPORT_DATE_PATTERN.search(directory.name)
+    if match:
+        month, day, year = (int(part) for part in match.groups())
+        if year < 100:
+            year += 2000
+        return date(year, month, day)
+
+    fill_path = directory / "day_fill.csv"
+    return datetime.fromtimestamp(fill_path.stat().st_mtime).date()
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """(inode, mtime) of a file, or None when it is gone"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class _Partition:
+    """One dated snapshot, memory-mapped from disk"""
+
+    def __init__(self, snapshot_date: date, path: Path):
+        self.snapshot_date = snapshot_date
+        self.path = path
+        # Identifies the file version this mapping reads; other processes replace partitions atomically
+        self.signature = _file_signature(path)
+
+        # Numeric columns are zero-copy views into the mapped file
+        self._source = pa.memory_map(str(path), 'r')
+        table = pa.ipc.open_file(self._source).read_all()
+        self.request_count = table.column('request_count').to_numpy()
+        self.summary_value = table.column('summary_value').to_numpy()
+        self.avails = table.column('avails').to_numpy()
+        self._keys = table.column('key')
+        self._key_index: Optional[pd.Index] = None
+
+    @property
+    def key_index(self) -> pd.Index:
+        """Hash index over the partition's keys, built on first query"""
+        if self._key_index is None:
+            self._key_index = pd.Index(self._keys.to_pylist())
+        return self._key_index
+
+    def close(self):
+        self._source.close()
+
+
+class FillHistoryStore:
+    """
+    Partitioned store of daily fill/avails snapshots
+
+    Each partition lives in <root>/date=YYYY-MM-DD/metrics.arrow as an
+    uncompressed Arrow file with one row per 'type:value' key holding
+    request_count, summary_value (filled requests) and avails. Only the
+    newest max_partitions days are retained.
+    """
+
+    def __init__(self, root_directory: Union[str, Path], max_partitions: int = 30):
+        """
+        Initialize the store
+
+        Args:
+            root_directory: Directory holding the date=... partitions
+            max_partitions: Number of most recent snapshots to keep
+        """
+        self.root = Path(root_directory)
+        self.max_partitions = max_partitions
+        self._partitions: Dict[date, _Partition] = {}
+
+    def list_partitions(self) -> List[date]:
+        """Dates with a stored snapshot, oldest first"""
+        if not self.root.exists():
+            return []
+
+        dates = []
+        for entry in self.root.iterdir():
+            if entry.name.startswith(PARTITION_PREFIX) and (entry / PARTITION_FILE).exists():
+                try:
+                    dates.append(date.fromisoformat(entry.name[len(PARTITION_PREFIX):]))
+                except ValueError:
+                    continue
+
+        # Release mappings of partitions deleted elsewhere (e.g. retention in the CLI)
+        for stale in set(self._partitions) - set(dates):
+            self._close_partition(stale)
+        return sorted(dates)
+
+    def _partition_dir(self, snapshot_date: date) -> Path:
+        return self.root / f"{PARTITION_PREFIX}{snapshot_date.isoformat()}"
+
+    def add_snapshot(self, snapshot_date: DateLike, fill_data: pd.DataFrame, avails_data: pd.DataFrame):
+        """
+        Write a parsed snapshot as a partition (replacing any for the same day)
+
+        Args:
+            snapshot_date: Day the snapshot covers
+            fill_data: Parsed fill frame (field_combination, summary_value, request_count)
+            avails_data: Parsed avails frame (Category_Value, Count)
+        """
+        snapshot_date = _to_date(snapshot_date)
+
+        fill = (
+            fill_data[['field_combination', 'request_count', 'summary_value']]
+            .rename(columns={'field_combination': 'key'})
+            .groupby('key', sort=False).sum()
+        )
+        avails = (
+            avails_data[['Category_Value', 'Count']]
+            .rename(columns={'Category_Value': 'key', 'Count': 'avails'})
+            .groupby('key', sort=False).sum()
+        )
+        joined = fill.join(avails, how='outer').fillna(0).sort_index()
+
+        table = pa.table({
+            'key': pa.array(joined.index.astype(str), type=pa.string()),
+            'request_count': pa.array(joined['request_count'].to_numpy(dtype=np.int64)),
+            'summary_value': pa.array(joined['summary_value'].to_numpy(dtype=np.int64)),
+            'avails': pa.array(joined['avails'].to_numpy(dtype=np.int64)),
+        })
+
+        partition_dir = self._partition_dir(snapshot_date)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+
+        self._close_partition(snapshot_date)
+        tmp_path = partition_dir / f"{PARTITION_FILE}.{os.getpid()}.tmp"
+        feather.write_feather(table, str(tmp_path), compression='uncompressed')
+        os.replace(tmp_path, partition_dir / PARTITION_FILE)
+
+        logger.info(f"🗂️ Stored fill snapshot for {snapshot_date} ({len(joined)} keys)")
+        self._apply_retention()
+
+    def ingest_directory(self, directory: Union[str, Path], snapshot_date: Optional[DateLike] = None) -> date:
+        """
+        Parse an export directory (day_fill.csv + all_avails.csv) into a partition
+
+        Args:
+            directory: Export directory, e.g. 'Fill Data (8.19.25, 11.02 AM)'
+            snapshot_date: Day the export covers (inferred from the name if omitted)
+
+        Returns:
+            Date of the stored partition
+        """
+        from data_loader import RealDataLoader
+
+        snapshot_date = _to_date(snapshot_date) if snapshot_date else infer_snapshot_date(directory)
+        loader = RealDataLoader(str(directory), use_parsed_cache=False)
+        self.add_snapshot(snapshot_date, loader._load_fill_data(), loader._load_avails_data())
+        return snapshot_date
+
+    def _close_partition(self, snapshot_date: date):
+        partition = self._partitions.pop(snapshot_date, None)
+        if partition is not None:
+            partition.close()
+
+    def _apply_retention(self):
+        """Drop the oldest partitions beyond max_partitions"""
+        dates = self.list_partitions()
+        for stale in dates[:max(0, len(dates) - self.max_partitions)]:
+            self._close_partition(stale)
+            shutil.rmtree(self._partition_dir(stale), ignore_errors=True)
+            logger.info(f"🧹 Dropped fill snapshot for {stale}")
+
+    def _get_partition(self, snapshot_date: date) -> Optional[_Partition]:
+        """
+        Mapped partition for a date, reopened if the file was replaced since
+        it was mapped; None (and the mapping released) if it was deleted
+        """
+        path = self._partition_dir(snapshot_date) / PARTITION_FILE
+        signature = _file_signature(path)
+        partition = self._partitions.get(snapshot_date)
+        if partition is not None and partition.signature != signature:
+            self._close_partition(snapshot_date)
+            partition = None
+        if partition is None and signature is not None:
+            try:
+                partition = _Partition(snapshot_date, path)
+            except FileNotFoundError:
+                return None
+            self._partitions[snapshot_date] = partition
+        return partition
+
+    def partitions_in_window(self, start_date: DateLike, end_date: DateLike) -> List[date]:
+        """Stored dates within [start_date, end_date], inclusive"""
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        return [d for d in self.list_partitions() if start_date <= d <= end_date]
+
+    def window_totals(self,
+                      targeting_type: str,
+                      targeting_values: List[str],
+                      start_date: DateLike,
+                      end_date: DateLike) -> Dict[str, np.ndarray]:
+        """
+        Sum metrics for many keys over a date window
+
+        Args:
+            targeting_type: Type of targeting (e.g., 'network')
+            targeting_values: Values of that type to aggregate
+            start_date: First day of the window (inclusive)
+            end_date: Last day of the window (inclusive)
+
+        Returns:
+            Dict of per-value arrays: request_count, summary_value, avails,
+            days_present, plus the window's partition count under 'days'
+        """
+        keys = pd.Index([f"{targeting_type}:{value}" for value in targeting_values])
+        partitions = [
+            partition for partition in map(self._get_partition, self.partitions_in_window(start_date, end_date))
+            if partition is not None
+        ]
+
+        shape = (len(partitions), len(keys))
+        request_count = np.zeros(shape, dtype=np.int64)
+        summary_value = np.zeros(shape, dtype=np.int64)
+        avails = np.zeros(shape, dtype=np.int64)
+        present = np.zeros(shape, dtype=bool)
+
+        for row, partition in enumerate(partitions):
+            positions = partition.key_index.get_indexer(keys)
+            hits = positions >= 0
+            rows = positions[hits]
+            request_count[row, hits] = partition.request_count[rows]
+            summary_value[row, hits] = partition.summary_value[rows]
+            avails[row, hits] = partition.avails[rows]
+            present[row, hits] = True
+
+        return {
+            'request_count': request_count.sum(axis=0),
+            'summary_value': summary_value.sum(axis=0),
+            'avails': avails.sum(axis=0),
+            'days_present': present.sum(axis=0),
+            'days': np.int64(len(partitions)),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Store a fill data export as a dated history partition")
+    parser.add_argument("directory", help="Directory containing day_fill.csv and all_avails.csv")
+    parser.add_argument("--date", help="Snapshot date (YYYY-MM-DD); inferred from the folder name if omitted")
+    parser.add_argument("--store", default=str(Path(__file__).parent / "data" / "real_data" / "history"),
+                        help="History store root directory")
+    parser.add_argument("--keep", type=int, default=30, help="Number of snapshots to retain")
+    args = parser.parse_args()
+
+    store = FillHistoryStore(args.store, max_partitions=args.keep)
+    stored = store.ingest_directory(args.directory, args.date)
+    print(f"✅ Stored snapshot {stored}; partitions: {[d.isoformat() for d in store.list_partitions()]}")
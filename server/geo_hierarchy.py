@@ -0,0 +1,168 @@
+"""
+Geographic hierarchy for Neural Ads CTV Platform
+Maps US ZIP codes to 3-digit prefixes, states and Census regions, and builds
+precomputed zip -> zip3 -> state -> region rollups of avails and fill
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# USPS 3-digit ZIP prefix ranges (inclusive) -> state / territory code
+ZIP3_STATE_RANGES = [
+    (5, 5, 'NY'), (6, 7, 'PR'), (8, 8, 'VI'), (9, 9, 'PR'),
+    (10, 27, 'MA'), (28, 29, 'RI'), (30, 38, 'NH'), (39, 49, 'ME'),
+    (50, 59, 'VT'), (60, 69, 'CT'), (70, 89, 'NJ'), (90, 99, 'AE'),
+    (100, 149, 'NY'), (150, 196, 'PA'), (197, 199, 'DE'), (200, 200, 'DC'),
+    (201, 201, 'VA'), (202, 205, 'DC'), (206, 219, 'MD'), (220, 246, 'VA'),
+    (247, 268, 'WV'), (270, 289, 'NC'), (290, 299, 'SC'), (300, 319, 'GA'),
+    (320, 339, 'FL'), (340, 340, 'AA'), (341, 349, 'FL'), (350, 369, 'AL'),
+    (370, 385, 'TN'), (386, 397, 'MS'), (398, 399, 'GA'), (400, 427, 'KY'),
+    (430, 459, 'OH'), (460, 479, 'IN'), (480, 499, 'MI'), (500, 528, 'IA'),
+    (530, 549, 'WI'), (550, 567, 'MN'), (569, 569, 'DC'), (570, 577, 'SD'),
+    (580, 588, 'ND'), (590, 599, 'MT'), (600, 629, 'IL'), (630, 658, 'MO'),
+    (660, 679, 'KS'), (680, 693, 'NE'), (700, 715, 'LA'), (716, 729, 'AR'),
+    (730, 732, 'OK'), (733, 733, 'TX'), (734, 749, 'OK'), (750, 799, 'TX'),
+    (800, 816, 'CO'), (820, 831, 'WY'), (832, 838, 'ID'), (840, 847, 'UT'),
+    (850, 865, 'AZ'), (870, 884, 'NM'), (885, 885, 'TX'), (889, 898, 'NV'),
+    (900, 961, 'CA'), (962, 966, 'AP'), (967, 968, 'HI'), (969, 969, 'GU'),
+    (970, 979, 'OR'), (980, 994, 'WA'), (995, 999, 'AK'),
+]
+
+STATE_NAMES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'Washington DC',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan',
+    'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana',
+    'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey',
+    'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota',
+    'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania',
+    'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota', 'TN': 'Tennessee',
+    'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington',
+    'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+    'PR': 'Puerto Rico', 'VI': 'US Virgin Islands', 'GU': 'Guam',
+    'AA': 'Armed Forces Americas', 'AE': 'Armed Forces Europe', 'AP': 'Armed Forces Pacific',
+}
+
+# US Census Bureau regions
+STATE_REGIONS = {
+    **{code: 'Northeast' for code in ['CT', 'ME', 'MA', 'NH', 'RI', 'VT', 'NJ', 'NY', 'PA']},
+    **{code: 'Midwest' for code in ['IL', 'IN', 'MI', 'OH', 'WI', 'IA', 'KS', 'MN', 'MO', 'NE', 'ND', 'SD']},
+    **{code: 'South' for code in ['DE', 'DC', 'FL', 'GA', 'MD', 'NC', 'SC', 'VA', 'WV',
+                                  'AL', 'KY', 'MS', 'TN', 'AR', 'LA', 'OK', 'TX']},
+    **{code: 'West' for code in ['AZ', 'CO', 'ID', 'MT', 'NV', 'NM', 'UT', 'WY', 'AK', 'CA', 'HI', 'OR', 'WA']},
+    **{code: 'Territories' for code in ['PR', 'VI', 'GU']},
+    **{code: 'Military' for code in ['AA', 'AE', 'AP']},
+}
+
+GEO_LEVELS = ('zip3', 'state', 'region')
+
+_RANGE_STARTS = np.array([start for start, _, _ in ZIP3_STATE_RANGES])
+_RANGE_ENDS = np.array([end for _, end, _ in ZIP3_STATE_RANGES])
+_RANGE_STATES = np.array([state for _, _, state in ZIP3_STATE_RANGES])
+
+
+def zip3_to_state(prefixes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ZIP prefix -> state code
+
+    Args:
+        prefixes: Integer array of 3-digit ZIP prefixes
+
+    Returns:
+        Array of state codes, '' where the prefix is unassigned
+    """
+    prefixes = np.asarray(prefixes)
+    slots = np.searchsorted(_RANGE_STARTS, prefixes, side='right') - 1
+    valid = (slots >= 0) & (prefixes <= _RANGE_ENDS[np.clip(slots, 0, None)])
+    return np.where(valid, _RANGE_STATES[np.clip(slots, 0, None)], '')
+
+
+class GeoRollups:
+    """
+    Precomputed avails / fill totals per ZIP prefix, state and region
+
+    Built once per data snapshot from the targeting index's zip slice with
+    np.bincount, then served from dict lookups.
+    """
+
+    def __init__(self, rollups: Dict[str, Dict[str, Dict[str, Any]]]):
+        self.rollups = rollups
+        # Accept state names as well as codes, case-insensitively
+        self._aliases = {}
+        for level, areas in rollups.items():
+            for area in areas:
+                self._aliases.setdefault(area.lower(), (level, area))
+        for code, name in STATE_NAMES.items():
+            if code in rollups.get('state', {}):
+                self._aliases[name.lower()] = ('state', code)
+
+    @classmethod
+    def build(cls, zip_values: np.ndarray, avails: np.ndarray, request_count: np.ndarray,
+              fill_rate: np.ndarray, has_fill: np.ndarray) -> 'GeoRollups':
+        """
+        Aggregate aligned zip arrays up the hierarchy
+
+        Args:
+            zip_values: ZIP strings (non-US / metro keys are skipped)
+            avails: Avails per zip
+            request_count: Requests per zip
+            fill_rate: Fill rate per zip (NaN where unknown)
+            has_fill: Whether the zip has fill data
+        """
+        zip_values = pd.Series(zip_values, dtype=object)
+        is_us_zip = zip_values.str.fullmatch(r'\d{5}').fillna(False).to_numpy()
+
+        zip3 = zip_values[is_us_zip].str[:3].to_numpy(dtype=str)
+        states = zip3_to_state(zip3.astype(np.int64)) if len(zip3) else np.array([], dtype=str)
+        regions = pd.Series(states, dtype=object).map(STATE_REGIONS).fillna('').to_numpy(dtype=object)
+
+        avails = avails[is_us_zip].astype(np.float64)
+        requests = np.where(has_fill[is_us_zip], request_count[is_us_zip], 0).astype(np.float64)
+        filled = np.nan_to_num(fill_rate[is_us_zip]) * requests
+
+        rollups = {}
+        for level, labels in (('zip3', zip3), ('state', states), ('region', regions)):
+            mask = labels != ''
+            names, codes = np.unique(labels[mask].astype(str), return_inverse=True)
+            size = len(names)
+            level_avails = np.bincount(codes, weights=avails[mask], minlength=size)
+            level_requests = np.bincount(codes, weights=requests[mask], minlength=size)
+            level_filled = np.bincount(codes, weights=filled[mask], minlength=size)
+            zip_counts = np.bincount(codes, minlength=size)
+
+            names = [str(name) for name in names]
+            rollups[level] = {
+                name: {
+                    'level': level,
+                    'area': name,
+                    'name': STATE_NAMES.get(name, name) if level == 'state' else name,
+                    'zip_count': int(zip_counts[i]),
+                    'avails': int(level_avails[i]),
+                    'request_count': int(level_requests[i]),
+                    'fill_rate': float(level_filled[i] / level_requests[i]) if level_requests[i] > 0 else None,
+                }
+                for i, name in enumerate(names)
+            }
+
+        return cls(rollups)
+
+    def get(self, area: str, level: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Rollup for one area
+
+        Args:
+            area: ZIP prefix ('902'), state code or name ('CA', 'California') or region ('West')
+            level: Restrict the match to 'zip3', 'state' or 'region'
+        """
+        alias = self._aliases.get(str(area).strip().lower())
+        if alias is None or (level is not None and alias[0] != level):
+            return None
+        return self.rollups[alias[0]][alias[1]]
+
+    def list(self, level: str) -> List[Dict[str, Any]]:
+        """All rollups for a level, largest avails first"""
+        return sorted(self.rollups.get(level, {}).values(), key=lambda r: r['avails'], reverse=True)
@@ -0,0 +1,176 @@
+"""
+Lexical Index for Advertiser Search
+In-memory BM25 inverted index over advertiser brand, domain and category,
+so exact name lookups ("nike.com", "Toyota") are answered without running
+the sentence transformer, and general queries can blend keyword matches
+into the semantic ranking
+"""
+
+import re
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Queries of at most this many words, all of them whole brand/domain words
+# that are not also category words, are name lookups
+NAME_QUERY_MAX_TOKENS = 3
+# Domain suffixes carry no signal (every advertiser has one)
+IGNORED_TERMS = frozenset({'com', 'net', 'org', 'co', 'io', 'www'})
+
+_WORD = re.compile(r"[a-z0-9]+")
+_WORD_PARTS = re.compile(r"[a-z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens, plus the letter/digit runs of mixed words
+
+    "Nike456.com" -> ['nike456', 'nike', '456']
+    """
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in IGNORED_TERMS:
+            continue
+        tokens.append(word)
+        parts = _WORD_PARTS.findall(word)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    BM25 over brand + domain + category, with exact brand/domain lookups
+
+    Built in one pass from the advertiser records; postings are numpy arrays
+    so a query is a handful of vectorized adds and one argpartition.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        """
+        Build the index
+
+        Args:
+            records: Dicts with advertiser_id, brand, domain, category and avg_cpm
+        """
+        self.ids = [record['advertiser_id'] for record in records]
+        self._category = np.array([record.get('category') for record in records], dtype=object)
+        self._domain = np.array([record.get('domain') for record in records], dtype=object)
+        self._brand = np.array([record.get('brand') for record in records], dtype=object)
+        self._avg_cpm = np.array([record.get('avg_cpm', 0.0) for record in records], dtype=np.float64)
+
+        postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        name_words: Set[str] = set()
+        category_terms: Set[str] = set()
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        lengths = np.zeros(len(records), dtype=np.float64)
+
+        for doc, record in enumerate(records):
+            name_text = f"{record.get('brand', '')} {record.get('domain', '')}"
+            category_tokens = tokenize(record.get('category', ''))
+            tokens = tokenize(name_text) + category_tokens
+            name_words.update(_WORD.findall(name_text.lower()))
+            category_terms.update(category_tokens)
+            lengths[doc] = len(tokens)
+            for token in tokens:
+                postings[token][doc] = postings[token].get(doc, 0) + 1
+            for name in {str(record.get('brand', '')).lower(), str(record.get('domain', '')).lower()}:
+                if name:
+                    self._exact[name].append(doc)
+
+        # Whole brand/domain words only: letter runs like "travel" in "Travel896"
+        # and category words are descriptive, so they still go to the vector search
+        self._name_terms = name_words - category_terms - IGNORED_TERMS
+
+        average_length = lengths.mean() if len(records) else 0.0
+        n_docs = len(records)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, doc_counts in postings.items():
+            docs = np.fromiter(doc_counts.keys(), dtype=np.int64, count=len(doc_counts))
+            tf = np.fromiter(doc_counts.values(), dtype=np.float64, count=len(doc_counts))
+            idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / average_length)
+            # Per-posting BM25 weight, precomputed so queries only sum
+            self._postings[term] = (docs, idf * tf * (BM25_K1 + 1) / (tf + norm))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def is_name_query(self, query: str) -> bool:
+        """
+        Whether the query names an indexed advertiser rather than describing one
+
+        True for an exact brand or domain, or for a few words that are all
+        whole brand/domain words outside the category vocabulary.
+        """
+        text = query.strip().lower()
+        if not text:
+            return False
+        if text in self._exact:
+            return True
+        tokens = [token for token in _WORD.findall(text) if token not in IGNORED_TERMS]
+        return 0 < len(tokens) <= NAME_QUERY_MAX_TOKENS and all(token in self._name_terms for token in tokens)
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Rows passing search_advertisers-style filters (None when unfiltered)"""
+        if not filters:
+            return None
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, value in filters.items():
+            if key == 'category':
+                mask &= self._category == value
+            elif key == 'domain':
+                mask &= self._domain == value
+            elif key == 'brand':
+                mask &= self._brand == value
+            elif key == 'min_cpm_range':
+                mask &= self._avg_cpm >= value
+            elif key == 'max_cpm_range':
+                mask &= self._avg_cpm <= value
+        return mask
+
+    def search(self, query: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Best lexical matches
+
+        Args:
+            query: Free text, a brand or a domain
+            limit: Maximum number of hits
+            filters: Same filter keys as AdvertiserVectorDB.search_advertisers
+
+        Returns:
+            (advertiser_id, score) pairs, best first; exact brand/domain matches lead
+        """
+        if not self.ids or limit <= 0:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        for token in tokenize(query):
+            posting = self._postings.get(token)
+            if posting is not None:
+                docs, weights = posting
+                scores[docs] += weights
+
+        exact = self._exact.get(query.strip().lower())
+        if exact:
+            scores[exact] += scores.max() + 1.0
+
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            scores[~mask] = 0.0
+
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        # Highest score first, index order on ties
+        matched = matched[np.lexsort((matched, -scores[matched]))]
+        return [(self.ids[doc], float(scores[doc])) for doc in matched]
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Query
 import shutil
 import csv
 from pathlib import Path
@@ -13,8 +13,17 @@ from models.campaign import CampaignSpec, CampaignPlan
 from agents.multi_agent_orchestrator import MultiAgentOrchestrator
 from agents.conversational_agent import ConversationalAgent
 from pydantic import BaseModel
+from typing import Optional
 from openai import AsyncOpenAI
 from vector_api import setup_vector_routes
+from resources import get_advertiser_prefs_db
+from data_loader import (
+    get_real_data_loader,
+    initialize_real_data,
+    reload_real_data_in_background,
+    RealDataSnapshotWatcher,
+)
+import asyncio
 import os
 
 # Create FastAPI app
@@ -31,7 +40,13 @@ app.add_middleware(
 
 # Initialize Multi-Agent Orchestrator and Conversational Agent
 orchestrator = MultiAgentOrchestrator()
-conversational_agent = ConversationalAgent()
+conversational_agent = ConversationalAgent(orchestrator=orchestrator)
+
+# Optional hot reload of real fill/avails data (seconds between checks, 0 = off)
+real_data_watch_interval = float(os.getenv("REAL_DATA_WATCH_INTERVAL", "0"))
+real_data_watcher = RealDataSnapshotWatcher(interval_seconds=real_data_watch_interval or 60.0)
+if real_data_watch_interval > 0:
+    real_data_watcher.start()
 
 # Mount static files for exports
 exports_dir = os.path.join(os.path.dirname(__file__), "data", "exports")
@@ -134,7 +149,7 @@ async def prefs_endpoint(adv_id: str):
 async def advertisers_endpoint():
     """List all available advertisers from real data."""
     try:
-        from mcp.advertiser_preferences import advertiser_prefs_db
+        advertiser_prefs_db = get_advertiser_prefs_db()
         advertisers = await advertiser_prefs_db.get_advertiser_preferences()
         
         # Return a summary of advertisers
@@ -160,7 +175,7 @@ async def advertisers_endpoint():
 async def advertiser_detail_endpoint(advertiser_id: str):
     """Get detailed advertiser preferences from real data."""
     try:
-        from mcp.advertiser_preferences import advertiser_prefs_db
+        advertiser_prefs_db = get_advertiser_prefs_db()
         advertisers = await advertiser_prefs_db.get_advertiser_preferences(advertiser_id=advertiser_id)
         
         if not advertisers:
@@ -438,6 +453,97 @@ async def upload_audience_csv(audience_file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload audience file: {str(e)}")
 
+@app.get("/data/status")
+async def real_data_status():
+    """Summary of the active real data snapshot."""
+    try:
+        return get_real_data_loader().get_data_summary()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading data status: {str(e)}")
+
+@app.get("/targeting/options")
+async def targeting_options(
+    targeting_type: Optional[str] = Query(default=None, alias="type"),
+    prefix: str = Query(default=""),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = Query(default=None)
+):
+    """Prefix search over targeting values with cursor pagination (counts only when no type is given)."""
+    try:
+        loader = get_real_data_loader()
+        counts = loader.get_targeting_option_counts()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading targeting options: {str(e)}")
+    
+    if targeting_type is None:
+        return {"counts": counts}
+    if targeting_type not in counts:
+        raise HTTPException(status_code=404, detail=f"Unknown targeting type: {targeting_type}")
+    
+    try:
+        offset = int(cursor) if cursor else 0
+        if offset < 0:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    page = loader.search_targeting_options(targeting_type, prefix, limit, offset)
+    return {
+        "type": targeting_type,
+        "prefix": prefix,
+        "options": page["values"],
+        "total_matches": page["total_matches"],
+        "total_count": counts[targeting_type],
+        "next_cursor": str(page["next_offset"]) if page["next_offset"] is not None else None
+    }
+
+@app.get("/data/geo")
+async def list_geo_rollups(level: str = "state"):
+    """List avails and fill rolled up to zip3, state or region."""
+    if level not in ("zip3", "state", "region"):
+        raise HTTPException(status_code=400, detail="level must be one of: zip3, state, region")
+    try:
+        rollups = get_real_data_loader().list_geo_rollups(level)
+        return {"level": level, "total_count": len(rollups), "rollups": rollups}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading geo rollups: {str(e)}")
+
+@app.get("/data/geo/{area}")
+async def geo_rollup(area: str, level: str = None):
+    """Avails and request-weighted fill for a state, region or ZIP prefix."""
+    try:
+        rollup = get_real_data_loader().get_geo_rollup(area, level)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading geo rollup: {str(e)}")
+    
+    if rollup is None:
+        raise HTTPException(status_code=404, detail=f"No geo data for area: {area}")
+    return rollup
+
+@app.post("/data/reload")
+async def reload_real_data(wait: bool = False):
+    """Load a fresh real data snapshot and swap it in without a restart."""
+    try:
+        previous_version = get_real_data_loader().snapshot_version
+        
+        if not wait:
+            reload_real_data_in_background()
+            return {
+                "message": "Real data reload started",
+                "previous_version": previous_version,
+                "status": "reloading"
+            }
+        
+        success = await asyncio.to_thread(initialize_real_data)
+        return {
+            "message": "Real data reloaded" if success else "Reload failed, previous snapshot kept",
+            "previous_version": previous_version,
+            "current_version": get_real_data_loader().snapshot_version,
+            "status": "success" if success else "error"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading real data: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
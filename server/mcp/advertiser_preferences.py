@@ -46,20 +46,20 @@ class AdvertiserPreferencesDB:
         try:
             # Try to load real data from parquet file
             from pathlib import Path
-            import pandas as pd
+            from advertiser_dataset import get_advertiser_dataset
             
             parquet_path = Path(__file__).parent / ".." / "data" / "real_data" / "resp.parquet"
+            dataset = get_advertiser_dataset(parquet_path)
             
-            if parquet_path.exists():
+            if dataset is not None:
                 print(f"📊 Loading advertiser data from {parquet_path}")
-                df = pd.read_parquet(parquet_path)
                 
-                # Get unique advertisers with their data
-                unique_advertisers = df.groupby('adomain').agg({
+                # Get unique advertisers with their data (reads only these columns)
+                unique_advertisers = dataset.aggregate_by_advertiser({
                     'total_packets': 'sum',
                     'avg_cpm': 'mean',
                     'median_cpm': 'mean'
-                }).reset_index()
+                })
                 
                 # Sort by total packets/activity and take top advertisers for better performance
                 unique_advertisers = unique_advertisers.sort_values('total_packets', ascending=False).head(1000)
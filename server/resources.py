@@ -0,0 +1,171 @@
+"""
+Shared Resources for Neural Ads CTV Platform
+Process-wide registry of expensive handles (LLM client, data loader, advertiser
+databases) so agents and endpoints share one instance instead of each building
+their own
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_DATABASE_FILE = "advertiser_vector_database_full.json"
+
+
+class ResourceRegistry:
+    """
+    Lazily created, process-wide singletons keyed by name
+
+    Each resource is built by its registered factory on first use and then
+    handed out to every caller. Factories may fetch other resources.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._resources: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """
+        Register how to build a resource
+
+        Args:
+            name: Resource name
+            factory: Zero-argument callable returning the instance
+        """
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        """Shared instance for name, building it on first use"""
+        try:
+            return self._resources[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._resources:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown resource: {name}")
+                self._resources[name] = self._factories[name]()
+                self.logger.info(f"🔗 Created shared resource: {name}")
+            return self._resources[name]
+
+    def override(self, name: str, instance: Any):
+        """Replace a resource with an explicit instance (e.g. a stub client)"""
+        with self._lock:
+            self._resources[name] = instance
+
+    def reset(self, name: Optional[str] = None):
+        """Drop one (or every) built resource so the next get() rebuilds it"""
+        with self._lock:
+            if name is None:
+                self._resources.clear()
+            else:
+                self._resources.pop(name, None)
+
+    def created(self) -> List[str]:
+        """Names of the resources built so far"""
+        return sorted(self._resources)
+
+
+registry = ResourceRegistry()
+
+
+def _create_llm_client():
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY", "your_api_key_here"))
+
+
+def _load_fallback_advertiser_db() -> List[Dict]:
+    """Load advertiser_vector_database_full.json from server/ or the repo root"""
+    server_dir = Path(__file__).parent
+    candidates = [server_dir / FALLBACK_DATABASE_FILE, server_dir.parent / FALLBACK_DATABASE_FILE]
+
+    for db_path in candidates:
+        if not db_path.exists():
+            continue
+        try:
+            with open(db_path, 'r') as f:
+                data = json.load(f)
+            logger.info(f"✅ Loaded fallback advertiser database with {len(data)} advertisers")
+            return data
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load fallback database {db_path}: {e}")
+            return []
+
+    logger.warning(f"⚠️ Fallback database {FALLBACK_DATABASE_FILE} not found")
+    return []
+
+
+def _create_advertiser_prefs_db():
+    from mcp.advertiser_preferences import advertiser_prefs_db
+
+    return advertiser_prefs_db
+
+
+def _create_vector_db():
+    from vector_db import advertiser_vector_db
+
+    return advertiser_vector_db
+
+
+def _create_preferences_agent():
+    from agents.real_data_advertiser_preferences import RealDataAdvertiserPreferencesAgent
+
+    return RealDataAdvertiserPreferencesAgent()
+
+
+registry.register('llm_client', _create_llm_client)
+registry.register('fallback_advertiser_db', _load_fallback_advertiser_db)
+registry.register('advertiser_prefs_db', _create_advertiser_prefs_db)
+registry.register('vector_db', _create_vector_db)
+registry.register('preferences_agent', _create_preferences_agent)
+
+
+def get_llm_client():
+    """Shared AsyncOpenAI client (connection pool reused by every agent)"""
+    return registry.get('llm_client')
+
+
+def get_fallback_advertiser_db() -> List[Dict]:
+    """Shared fallback advertiser records from the JSON vector database export"""
+    return registry.get('fallback_advertiser_db')
+
+
+def get_data_loader():
+    """
+    Current real data snapshot
+
+    Not cached here: the loader is swapped atomically on reload, so callers
+    always go through data_loader's snapshot accessor.
+    """
+    from data_loader import get_real_data_loader
+
+    return get_real_data_loader()
+
+
+def get_advertiser_prefs_db():
+    """Shared MCP advertiser preferences database"""
+    return registry.get('advertiser_prefs_db')
+
+
+def get_vector_db():
+    """Shared advertiser vector database (Chroma or NumPy backend)"""
+    return registry.get('vector_db')
+
+
+def get_preferences_agent():
+    """Shared real data advertiser preferences agent (stateless between requests)"""
+    return registry.get('preferences_agent')
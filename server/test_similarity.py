@@ -118,7 +118,7 @@ def test_semantic_search():
                 print(f"   Found {search_data['total_found']} results in {search_data['query_time_ms']:.1f}ms:")
                 
                 for i, adv in enumerate(search_data['advertisers']):
-                    print(f"   {i+1}. {adv['brand']} ({adv['category']}) - Relevance: {adv['similarity_score']:.3f}")
+                    print(f"   {i+1}. {adv['brand']} ({adv['category']}) - Relevance: {adv['relevance_score']:.4f} ({adv['match_type']})")
                     print(f"      CPM: ${adv['avg_cpm']:.2f} | Activity: {adv['activity_score']:.1f}")
             else:
                 print(f"   ❌ Error: {search_response.text}")
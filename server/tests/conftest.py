@@ -0,0 +1,55 @@
+"""Shared fixtures for the server unit tests"""
+
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Server modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakeEncoder:
+    """Deterministic stand-in for SentenceTransformer: a unit vector seeded by the text"""
+
+    def __init__(self, dimension: int = 32):
+        self.dimension = dimension
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            rng = np.random.default_rng(int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16))
+            vector = rng.normal(size=self.dimension)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors, dtype=np.float32)
+
+
+def make_advertiser(index: int, brand: str = None, category: str = 'Retail',
+                    total_packets: int = None, activity_score: float = None):
+    """Advertiser record in the layout produced by AdvertiserVectorDB._process_advertiser_data"""
+    brand = brand or f"Brand{index}"
+    total_packets = 1000 * (index + 1) if total_packets is None else total_packets
+    advertiser = {
+        'advertiser_id': f"real_{brand.lower()}_com",
+        'domain': f"{brand.lower()}.com",
+        'brand': brand,
+        'category': category,
+        'total_packets': total_packets,
+        'avg_cpm': 5.0 + index,
+        'median_cpm': 5.0 + index,
+        'max_cpm': 10.0 + index,
+        'min_cpm': 1.0,
+        'geographic_data': {'top_zip_codes': [{'zip': '10001', 'activity': 3}], 'geographic_reach': 1},
+        'activity_score': min(100.0, total_packets / 100) if activity_score is None else activity_score,
+    }
+    advertiser['searchable_text'] = f"{brand} {advertiser['domain']} {category} advertiser"
+    return advertiser
+
+
+@pytest.fixture
+def fake_encoder():
+    return FakeEncoder()
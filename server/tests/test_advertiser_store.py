@@ -0,0 +1,130 @@
+"""AdvertiserRecordStore: typed records, projections and keyset pagination"""
+
+import pytest
+
+from advertiser_store import AdvertiserRecordStore, RECORD_FIELDS
+from conftest import make_advertiser
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AdvertiserRecordStore(tmp_path / "records.sqlite3")
+    yield store
+    store.close()
+
+
+def _fill(store, advertisers):
+    store.upsert(advertisers, [f"hash{i}" for i in range(len(advertisers))])
+
+
+def _walk(store, page_size, **kwargs):
+    """Every record reached by following page keys"""
+    seen, after = [], None
+    while True:
+        records, after = store.page(page_size, after=after, **kwargs)
+        seen.extend(records)
+        if after is None:
+            return seen
+
+
+def test_round_trip_and_projection(store):
+    advertiser = make_advertiser(3)
+    _fill(store, [advertiser])
+
+    assert store.get(advertiser['advertiser_id']) == advertiser
+    assert list(store.get(advertiser['advertiser_id'])) == list(RECORD_FIELDS)
+    assert store.get(advertiser['advertiser_id'], fields=['brand']) == {
+        'advertiser_id': advertiser['advertiser_id'], 'brand': advertiser['brand']
+    }
+    assert store.get('missing') is None
+
+
+def test_unknown_fields_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.get('any', fields=['brand', 'not_a_field'])
+
+
+def test_get_many_keeps_request_order_and_skips_missing(store):
+    advertisers = [make_advertiser(i) for i in range(5)]
+    _fill(store, advertisers)
+    ids = [advertisers[4]['advertiser_id'], 'missing', advertisers[0]['advertiser_id']]
+
+    assert [r['advertiser_id'] for r in store.get_many(ids, fields=['brand'])] == [ids[0], ids[2]]
+
+
+def test_upsert_replaces_and_delete_removes(store):
+    advertiser = make_advertiser(1)
+    _fill(store, [advertiser])
+    store.upsert([dict(advertiser, brand='Renamed')], ['newhash'])
+
+    assert store.count() == 1
+    assert store.get(advertiser['advertiser_id'])['brand'] == 'Renamed'
+    assert store.content_hashes() == {advertiser['advertiser_id']: 'newhash'}
+
+    store.delete([advertiser['advertiser_id']])
+    assert store.count() == 0
+
+
+@pytest.mark.parametrize('sort_by', ['total_packets', 'activity_score'])
+@pytest.mark.parametrize('page_size', [1, 3, 7, 50])
+def test_keyset_walk_with_ties_is_complete_and_ordered(store, sort_by, page_size):
+    # Only three distinct sort values, so most page boundaries fall inside a tie
+    advertisers = [
+        make_advertiser(i, total_packets=1000 * (i % 3), activity_score=float(i % 3)) for i in range(20)
+    ]
+    _fill(store, advertisers)
+
+    walked = [r['advertiser_id'] for r in _walk(store, page_size, sort_by=sort_by, fields=['brand'])]
+    expected = sorted(advertisers, key=lambda a: (a[sort_by], a['advertiser_id']), reverse=True)
+
+    assert walked == [a['advertiser_id'] for a in expected]
+
+
+def test_keyset_walk_within_a_category(store):
+    advertisers = [
+        make_advertiser(i, category=('Retail', 'Travel')[i % 2], total_packets=500 * (i % 4)) for i in range(25)
+    ]
+    _fill(store, advertisers)
+
+    walked = _walk(store, 4, category='Travel')
+    expected = sorted(
+        (a for a in advertisers if a['category'] == 'Travel'),
+        key=lambda a: (a['total_packets'], a['advertiser_id']), reverse=True
+    )
+
+    assert [r['advertiser_id'] for r in walked] == [a['advertiser_id'] for a in expected]
+
+
+def test_page_reports_no_key_on_the_last_page(store):
+    _fill(store, [make_advertiser(i) for i in range(4)])
+
+    assert store.page(4)[1] is None
+    assert store.page(3)[1] is not None
+    assert store.page(2, offset=2)[1] is None
+
+
+def test_page_rejects_unknown_sort(store):
+    with pytest.raises(ValueError):
+        store.page(10, sort_by='avg_cpm')
+
+
+def test_top_by_activity(store):
+    advertisers = [make_advertiser(i, category=('Retail', 'Travel')[i % 2]) for i in range(10)]
+    _fill(store, advertisers)
+
+    top = store.top_by_activity('Retail', 2, fields=['activity_score'])
+    assert [r['advertiser_id'] for r in top] == [advertisers[8]['advertiser_id'], advertisers[6]['advertiser_id']]
+
+
+def test_generation_and_published_stats_are_shared(tmp_path):
+    writer = AdvertiserRecordStore(tmp_path / "records.sqlite3")
+    reader = AdvertiserRecordStore(tmp_path / "records.sqlite3")
+
+    assert reader.generation() == 0
+    assert reader.published_stats() == (0, None)
+
+    assert writer.bump_generation({'total_advertisers': 3}) == 1
+    assert reader.generation() == 1
+    assert reader.published_stats() == (1, {'total_advertisers': 3})
+    writer.close()
+    reader.close()
@@ -0,0 +1,109 @@
+"""EmbeddingBatcher: batching, deduplication, error propagation and shutdown"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from embedding_service import EmbeddingBatcher
+
+
+class RecordingEncoder:
+    """Encodes each text as [len(text)], recording the batches it was given"""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def __call__(self, texts):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(list(texts))
+        return np.array([[float(len(text))] for text in texts])
+
+
+def test_encode_returns_one_row_per_text():
+    batcher = EmbeddingBatcher(RecordingEncoder(), max_wait_ms=1)
+    try:
+        vectors = batcher.encode(['a', 'bbb', 'cc'])
+    finally:
+        batcher.shutdown()
+
+    assert vectors.dtype == np.float32
+    assert vectors[:, 0].tolist() == [1.0, 3.0, 2.0]
+
+
+def test_queued_texts_share_a_batch_and_duplicates_encode_once():
+    encoder = RecordingEncoder()
+    # A generous wait so the four submissions land in one batch
+    batcher = EmbeddingBatcher(encoder, max_batch_size=8, max_wait_ms=500, workers=1)
+    try:
+        futures = [batcher.submit(text) for text in ['x', 'yy', 'x', 'zzz']]
+        results = [future.result(5) for future in futures]
+    finally:
+        batcher.shutdown()
+
+    assert [r[0] for r in results] == [1.0, 2.0, 1.0, 3.0]
+    assert encoder.batches == [['x', 'yy', 'zzz']]
+    assert batcher.stats()['largest_batch'] == 4
+
+
+def test_batches_respect_max_batch_size():
+    gate = threading.Event()
+    encoder = RecordingEncoder(gate)
+    batcher = EmbeddingBatcher(encoder, max_batch_size=2, max_wait_ms=1, workers=1)
+    try:
+        futures = [batcher.submit(str(i)) for i in range(5)]
+        gate.set()
+        for future in futures:
+            future.result(5)
+    finally:
+        batcher.shutdown()
+
+    assert max(len(batch) for batch in encoder.batches) <= 2
+    assert batcher.stats()['texts'] == 5
+
+
+def test_encoder_errors_reach_every_caller_in_the_batch():
+    def failing(texts):
+        raise RuntimeError("model unavailable")
+
+    batcher = EmbeddingBatcher(failing, max_wait_ms=1)
+    try:
+        futures = [batcher.submit(text) for text in ['a', 'b']]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model unavailable"):
+                future.result(5)
+        # The dispatcher survives a failed batch
+        batcher.encoder = RecordingEncoder()
+        assert batcher.encode(['ok'])[0, 0] == 2.0
+    finally:
+        batcher.shutdown()
+
+
+def test_shutdown_flushes_queued_work_then_rejects_new_texts():
+    gate = threading.Event()
+    batcher = EmbeddingBatcher(RecordingEncoder(gate), max_wait_ms=1)
+    futures = [batcher.submit(text) for text in ['a', 'bb']]
+    gate.set()
+    batcher.shutdown()
+
+    assert [future.result(5)[0] for future in futures] == [1.0, 2.0]
+    with pytest.raises(RuntimeError):
+        batcher.submit('late')
+    batcher.shutdown()  # idempotent
+
+
+def test_encode_async():
+    batcher = EmbeddingBatcher(RecordingEncoder(), max_wait_ms=1)
+
+    async def encode_both():
+        return await asyncio.wait_for(asyncio.gather(batcher.encode_async('abc'), batcher.encode_async('de')), 5)
+
+    try:
+        vectors = asyncio.run(encode_both())
+    finally:
+        batcher.shutdown()
+
+    assert [v[0] for v in vectors] == [3.0, 2.0]
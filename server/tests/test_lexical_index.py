@@ -0,0 +1,80 @@
+"""LexicalIndex: tokenization, name-query detection and BM25 ranking"""
+
+import pytest
+
+from lexical_index import LexicalIndex, tokenize
+
+
+def _record(advertiser_id, brand, domain, category, avg_cpm=10.0):
+    return {'advertiser_id': advertiser_id, 'brand': brand, 'domain': domain,
+            'category': category, 'avg_cpm': avg_cpm}
+
+
+@pytest.fixture
+def index():
+    return LexicalIndex([
+        _record('toyota', 'Toyota', 'toyota.com', 'Automotive', 20.0),
+        _record('toyota77', 'Toyota77', 'toyota77.com', 'Automotive', 5.0),
+        _record('travel896', 'Travel896', 'travel896.com', 'Travel'),
+        _record('nike', 'Nike', 'nike.com', 'Retail'),
+        _record('bank12', 'Bank12', 'bank12.com', 'Finance'),
+    ])
+
+
+def test_tokenize_splits_mixed_words_and_drops_domain_suffixes():
+    assert tokenize("Nike456.com") == ['nike456', 'nike', '456']
+    assert tokenize("www.Example.co") == ['example']
+
+
+@pytest.mark.parametrize('query', ['nike.com', 'Toyota', 'TOYOTA77', 'toyota77.com', 'nike toyota'])
+def test_names_are_name_queries(index, query):
+    assert index.is_name_query(query)
+
+
+@pytest.mark.parametrize('query', [
+    'travel',                     # category word (and only a letter run of Travel896)
+    'bank',                       # letter run of Bank12, not a whole brand word
+    'automotive',                 # category word
+    'unknownbrand.com',           # not indexed
+    'nike running shoes',         # descriptive words mixed in
+    'toyota nike bank12 travel896',  # too many words for a name
+    '',
+])
+def test_descriptions_are_not_name_queries(index, query):
+    assert not index.is_name_query(query)
+
+
+def test_exact_name_ranks_first(index):
+    hits = index.search('Toyota', limit=5)
+
+    assert [advertiser_id for advertiser_id, _ in hits] == ['toyota', 'toyota77']
+    assert hits[0][1] > hits[1][1]
+
+
+def test_more_matching_terms_rank_higher(index):
+    hits = dict(index.search('toyota automotive', limit=5))
+
+    # Both Toyotas match brand and category; the others match nothing
+    assert set(hits) == {'toyota', 'toyota77'}
+    assert hits['toyota'] > dict(index.search('automotive', limit=5))['toyota']
+
+
+def test_limit_and_no_match(index):
+    assert len(index.search('toyota', limit=1)) == 1
+    assert index.search('zzz', limit=5) == []
+    assert index.search('toyota', limit=0) == []
+
+
+def test_filters_apply_to_lexical_hits(index):
+    assert index.search('toyota', limit=5, filters={'category': 'Retail'}) == []
+    assert [i for i, _ in index.search('toyota', limit=5, filters={'min_cpm_range': 10})] == ['toyota']
+    assert [i for i, _ in index.search('toyota', limit=5, filters={'max_cpm_range': 10})] == ['toyota77']
+    assert [i for i, _ in index.search('toyota', limit=5, filters={'brand': 'Toyota77'})] == ['toyota77']
+
+
+def test_empty_index():
+    index = LexicalIndex([])
+
+    assert len(index) == 0
+    assert index.search('anything') == []
+    assert not index.is_name_query('anything')
@@ -0,0 +1,134 @@
+"""NumpyVectorBackend: exact search, quantized storage, filters and persistence"""
+
+import numpy as np
+import pytest
+
+from vector_backends import NumpyVectorBackend, VectorBackend, dequantize, quantize
+
+DIMENSION = 32
+
+
+def _vectors(count, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _populate(backend, count=200):
+    vectors = _vectors(count)
+    backend.upsert(
+        ids=[f"adv{i}" for i in range(count)],
+        documents=[f"doc {i}" for i in range(count)],
+        metadatas=[{'category': ('Retail', 'Travel', 'Finance')[i % 3], 'avg_cpm': float(i % 50)}
+                   for i in range(count)],
+        embeddings=vectors.tolist()
+    )
+    return vectors
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        VectorBackend()
+
+
+@pytest.mark.parametrize('precision, tolerance', [('float32', 0), ('float16', 1e-3), ('int8', 1e-2)])
+def test_quantize_round_trip(precision, tolerance):
+    vectors = _vectors(20)
+    codes, scales = quantize(vectors, precision)
+
+    assert codes.dtype == np.dtype(precision)
+    assert (scales is not None) == (precision == 'int8')
+    assert np.abs(dequantize(codes, scales) - vectors).max() <= tolerance
+
+
+def test_float32_query_is_exact(tmp_path):
+    backend = NumpyVectorBackend(tmp_path)
+    vectors = _populate(backend)
+    query = _vectors(1, seed=1)
+
+    result = backend.query(query.tolist(), n_results=10, include=['distances'])
+    exact = np.argsort(2 - 2 * vectors @ query[0])[:10]
+
+    assert result['ids'][0] == [f"adv{i}" for i in exact]
+    assert np.allclose(result['distances'][0], (2 - 2 * vectors @ query[0])[exact], atol=1e-5)
+
+
+@pytest.mark.parametrize('precision', ['float16', 'int8'])
+def test_rescored_quantized_search_matches_float32(tmp_path, precision):
+    exact = NumpyVectorBackend(tmp_path / "exact")
+    quantized = NumpyVectorBackend(tmp_path / precision, precision=precision, rescore=True)
+    _populate(exact, 1000)
+    _populate(quantized, 1000)
+    queries = _vectors(20, seed=2).tolist()
+
+    expected = exact.query(queries, n_results=10, include=['distances'])
+    got = quantized.query(queries, n_results=10, include=['distances'])
+
+    assert got['ids'] == expected['ids']
+    assert np.allclose(got['distances'], expected['distances'], atol=1e-5)
+
+
+def test_precision_change_reencodes_on_load(tmp_path):
+    backend = NumpyVectorBackend(tmp_path)
+    _populate(backend)
+    backend.persist()
+    query = _vectors(1, seed=3).tolist()
+    expected = backend.query(query, n_results=5, include=[])['ids']
+
+    reopened = NumpyVectorBackend(tmp_path, precision='int8')
+    assert reopened.count() == 200
+    assert reopened.query(query, n_results=5, include=[])['ids'] == expected
+
+
+def test_where_filters(tmp_path):
+    backend = NumpyVectorBackend(tmp_path)
+    _populate(backend, 30)
+    query = _vectors(1, seed=4).tolist()
+
+    def ids(where):
+        return set(backend.get(where=where, include=[])['ids'])
+
+    assert ids({'category': 'Travel'}) == {f"adv{i}" for i in range(1, 30, 3)}
+    assert ids({'avg_cpm': {'$gte': 25}}) == {f"adv{i}" for i in range(25, 30)}
+    assert ids({'$and': [{'category': 'Retail'}, {'avg_cpm': {'$lt': 10}}]}) == {'adv0', 'adv3', 'adv6', 'adv9'}
+    assert ids({'$or': [{'category': {'$in': ['Finance']}}, {'avg_cpm': {'$lte': 0}}]}) == (
+        {f"adv{i}" for i in range(2, 30, 3)} | {'adv0'}
+    )
+    assert ids({'category': {'$nin': ['Retail', 'Travel']}}) == ids({'category': 'Finance'})
+    hits = backend.query(query, n_results=50, where={'category': {'$ne': 'Retail'}}, include=['metadatas'])
+    assert len(hits['ids'][0]) == 20
+    assert all(m['category'] != 'Retail' for m in hits['metadatas'][0])
+    with pytest.raises(ValueError):
+        ids({'avg_cpm': {'$regex': '.*'}})
+
+
+def test_filters_follow_upserts_and_deletes(tmp_path):
+    backend = NumpyVectorBackend(tmp_path)
+    _populate(backend, 30)
+    backend.get(where={'category': 'Retail'}, include=[])  # build the filter columns
+
+    backend.upsert(['adv0', 'new'], ['d', 'd'],
+                   [{'category': 'Travel', 'avg_cpm': 99.0}, {'category': 'Retail', 'avg_cpm': 98.0, 'tier': 'a'}],
+                   _vectors(2, seed=5).tolist())
+    backend.delete(['adv3'])
+
+    assert set(backend.get(where={'avg_cpm': {'$gt': 90}}, include=[])['ids']) == {'adv0', 'new'}
+    assert backend.get(where={'tier': 'a'}, include=[])['ids'] == ['new']
+    retail = set(backend.get(where={'category': 'Retail'}, include=[])['ids'])
+    assert 'adv0' not in retail and 'adv3' not in retail and 'new' in retail
+
+
+def test_writes_persist_and_other_instances_refresh(tmp_path):
+    writer = NumpyVectorBackend(tmp_path)
+    _populate(writer, 10)
+    reader = NumpyVectorBackend(tmp_path)
+    assert reader.count() == 0  # nothing persisted yet
+
+    writer.persist()
+    reader.refresh()
+    assert reader.count() == 10
+
+    writer.delete(['adv1'])
+    writer.persist()
+    reader.refresh()
+    assert reader.count() == 9
+    assert reader.get(ids=['adv1'], include=[])['ids'] == []
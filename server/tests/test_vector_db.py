@@ -0,0 +1,164 @@
+"""AdvertiserVectorDB: upgrade backfill, listing cursors, hybrid search and worker sync"""
+
+import json
+
+import chromadb
+import numpy as np
+import pytest
+
+import vector_db
+from conftest import make_advertiser
+
+
+def test_initialize_backfills_record_store_from_legacy_metadata(tmp_path, monkeypatch, fake_encoder):
+    # A collection as written before the record store existed: full records in metadata
+    advertisers = [make_advertiser(i) for i in range(5)]
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    collection = client.get_or_create_collection(name="advertisers")
+    collection.add(
+        ids=[adv['advertiser_id'] for adv in advertisers],
+        documents=[adv['searchable_text'] for adv in advertisers],
+        metadatas=[
+            {'domain': adv['domain'], 'brand': adv['brand'], 'category': adv['category'],
+             'avg_cpm': adv['avg_cpm'], 'total_packets': adv['total_packets'],
+             'activity_score': adv['activity_score'], 'full_data': json.dumps(adv)}
+            for adv in advertisers
+        ],
+        embeddings=fake_encoder.encode([adv['searchable_text'] for adv in advertisers]).tolist()
+    )
+    del collection, client
+
+    monkeypatch.setattr(vector_db, 'SentenceTransformer', lambda name: fake_encoder)
+    db = vector_db.AdvertiserVectorDB(db_path=str(tmp_path), backend='chroma')
+    db.initialize()
+
+    assert db.records.count() == 5
+    assert db.get_advertiser_by_id(advertisers[2]['advertiser_id']) == advertisers[2]
+    results = db.search_advertisers("Retail advertiser", limit=5)
+    assert {adv['advertiser_id'] for adv in results} == {adv['advertiser_id'] for adv in advertisers}
+    listed = db.get_advertisers_page(limit=10)['advertisers']
+    assert [adv['advertiser_id'] for adv in listed] == [adv['advertiser_id'] for adv in advertisers[::-1]]
+    assert len(db.find_similar_advertisers(advertisers[0]['advertiser_id'], limit=3)) == 3
+
+
+@pytest.fixture
+def open_db(tmp_path, monkeypatch, fake_encoder):
+    """Factory for AdvertiserVectorDB instances (numpy backend) over one shared directory"""
+    monkeypatch.setattr(vector_db, 'SentenceTransformer', lambda name: fake_encoder)
+    opened = []
+
+    def open_db():
+        db = vector_db.AdvertiserVectorDB(db_path=str(tmp_path), backend='numpy')
+        db.initialize()
+        opened.append(db)
+        return db
+
+    yield open_db
+    for db in opened:
+        db.embedder.shutdown()
+
+
+def _catalog():
+    brands = ['Toyota', 'Nike', 'Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Vandelay']
+    categories = ['Automotive', 'Retail', 'Retail', 'Finance', 'Finance', 'Healthcare', 'Entertainment', 'Retail']
+    return [make_advertiser(i, brand=brand, category=category, total_packets=1000 * (i % 3))
+            for i, (brand, category) in enumerate(zip(brands, categories))]
+
+
+def test_cursor_walk_and_mismatch_rejection(open_db):
+    db = open_db()
+    advertisers = _catalog()
+    db._store_advertisers_in_vector_db(advertisers)
+
+    walked, cursor = [], None
+    while True:
+        page = db.get_advertisers_page(limit=3, cursor=cursor, fields=['brand'])
+        walked.extend(adv['advertiser_id'] for adv in page['advertisers'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    expected = sorted(advertisers, key=lambda a: (a['total_packets'], a['advertiser_id']), reverse=True)
+    assert walked == [a['advertiser_id'] for a in expected]
+
+    cursor = db.get_advertisers_page(limit=3)['next_cursor']
+    with pytest.raises(ValueError):
+        db.get_advertisers_page(limit=3, cursor=cursor, sort_by='activity_score')
+    with pytest.raises(ValueError):
+        db.get_advertisers_page(limit=3, cursor=cursor, category='Retail')
+    with pytest.raises(ValueError):
+        db.get_advertisers_page(limit=3, cursor='not-a-cursor!')
+
+
+def test_name_lookup_skips_the_encoder(open_db, fake_encoder):
+    db = open_db()
+    db._store_advertisers_in_vector_db(_catalog())
+    calls = fake_encoder.calls
+
+    results = db.search_advertisers('nike.com', limit=3)
+
+    assert fake_encoder.calls == calls
+    assert results[0]['brand'] == 'Nike'
+    assert results[0]['match_type'] == 'lexical'
+    assert results[0]['similarity_score'] is None
+
+
+def test_name_query_without_lexical_match_falls_back_to_semantic(open_db):
+    db = open_db()
+    db._store_advertisers_in_vector_db(_catalog())
+
+    unknown = db.search_advertisers('unknownbrandxyz.com', limit=3)
+    filtered_out = db.search_advertisers('Toyota', limit=3, filters={'category': 'Retail'})
+
+    assert len(unknown) == 3 and {adv['match_type'] for adv in unknown} == {'semantic'}
+    assert filtered_out and all(adv['category'] == 'Retail' for adv in filtered_out)
+
+
+def test_hybrid_ranking_fuses_both_lists(open_db):
+    db = open_db()
+    db._store_advertisers_in_vector_db(_catalog())
+
+    results = db.search_advertisers('retail brands', limit=8)
+
+    by_id = {adv['advertiser_id']: adv for adv in results}
+    retail = [adv for adv in results if adv['category'] == 'Retail']
+    assert len(retail) == 3 and all(adv['match_type'] in ('lexical', 'hybrid') for adv in retail)
+    # Ranked by the fused score, and every hit carries a vector similarity
+    assert [adv['relevance_score'] for adv in results] == sorted(
+        (adv['relevance_score'] for adv in results), reverse=True
+    )
+    assert all(isinstance(adv['similarity_score'], float) for adv in by_id.values())
+
+
+def test_reciprocal_rank_fusion(open_db):
+    db = open_db()
+    advertisers = _catalog()
+    db._store_advertisers_in_vector_db(advertisers)
+    a, b, c = (adv['advertiser_id'] for adv in advertisers[:3])
+    query_embedding = db._encode_query('anything')
+
+    fused = db._fuse_hits([(a, 0.9), (b, 0.8)], [(b, 5.0), (c, 4.0)], 3, ['brand'], query_embedding)
+
+    # b is in both lists, so it outranks a (semantic #1) and c (lexical #2)
+    assert [adv['advertiser_id'] for adv in fused] == [b, a, c]
+    assert [adv['match_type'] for adv in fused] == ['hybrid', 'semantic', 'lexical']
+    assert fused[0]['relevance_score'] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[0]['similarity_score'] == 0.8
+    # The lexical-only hit gets its vector similarity from the stored embedding
+    stored = db.collection.get(ids=[c], include=['embeddings'])['embeddings'][0]
+    difference = np.asarray(query_embedding) - np.asarray(stored)
+    assert fused[2]['similarity_score'] == pytest.approx(1 - difference @ difference, abs=1e-5)
+
+
+def test_other_workers_follow_a_sync(open_db):
+    syncing, other = open_db(), open_db()
+    advertisers = _catalog()
+    syncing._store_advertisers_in_vector_db(advertisers)
+    assert other.get_stats() == syncing.get_stats()
+    before = other.search_advertisers('retail brands', limit=3)
+
+    syncing._store_advertisers_in_vector_db(advertisers[:4])
+
+    assert other.get_stats()['total_advertisers'] == 4
+    assert other.get_stats() == syncing.get_stats()
+    after = other.search_advertisers('retail brands', limit=8)
+    assert len(after) == 4 and before != after
@@ -5,17 +5,30 @@ Vector Database API endpoints for advertiser data
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
+import asyncio
 import logging
 from vector_db import advertiser_vector_db
 
 logger = logging.getLogger(__name__)
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated ?fields= value -> field list (None for all fields)"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
 class AdvertiserSearchRequest(BaseModel):
     query: str
     limit: int = 10
     category: Optional[str] = None
     min_cpm: Optional[float] = None
     max_cpm: Optional[float] = None
+    fields: Optional[List[str]] = None  # Record fields to return (all when omitted)
+
+class SimilarAdvertisersRequest(BaseModel):
+    advertiser_ids: List[str]
+    limit: int = 10
+    exclude_self: bool = True
 
 class AdvertiserSearchResponse(BaseModel):
     advertisers: List[Dict[str, Any]]
@@ -27,41 +40,96 @@ def setup_vector_routes(app: FastAPI):
     
     @app.get("/vector/advertisers")
     async def get_all_advertisers_vector(
-        limit: int = Query(default=100, le=1000),
+        limit: int = Query(default=100, ge=1, le=1000),
         offset: int = Query(default=0, ge=0),
-        category: Optional[str] = Query(default=None)
+        category: Optional[str] = Query(default=None),
+        sort_by: str = Query(default="total_packets", pattern="^(total_packets|activity_score)$"),
+        cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+        fields: Optional[str] = Query(default=None, description="Comma-separated record fields to return")
     ):
-        """Get all advertisers from vector database with pagination and filtering"""
+        """
+        Get advertisers from vector database with pagination and filtering
+        
+        Sorted by sort_by (highest first). Pass next_cursor back as cursor for
+        the next page; offset still works but costs more the deeper it goes.
+        """
         try:
             # Apply category filter if specified
             filters = {}
             if category:
                 filters['category'] = category
             
-            if filters:
-                # Use search with empty query to apply filters
-                advertisers = advertiser_vector_db.search_advertisers("", limit=limit, filters=filters)
-            else:
-                # Get all advertisers
-                advertisers = advertiser_vector_db.get_all_advertisers(limit=limit, offset=offset)
+            page = advertiser_vector_db.get_advertisers_page(
+                limit=limit,
+                cursor=cursor,
+                sort_by=sort_by,
+                category=category,
+                fields=_parse_fields(fields),
+                offset=offset
+            )
+            advertisers = page['advertisers']
             
             return {
                 "advertisers": advertisers,
                 "total_count": len(advertisers),
                 "limit": limit,
                 "offset": offset,
-                "filters": filters
+                "filters": filters,
+                "sort_by": sort_by,
+                "next_cursor": page['next_cursor']
             }
             
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Error getting advertisers: {e}")
             raise HTTPException(status_code=500, detail=f"Error retrieving advertisers: {str(e)}")
     
+    @app.post("/vector/advertisers/similar")
+    async def find_similar_advertisers_batch(request: SimilarAdvertisersRequest):
+        """Find similar advertisers for many reference advertisers in one query"""
+        if not request.advertiser_ids:
+            raise HTTPException(status_code=400, detail="advertiser_ids must not be empty")
+        if len(request.advertiser_ids) > 100:
+            raise HTTPException(status_code=400, detail="At most 100 advertiser_ids per request")
+        if not 1 <= request.limit <= 50:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+        
+        try:
+            import time
+            start_time = time.time()
+            
+            similar_by_reference = await asyncio.to_thread(
+                advertiser_vector_db.find_similar_advertisers_batch,
+                advertiser_ids=request.advertiser_ids,
+                limit=request.limit,
+                exclude_self=request.exclude_self
+            )
+            
+            query_time = (time.time() - start_time) * 1000
+            
+            return {
+                "results": similar_by_reference,
+                "not_found": [
+                    advertiser_id for advertiser_id in request.advertiser_ids
+                    if advertiser_id not in similar_by_reference
+                ],
+                "query_time_ms": query_time,
+                "exclude_self": request.exclude_self
+            }
+            
+        except Exception as e:
+            logger.error(f"Error finding similar advertisers for {request.advertiser_ids}: {e}")
+            raise HTTPException(status_code=500, detail=f"Error finding similar advertisers: {str(e)}")
+    
     @app.get("/vector/advertisers/{advertiser_id}")
-    async def get_advertiser_by_id_vector(advertiser_id: str):
+    async def get_advertiser_by_id_vector(
+        advertiser_id: str,
+        fields: Optional[str] = Query(default=None, description="Comma-separated record fields to return")
+    ):
         """Get specific advertiser by ID from vector database"""
         try:
-            advertiser = advertiser_vector_db.get_advertiser_by_id(advertiser_id)
+            advertiser = advertiser_vector_db.get_advertiser_by_id(advertiser_id, fields=_parse_fields(fields))
             if not advertiser:
                 raise HTTPException(status_code=404, detail="Advertiser not found")
             
@@ -69,6 +137,8 @@ def setup_vector_routes(app: FastAPI):
             
         except HTTPException:
             raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Error getting advertiser {advertiser_id}: {e}")
             raise HTTPException(status_code=500, detail=f"Error retrieving advertiser: {str(e)}")
@@ -89,11 +159,14 @@ def setup_vector_routes(app: FastAPI):
             if request.max_cpm:
                 filters['max_cpm_range'] = request.max_cpm
             
-            # Perform search
-            advertisers = advertiser_vector_db.search_advertisers(
+            # Encode via the shared batcher (name lookups skip it), then search off the event loop
+            await advertiser_vector_db.prepare_search_async(request.query)
+            advertisers = await asyncio.to_thread(
+                advertiser_vector_db.search_advertisers,
                 query=request.query,
                 limit=request.limit,
-                filters=filters if filters else None
+                filters=filters if filters else None,
+                fields=request.fields
             )
             
             query_time = (time.time() - start_time) * 1000  # Convert to milliseconds
@@ -104,6 +177,8 @@ def setup_vector_routes(app: FastAPI):
                 query_time_ms=query_time
             )
             
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Error searching advertisers: {e}")
             raise HTTPException(status_code=500, detail=f"Error searching advertisers: {str(e)}")
@@ -127,10 +202,12 @@ def setup_vector_routes(app: FastAPI):
             
             # Initialize if not already done
             if not advertiser_vector_db.is_initialized:
-                advertiser_vector_db.initialize()
+                await asyncio.to_thread(advertiser_vector_db.initialize)
             
             # Load parquet data
-            advertiser_vector_db.load_parquet_to_vector_db(parquet_path, force_reload=force_reload)
+            await asyncio.to_thread(
+                advertiser_vector_db.load_parquet_to_vector_db, parquet_path, force_reload=force_reload
+            )
             
             stats = advertiser_vector_db.get_stats()
             
@@ -171,7 +248,8 @@ def setup_vector_routes(app: FastAPI):
             import time
             start_time = time.time()
             
-            similar_advertisers = advertiser_vector_db.find_similar_advertisers(
+            similar_advertisers = await asyncio.to_thread(
+                advertiser_vector_db.find_similar_advertisers,
                 advertiser_id=advertiser_id,
                 limit=limit,
                 exclude_self=exclude_self
@@ -253,7 +331,9 @@ def setup_vector_routes(app: FastAPI):
             if category:
                 query += f" in {category} category"
             
-            advertisers = advertiser_vector_db.search_advertisers(
+            await advertiser_vector_db.prepare_search_async(query)
+            advertisers = await asyncio.to_thread(
+                advertiser_vector_db.search_advertisers,
                 query=query,
                 limit=limit,
                 filters=filters if filters else None
@@ -0,0 +1,561 @@
+"""
+Vector Store Backends for the Advertiser Vector Database
+AdvertiserVectorDB talks to its store through the small collection-style
+interface below (Chroma's get/query/upsert/delete result shapes), so the
+ChromaDB collection and the exact in-process NumPy store are interchangeable
+"""
+
+import os
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GET_INCLUDE = ('metadatas', 'documents')
+DEFAULT_QUERY_INCLUDE = ('metadatas', 'documents', 'distances')
+
+PRECISIONS = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+# Rows cast to float32 per matmul while scanning a reduced-precision matrix
+SCAN_BLOCK_ROWS = 8192
+# Quantized scan keeps this many candidates per requested result for float32 rescoring
+RESCORE_OVERSAMPLE = 4
+
+
+class VectorBackend(ABC):
+    """
+    Collection interface used by AdvertiserVectorDB
+
+    Results follow ChromaDB: get() returns {'ids': [...], 'metadatas': [...], ...}
+    and query() returns one list per query embedding under each key. Distances
+    are squared L2, as in Chroma's default space.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored records"""
+
+    @abstractmethod
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = DEFAULT_GET_INCLUDE) -> Dict[str, Any]:
+        """Records by ID and/or metadata filter, with the requested fields"""
+
+    @abstractmethod
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10,
+              where: Optional[Dict] = None,
+              include: Sequence[str] = DEFAULT_QUERY_INCLUDE) -> Dict[str, Any]:
+        """Nearest n_results records for each query embedding, closest first"""
+
+    @abstractmethod
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+               embeddings: List[List[float]]):
+        """Insert or replace records"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Remove records by ID"""
+
+    def persist(self):
+        """Flush pending writes (called once at the end of a sync)"""
+
+    def refresh(self):
+        """Pick up writes persisted by another process (no-op where the store is shared)"""
+
+
+class ChromaVectorBackend(VectorBackend):
+    """Pass-through to a ChromaDB collection (HNSW index, persisted by Chroma)"""
+
+    name = "chroma"
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=DEFAULT_GET_INCLUDE):
+        return self.collection.get(ids=ids, where=where, limit=limit, offset=offset, include=list(include))
+
+    def query(self, query_embeddings, n_results=10, where=None, include=DEFAULT_QUERY_INCLUDE):
+        return self.collection.query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where, include=list(include)
+        )
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+
+def quantize(vectors: np.ndarray, precision: str):
+    """
+    Compact storage for unit vectors
+
+    Args:
+        vectors: float32 matrix, one row per vector
+        precision: "float32", "float16" or "int8" (symmetric, one scale per row)
+
+    Returns:
+        (codes, scales) - scales is None unless precision is int8
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    return vectors.astype(PRECISIONS[precision]), None
+
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+    """float32 approximation of quantized rows"""
+    vectors = np.asarray(codes, dtype=np.float32)
+    return vectors * np.asarray(scales)[:, None] if scales is not None else vectors
+
+
+class NumpyVectorBackend(VectorBackend):
+    """
+    Exact search over a contiguous, L2-normalized vector matrix
+
+    At a few thousand 384-dim vectors a brute-force dot product (plus
+    argpartition for top-k) beats an HNSW query. Vectors live in
+    <directory>/vectors.npy and are memory-mapped read-only on load; ids,
+    documents and metadata sit alongside in records.json. Writes are kept in
+    memory until persist(). Metadata filters are evaluated as vectorized
+    masks over per-field columns.
+
+    With float16 or int8 precision the scan runs on the compact matrix
+    (2x / 4x smaller) and, when rescoring is on, the best candidates are
+    re-ranked against float32 copies kept in a separate memory-mapped file
+    that is only paged in for those rows.
+    """
+
+    name = "numpy"
+
+    VECTORS_FILE = "vectors.npy"
+    SCALES_FILE = "scales.npy"
+    FULL_VECTORS_FILE = "vectors.f32.npy"
+    RECORDS_FILE = "records.json"
+
+    def __init__(self, directory: Union[str, Path], precision: str = 'float32', rescore: bool = True):
+        """
+        Open (or start) a store
+
+        Args:
+            directory: Directory holding the vector files and records.json
+            precision: Stored vector precision, "float32", "float16" or "int8"
+            rescore: Re-rank quantized candidates with float32 vectors
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown vector precision '{precision}', expected one of {tuple(PRECISIONS)}")
+        self.directory = Path(directory)
+        self.precision = precision
+        self.rescore = rescore and precision != 'float32'
+        self._lock = threading.RLock()
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._full: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        # field -> (object column for equality filters, float64 column for ranges)
+        self._columns: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+        self._dirty = False
+        # records.json (inode, mtime) as last loaded or saved, to spot other writers
+        self._signature: Optional[tuple] = None
+        self._load()
+
+    # -- persistence -------------------------------------------------------
+
+    def _map(self, filename: str, rows: int) -> Optional[np.ndarray]:
+        """Memory-map a saved array if it exists and has one entry per record"""
+        path = self.directory / filename
+        if not path.exists():
+            return None
+        array = np.load(path, mmap_mode='r')
+        return array if len(array) == rows else None
+
+    def _records_signature(self) -> Optional[tuple]:
+        try:
+            stat = (self.directory / self.RECORDS_FILE).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _load(self):
+        records_path = self.directory / self.RECORDS_FILE
+        self._signature = self._records_signature()
+        self._columns = None
+        if not records_path.exists():
+            self._ids, self._documents, self._metadatas = [], [], []
+            self._codes = self._scales = self._full = None
+            self._reindex()
+            return
+
+        try:
+            with open(records_path, 'r') as f:
+                records = json.load(f)
+            rows = len(records['ids'])
+            stored_precision = records.get('precision', 'float32')
+
+            codes = self._map(self.VECTORS_FILE, rows)
+            if codes is None:
+                raise ValueError("vector and record counts differ")
+            scales = self._map(self.SCALES_FILE, rows) if stored_precision == 'int8' else None
+            if stored_precision == 'int8' and scales is None:
+                raise ValueError("missing int8 scales")
+            full = codes if stored_precision == 'float32' else self._map(self.FULL_VECTORS_FILE, rows)
+
+            self._ids = records['ids']
+            self._documents = records['documents']
+            self._metadatas = records['metadatas']
+
+            if stored_precision == self.precision and (full is not None or not self.rescore):
+                self._codes, self._scales = codes, scales
+                self._full = codes if self.precision == 'float32' else full
+            else:
+                # Precision changed (or float32 copies are missing): re-encode once
+                source = np.asarray(full) if full is not None else dequantize(codes, scales)
+                self._set_vectors(source)
+                self._dirty = True
+                logger.info(f"Re-encoding {rows} vectors from {stored_precision} to {self.precision}")
+
+            logger.info(f"Mapped {rows} {self.precision} vectors from {self.directory}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable vector store {self.directory}: {e}")
+            self._ids, self._documents, self._metadatas = [], [], []
+            self._codes = self._scales = self._full = None
+        self._reindex()
+
+    def _set_vectors(self, vectors: np.ndarray):
+        """Replace every stored row with (unit) float32 vectors"""
+        self._codes, self._scales = quantize(vectors, self.precision)
+        if self.precision == 'float32':
+            self._full = self._codes
+        else:
+            self._full = np.asarray(vectors, dtype=np.float32) if self.rescore else None
+
+    def _save(self):
+        """Write vectors and records atomically, then re-map the vectors"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+
+        arrays = {self.VECTORS_FILE: self._codes}
+        if self._scales is not None:
+            arrays[self.SCALES_FILE] = self._scales
+        if self._full is not None and self._full is not self._codes:
+            arrays[self.FULL_VECTORS_FILE] = self._full
+
+        for filename, array in arrays.items():
+            path = self.directory / filename
+            tmp_path = path.with_name(f"{path.name}.{pid}.tmp.npy")
+            np.save(tmp_path, np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+        for filename in (self.SCALES_FILE, self.FULL_VECTORS_FILE):
+            if filename not in arrays:
+                (self.directory / filename).unlink(missing_ok=True)
+
+        # Records last: their row count is what the vector files are checked against
+        records_path = self.directory / self.RECORDS_FILE
+        tmp_records = records_path.with_name(f"{records_path.name}.{pid}.tmp")
+        with open(tmp_records, 'w') as f:
+            json.dump({
+                'precision': self.precision,
+                'ids': self._ids,
+                'documents': self._documents,
+                'metadatas': self._metadatas
+            }, f)
+        os.replace(tmp_records, records_path)
+        self._signature = self._records_signature()
+
+        rows = len(self._ids)
+        self._codes = self._map(self.VECTORS_FILE, rows)
+        self._scales = self._map(self.SCALES_FILE, rows) if self._scales is not None else None
+        if self.precision == 'float32':
+            self._full = self._codes
+        elif self._full is not None:
+            self._full = self._map(self.FULL_VECTORS_FILE, rows)
+        self._dirty = False
+
+    def persist(self):
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def refresh(self):
+        """Reload the store if another process saved it since this one loaded it"""
+        with self._lock:
+            if not self._dirty and self._records_signature() != self._signature:
+                logger.info(f"Vector store {self.directory} changed on disk, reloading")
+                self._load()
+
+    def _reindex(self):
+        """Rebuild id positions"""
+        self._positions = {advertiser_id: row for row, advertiser_id in enumerate(self._ids)}
+
+    def _metadata_columns(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Filter columns per metadata field, aligned with the vector rows
+
+        Built on first use, then kept current by upsert() and delete(), so a
+        filtered query only runs numpy comparisons.
+        """
+        if self._columns is None:
+            self._columns = {}
+            self._update_columns(range(len(self._ids)))
+        return self._columns
+
+    def _update_columns(self, rows: Sequence[int]):
+        """Write the given rows' metadata into the filter columns (growing them to the row count)"""
+        size = len(self._ids)
+        for field, (objects, numbers) in self._columns.items():
+            if len(objects) < size:
+                self._columns[field] = (
+                    np.concatenate([objects, np.full(size - len(objects), None, dtype=object)]),
+                    np.concatenate([numbers, np.full(size - len(numbers), np.nan)])
+                )
+        for field in {key for row in rows for key in self._metadatas[row]} - set(self._columns):
+            self._columns[field] = (np.full(size, None, dtype=object), np.full(size, np.nan))
+
+        positions = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        for field, (objects, numbers) in self._columns.items():
+            values = [self._metadatas[row].get(field) for row in rows]
+            objects[positions] = values
+            numbers[positions] = [
+                v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values
+            ]
+
+    # -- filters -----------------------------------------------------------
+
+    def _field_mask(self, field: str, condition: Any) -> np.ndarray:
+        columns = self._metadata_columns().get(field)
+        if columns is None:
+            return np.zeros(len(self._ids), dtype=bool)
+        column, numeric = columns
+
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+
+        mask = np.ones(len(self._ids), dtype=bool)
+        for operator, value in condition.items():
+            if operator == '$eq':
+                mask &= column == value
+            elif operator == '$ne':
+                mask &= column != value
+            elif operator in ('$in', '$nin'):
+                hits = np.isin(column, list(value))
+                mask &= hits if operator == '$in' else ~hits
+            elif operator in ('$gt', '$gte', '$lt', '$lte'):
+                with np.errstate(invalid='ignore'):
+                    if operator == '$gt':
+                        mask &= numeric > value
+                    elif operator == '$gte':
+                        mask &= numeric >= value
+                    elif operator == '$lt':
+                        mask &= numeric < value
+                    else:
+                        mask &= numeric <= value
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+        return mask
+
+    def _where_mask(self, where: Optional[Dict]) -> np.ndarray:
+        """Boolean row mask for a Chroma-style where clause"""
+        mask = np.ones(len(self._ids), dtype=bool)
+        if not where:
+            return mask
+
+        for key, condition in where.items():
+            if key == '$and':
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+            elif key == '$or':
+                any_mask = np.zeros(len(self._ids), dtype=bool)
+                for clause in condition:
+                    any_mask |= self._where_mask(clause)
+                mask &= any_mask
+            else:
+                mask &= self._field_mask(key, condition)
+        return mask
+
+    # -- collection interface ------------------------------------------------
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def _embeddings(self, rows: Sequence[int]) -> np.ndarray:
+        """float32 vectors for rows (exact copies when kept, else dequantized)"""
+        if self._codes is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        rows = list(rows)
+        if self._full is not None:
+            return np.asarray(self._full[rows], dtype=np.float32)
+        scales = self._scales[rows] if self._scales is not None else None
+        return dequantize(self._codes[rows], scales)
+
+    def _rows_result(self, rows: Sequence[int], include: Sequence[str]) -> Dict[str, Any]:
+        result = {'ids': [self._ids[row] for row in rows]}
+        result['documents'] = [self._documents[row] for row in rows] if 'documents' in include else None
+        result['metadatas'] = [self._metadatas[row] for row in rows] if 'metadatas' in include else None
+        result['embeddings'] = self._embeddings(rows) if 'embeddings' in include else None
+        return result
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=DEFAULT_GET_INCLUDE):
+        with self._lock:
+            if ids is not None:
+                rows = np.array([self._positions[i] for i in ids if i in self._positions], dtype=np.int64)
+            else:
+                rows = np.arange(len(self._ids))
+            if where:
+                rows = rows[self._where_mask(where)[rows]]
+            start = offset or 0
+            stop = start + limit if limit is not None else None
+            return self._rows_result(rows[start:stop].tolist(), include)
+
+    def _similarities(self, queries: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each query to each candidate row, scanned in blocks"""
+        if self.precision == 'float32':
+            matrix = self._codes if len(candidates) == len(self._ids) else self._codes[candidates]
+            return queries @ matrix.T
+
+        similarities = np.empty((len(queries), len(candidates)), dtype=np.float32)
+        all_rows = len(candidates) == len(self._ids)
+        for start in range(0, len(candidates), SCAN_BLOCK_ROWS):
+            stop = start + SCAN_BLOCK_ROWS
+            rows = slice(start, stop) if all_rows else candidates[start:stop]
+            block = queries @ np.asarray(self._codes[rows], dtype=np.float32).T
+            if self._scales is not None:
+                block *= self._scales[rows]
+            similarities[:, start:start + block.shape[1]] = block
+        return similarities
+
+    @staticmethod
+    def _top_k(distances: np.ndarray, k: int) -> np.ndarray:
+        """Column positions of the k smallest distances per row, nearest first"""
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distances, top, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(top, order, axis=1)
+
+    def query(self, query_embeddings, n_results=10, where=None, include=DEFAULT_QUERY_INCLUDE):
+        with self._lock:
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            if queries.ndim == 1:
+                queries = queries[None, :]
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.where(norms > 0, norms, 1)
+
+            candidates = np.flatnonzero(self._where_mask(where))
+            k = min(n_results, len(candidates))
+
+            result = {key: [] for key in ('ids', 'documents', 'metadatas', 'distances', 'embeddings')}
+            if k == 0 or self._codes is None:
+                for key in result:
+                    result[key] = [[] for _ in range(len(queries))]
+                return result
+
+            # Squared L2 between unit vectors: 2 - 2 * cosine
+            distances = np.maximum(2.0 - 2.0 * self._similarities(queries, candidates), 0.0)
+
+            if self.rescore:
+                # Shortlist on the compact matrix, then rank the shortlist exactly
+                shortlist = self._top_k(distances, min(k * RESCORE_OVERSAMPLE, len(candidates)))
+                shortlist_rows = candidates[shortlist]
+                exact = np.einsum('qd,qkd->qk', queries, np.asarray(self._full[shortlist_rows], dtype=np.float32))
+                shortlist_distances = np.maximum(2.0 - 2.0 * exact, 0.0)
+                top = self._top_k(shortlist_distances, k)
+                top_rows = np.take_along_axis(shortlist_rows, top, axis=1)
+                top_distances = np.take_along_axis(shortlist_distances, top, axis=1)
+            else:
+                top = self._top_k(distances, k)
+                top_rows = candidates[top]
+                top_distances = np.take_along_axis(distances, top, axis=1)
+
+            for query_row in range(len(queries)):
+                page = self._rows_result(top_rows[query_row].tolist(), include)
+                for key in ('ids', 'documents', 'metadatas', 'embeddings'):
+                    result[key].append(page[key])
+                result['distances'].append(
+                    top_distances[query_row].astype(float).tolist() if 'distances' in include else None
+                )
+            return result
+
+    @staticmethod
+    def _grown(array: Optional[np.ndarray], rows: int, like: np.ndarray) -> np.ndarray:
+        """Writable copy of array (or an empty one shaped like like) with rows more rows"""
+        if array is None:
+            array = np.zeros((0,) + like.shape[1:], dtype=like.dtype)
+        elif not array.flags.writeable:
+            array = np.array(array)  # writable copy of the mapped file
+        if rows:
+            array = np.concatenate([array, np.zeros((rows,) + array.shape[1:], dtype=array.dtype)])
+        return array
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        with self._lock:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms > 0, norms, 1)
+            codes, scales = quantize(vectors, self.precision)
+
+            rows = []
+            for i, advertiser_id in enumerate(ids):
+                row = self._positions.get(advertiser_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._positions[advertiser_id] = row
+                    self._ids.append(advertiser_id)
+                    self._documents.append(documents[i])
+                    self._metadatas.append(metadatas[i])
+                else:
+                    self._documents[row] = documents[i]
+                    self._metadatas[row] = metadatas[i]
+                rows.append(row)
+
+            added = len(self._ids) - (len(self._codes) if self._codes is not None else 0)
+            self._codes = self._grown(self._codes, added, codes)
+            self._codes[rows] = codes
+            if scales is not None:
+                self._scales = self._grown(self._scales, added, scales)
+                self._scales[rows] = scales
+            if self.precision == 'float32':
+                self._full = self._codes
+            elif self.rescore:
+                self._full = self._grown(self._full, added, vectors)
+                self._full[rows] = vectors
+
+            if self._columns is not None:
+                self._update_columns(rows)
+            self._dirty = True
+
+    def delete(self, ids):
+        with self._lock:
+            drop = {self._positions[i] for i in ids if i in self._positions}
+            if not drop:
+                return
+            keep = [row for row in range(len(self._ids)) if row not in drop]
+            self._codes = np.array(self._codes[keep])
+            if self._scales is not None:
+                self._scales = np.array(self._scales[keep])
+            if self.precision == 'float32':
+                self._full = self._codes
+            elif self._full is not None:
+                self._full = np.array(self._full[keep])
+            self._ids = [self._ids[row] for row in keep]
+            self._documents = [self._documents[row] for row in keep]
+            self._metadatas = [self._metadatas[row] for row in keep]
+            if self._columns is not None:
+                self._columns = {
+                    field: (objects[keep], numbers[keep]) for field, (objects, numbers) in self._columns.items()
+                }
+            self._reindex()
+            self._dirty = True
@@ -1,81 +1,330 @@
 """
 Vector Database for Advertiser Data
-Converts parquet file to ChromaDB for fast similarity search and retrieval
+Converts parquet file to ChromaDB (or the exact NumPy store) for fast
+similarity search and retrieval
 """
 
 import chromadb
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Hashable
 import json
 import os
+import copy
+import asyncio
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
 from sentence_transformers import SentenceTransformer
 import logging
+from advertiser_dataset import AdvertiserResponseDataset, SUMMARY_COLUMNS
+from embedding_cache import EmbeddingCache
+from embedding_service import EmbeddingBatcher
+from advertiser_store import AdvertiserRecordStore
+from lexical_index import LexicalIndex
+from vector_backends import VectorBackend, ChromaVectorBackend, NumpyVectorBackend
 
 logger = logging.getLogger(__name__)
 
+# Most active advertisers kept in the vector DB
+MAX_ADVERTISERS = 5000
+# Top ZIP codes stored per advertiser
+TOP_ZIP_CODES = 10
+# ZIP columns summed per grouped pass (bounds the per-block advertiser x zip matrix)
+ZIP_BLOCK_COLUMNS = 1024
+# Hot search paths: query text -> embedding, and (query, filters, limit) -> results
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+SEARCH_RESULT_CACHE_SIZE = 512
+# Hybrid search: semantic/lexical candidates per requested result, and the
+# reciprocal-rank-fusion constant
+HYBRID_CANDIDATE_FACTOR = 3
+RRF_K = 60
+# Bump when the vector metadata layout changes so the next sync rewrites every record
+METADATA_VERSION = 2
+# CPM histogram used for the stats median/percentiles: one-cent buckets up to the max CPM cap
+CPM_SKETCH_BUCKET = 0.01
+CPM_SKETCH_MAX = 150.0
+# Vector store: "chroma" (persistent HNSW) or "numpy" (exact, memory-mapped matrix)
+VECTOR_BACKENDS = ('chroma', 'numpy')
+DEFAULT_VECTOR_BACKEND = os.getenv("VECTOR_DB_BACKEND", "chroma")
+# NumPy store precision ("float32", "float16" or "int8") and float32 rescoring of quantized hits
+DEFAULT_VECTOR_PRECISION = os.getenv("VECTOR_DB_PRECISION", "float32")
+DEFAULT_VECTOR_RESCORE = os.getenv("VECTOR_DB_RESCORE", "1").lower() not in ("0", "false", "no")
+
+
+class _LRUCache:
+    """Small thread-safe LRU mapping"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class _IncrementalStats:
+    """
+    Vector DB statistics maintained on upsert/delete instead of by full scans
+    
+    Keeps each record's (category, packets, CPM) contribution so updates and
+    deletes can be backed out, plus a fixed one-cent CPM histogram that gives
+    the median and percentiles in constant time regardless of record count.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self._records: Dict[str, tuple] = {}
+        self._categories: Dict[str, int] = {}
+        self._total_packets = 0
+        self._cpm_sum = 0.0
+        self._cpm_buckets = np.zeros(int(round(CPM_SKETCH_MAX / CPM_SKETCH_BUCKET)) + 1, dtype=np.int64)
+    
+    def rebuild(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Reset from a full listing of the store"""
+        with self._lock:
+            self._records.clear()
+            self._categories.clear()
+            self._total_packets = 0
+            self._cpm_sum = 0.0
+            self._cpm_buckets[:] = 0
+            for advertiser_id, metadata in zip(ids, metadatas):
+                self._add(advertiser_id, metadata or {})
+            self.ready = True
+    
+    def upsert(self, advertiser_id: str, metadata: Dict[str, Any]):
+        with self._lock:
+            self._remove(advertiser_id)
+            self._add(advertiser_id, metadata)
+    
+    def remove(self, advertiser_id: str):
+        with self._lock:
+            self._remove(advertiser_id)
+    
+    def _bucket(self, cpm: float) -> int:
+        return int(np.clip(round(cpm / CPM_SKETCH_BUCKET), 0, len(self._cpm_buckets) - 1))
+    
+    def _add(self, advertiser_id: str, metadata: Dict[str, Any]):
+        record = (
+            metadata.get('category', 'Unknown'),
+            metadata.get('total_packets', 0),
+            float(metadata.get('avg_cpm', 0))
+        )
+        category, packets, cpm = record
+        self._records[advertiser_id] = record
+        self._categories[category] = self._categories.get(category, 0) + 1
+        self._total_packets += packets
+        self._cpm_sum += cpm
+        self._cpm_buckets[self._bucket(cpm)] += 1
+    
+    def _remove(self, advertiser_id: str):
+        record = self._records.pop(advertiser_id, None)
+        if record is None:
+            return
+        category, packets, cpm = record
+        self._categories[category] -= 1
+        if self._categories[category] == 0:
+            del self._categories[category]
+        self._total_packets -= packets
+        self._cpm_sum -= cpm
+        self._cpm_buckets[self._bucket(cpm)] -= 1
+    
+    def _quantile(self, q: float, cumulative: np.ndarray) -> float:
+        """Linear-interpolated quantile (numpy's default) read off the histogram"""
+        position = q * (cumulative[-1] - 1)
+        lower, upper = int(np.floor(position)), int(np.ceil(position))
+        # Bucket holding the k-th smallest value (0-based)
+        lower_value = np.searchsorted(cumulative, lower + 1) * CPM_SKETCH_BUCKET
+        upper_value = np.searchsorted(cumulative, upper + 1) * CPM_SKETCH_BUCKET
+        return float(lower_value + (upper_value - lower_value) * (position - lower))
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current totals, category counts and CPM distribution"""
+        with self._lock:
+            count = len(self._records)
+            if not count:
+                return {'total_advertisers': 0, 'categories': {}, 'total_activity': 0,
+                        'avg_cpm': 0, 'median_cpm': 0, 'cpm_percentiles': {}}
+            
+            cumulative = np.cumsum(self._cpm_buckets)
+            percentiles = {f"p{q}": round(self._quantile(q / 100, cumulative), 2) for q in (10, 25, 50, 75, 90)}
+            return {
+                'total_advertisers': count,
+                'categories': dict(self._categories),
+                'total_activity': self._total_packets,
+                'avg_cpm': self._cpm_sum / count,
+                'median_cpm': percentiles['p50'],
+                'cpm_percentiles': percentiles
+            }
+
 class AdvertiserVectorDB:
-    """Vector database for advertiser data using ChromaDB"""
+    """Vector database for advertiser data using ChromaDB or the exact NumPy store"""
     
-    def __init__(self, db_path: str = "./chroma_db", model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, db_path: str = "./chroma_db", model_name: str = "all-MiniLM-L6-v2",
+                 backend: Optional[str] = None, precision: Optional[str] = None,
+                 rescore: Optional[bool] = None):
         """
         Initialize the vector database
         
         Args:
-            db_path: Path to store the ChromaDB database
+            db_path: Directory for the vector store (and embedding cache)
             model_name: Sentence transformer model for embeddings
+            backend: Vector store, "chroma" or "numpy" (defaults to VECTOR_DB_BACKEND)
+            precision: Stored embedding precision for the numpy backend (defaults to VECTOR_DB_PRECISION)
+            rescore: Re-rank quantized candidates with float32 vectors (defaults to VECTOR_DB_RESCORE)
         """
         self.db_path = db_path
         self.model_name = model_name
+        self.backend = (backend or DEFAULT_VECTOR_BACKEND).lower()
+        if self.backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{self.backend}', expected one of {VECTOR_BACKENDS}")
+        self.precision = (precision or DEFAULT_VECTOR_PRECISION).lower()
+        self.rescore = DEFAULT_VECTOR_RESCORE if rescore is None else rescore
+        # Embeddings by searchable_text hash, reused across re-ingests
+        self.embedding_cache = EmbeddingCache(
+            os.path.join(db_path, "embedding_cache", f"{model_name.replace('/', '_')}.npz"), model_name
+        )
         self.model = None
+        # Micro-batches query encodes from concurrent requests (created with the model)
+        self.embedder: Optional[EmbeddingBatcher] = None
         self.client = None
-        self.collection = None
+        self.collection: Optional[VectorBackend] = None
+        # Full advertiser records (SQLite); vector metadata only carries filter fields
+        self.records: Optional[AdvertiserRecordStore] = None
         self.is_initialized = False
         
+        # Bumped on every ingest and shared through the record store, so every
+        # worker process drops results cached from older generations
+        self.generation = 0
+        self._query_embeddings = _LRUCache(QUERY_EMBEDDING_CACHE_SIZE)
+        self._search_results = _LRUCache(SEARCH_RESULT_CACHE_SIZE)
+        # Category counts / activity / CPM distribution, kept current by the ingest sync
+        # (other workers read the copy the syncing process publishes to the record store)
+        self._stats = _IncrementalStats()
+        self._stats_generation = -1
+        # BM25 over brand/domain/category, rebuilt after each sync that changes records
+        self._lexical: Optional[LexicalIndex] = None
+        self._lexical_generation = -1
+        self._lexical_lock = threading.Lock()
+        
     def initialize(self):
-        """Initialize ChromaDB client and collection"""
+        """Initialize the vector store, record store and embedding model"""
         try:
-            # Initialize ChromaDB client
-            self.client = chromadb.PersistentClient(path=self.db_path)
+            self.records = AdvertiserRecordStore(os.path.join(self.db_path, "advertiser_records.sqlite3"))
+            
+            if self.backend == 'numpy':
+                self.collection = NumpyVectorBackend(
+                    os.path.join(self.db_path, "numpy_store"), precision=self.precision, rescore=self.rescore
+                )
+            else:
+                if self.precision != 'float32':
+                    logger.warning(f"Chroma stores float32 embeddings; ignoring precision '{self.precision}'")
+                # Initialize ChromaDB client
+                self.client = chromadb.PersistentClient(path=self.db_path)
+                
+                # Get or create collection
+                self.collection = ChromaVectorBackend(self.client.get_or_create_collection(
+                    name="advertisers",
+                    metadata={"description": "Advertiser data with embeddings"}
+                ))
+            
+            self._backfill_record_store()
+            self.generation = self.records.generation()
             
             # Initialize sentence transformer model
             logger.info(f"Loading sentence transformer model: {self.model_name}")
             self.model = SentenceTransformer(self.model_name)
+            self.embedder = EmbeddingBatcher(self.model.encode)
             
-            # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name="advertisers",
-                metadata={"description": "Advertiser data with embeddings"}
-            )
+            # Index whatever an earlier run stored, so the first name lookup is fast too
+            self._get_lexical_index()
             
             self.is_initialized = True
-            logger.info("Vector database initialized successfully")
+            logger.info(f"Vector database initialized successfully ({self.backend} backend)")
             
         except Exception as e:
             logger.error(f"Failed to initialize vector database: {e}")
             raise
     
+    def _backfill_record_store(self):
+        """
+        Fill the record store from vector metadata written before it existed
+        
+        Collections built by earlier versions carry each full record as a
+        full_data JSON blob; copying those over lets an upgraded server hydrate
+        search hits without re-running ingestion. The vector metadata moves to
+        the current layout on the next reload of the parquet data.
+        """
+        count = self.collection.count()
+        if count == 0 or self.records.count() == count:
+            return
+        
+        stored = set(self.records.content_hashes())
+        existing = self.collection.get(include=['metadatas'])
+        backfill, unrecoverable = [], 0
+        for advertiser_id, metadata in zip(existing['ids'], existing['metadatas'] or []):
+            if advertiser_id in stored:
+                continue
+            full_data = (metadata or {}).get('full_data')
+            if full_data is None:
+                unrecoverable += 1
+                continue
+            backfill.append(json.loads(full_data))
+        
+        if backfill:
+            self.records.upsert(backfill, [self._build_metadata(adv)['content_hash'] for adv in backfill])
+            logger.info(f"Backfilled {len(backfill)} advertiser records from vector metadata")
+        if unrecoverable:
+            logger.warning(
+                f"{unrecoverable} vectors have no stored record; reload the parquet data to restore them"
+            )
+    
     def load_parquet_to_vector_db(self, parquet_path: str, force_reload: bool = False):
         """
         Load parquet data into vector database
         
         Args:
             parquet_path: Path to the parquet file
-            force_reload: If True, reload data even if collection has data
+            force_reload: If True, re-sync even if the collection has data (only changed
+                          advertisers are re-embedded and upserted)
         """
         if not self.is_initialized:
             self.initialize()
             
-        # Check if data already loaded
-        if self.collection.count() > 0 and not force_reload:
-            logger.info(f"Vector database already contains {self.collection.count()} records")
+        # Check if data already loaded (and the record store has caught up with it)
+        count = self.collection.count()
+        if count > 0 and self.records.count() == count and not force_reload:
+            logger.info(f"Vector database already contains {count} records")
             return
             
         logger.info(f"Loading parquet data from: {parquet_path}")
         
         try:
-            # Load parquet file
-            df = pd.read_parquet(parquet_path)
+            # Load only the summary and zip columns; network_* columns aren't used here
+            dataset = AdvertiserResponseDataset(parquet_path)
+            df = dataset.read(columns=SUMMARY_COLUMNS + dataset.zip_columns)
             logger.info(f"Loaded parquet with shape: {df.shape}")
             
             # Process advertiser data
@@ -102,51 +351,48 @@ class AdvertiserVectorDB:
             List of advertiser dictionaries
         """
         # Group by advertiser domain
-        advertiser_groups = df.groupby('adomain').agg({
+        grouped = df.groupby('adomain')
+        advertiser_groups = grouped.agg({
             'total_packets': 'sum',
             'avg_cpm': 'mean',
             'median_cpm': 'mean',
             'max_cpm': 'max',
             'min_cpm': 'min'
-        }).reset_index()
+        })
+        
+        # Sort by activity (total packets) and keep the top advertisers for performance
+        # (stable, so ties keep domain order)
+        total_packets = advertiser_groups['total_packets'].to_numpy()
+        order = np.argsort(-total_packets, kind='stable')[:MAX_ADVERTISERS]
+        advertiser_groups = advertiser_groups.iloc[order]
         
-        # Get geographic data (top ZIP codes for each advertiser)
+        # Apply realistic CPM caps (typical CTV CPMs range from $1-$100), with
+        # defaults for missing values
+        avg_cpm = np.minimum(advertiser_groups['avg_cpm'].fillna(5.0).to_numpy(dtype=np.float64), 100.0)
+        median_cpm = np.minimum(advertiser_groups['median_cpm'].fillna(5.0).to_numpy(dtype=np.float64), 100.0)
+        max_cpm = np.minimum(advertiser_groups['max_cpm'].fillna(10.0).to_numpy(dtype=np.float64), 150.0)
+        min_cpm = np.maximum(advertiser_groups['min_cpm'].fillna(1.0).to_numpy(dtype=np.float64), 0.50)
+        packets = advertiser_groups['total_packets'].to_numpy()
+        activity_scores = np.minimum(100, (packets / 1000) * 10)  # Normalized activity score
+        
+        # Geographic distribution across every ZIP column
         zip_columns = [col for col in df.columns if col.startswith('zip_')]
+        geo_data = self._extract_geographic_data(grouped, zip_columns, advertiser_groups.index)
         
         advertisers = []
-        
-        for _, row in advertiser_groups.iterrows():
-            adomain = row['adomain']
-            
-            # Get geographic distribution for this advertiser
-            advertiser_df = df[df['adomain'] == adomain]
-            geo_data = self._extract_geographic_data(advertiser_df, zip_columns)
-            
-            # Create advertiser record with CPM validation
-            # Cap unrealistic CPM values to reasonable ranges
-            avg_cpm = float(row['avg_cpm']) if not pd.isna(row['avg_cpm']) else 5.0
-            median_cpm = float(row['median_cpm']) if not pd.isna(row['median_cpm']) else 5.0
-            max_cpm = float(row['max_cpm']) if not pd.isna(row['max_cpm']) else 10.0
-            min_cpm = float(row['min_cpm']) if not pd.isna(row['min_cpm']) else 1.0
-            
-            # Apply realistic CPM caps (typical CTV CPMs range from $1-$100)
-            avg_cpm = min(avg_cpm, 100.0)  # Cap at $100
-            median_cpm = min(median_cpm, 100.0)  # Cap at $100
-            max_cpm = min(max_cpm, 150.0)  # Allow slightly higher for max, but cap at $150
-            min_cpm = max(min_cpm, 0.50)  # Ensure minimum of $0.50
-            
+        for i, adomain in enumerate(advertiser_groups.index):
             advertiser = {
                 'advertiser_id': f"real_{adomain.replace('.', '_').replace('-', '_')}",
                 'domain': adomain,
                 'brand': self._extract_brand_name(adomain),
                 'category': self._categorize_advertiser(adomain),
-                'total_packets': int(row['total_packets']),
-                'avg_cpm': avg_cpm,
-                'median_cpm': median_cpm,
-                'max_cpm': max_cpm,
-                'min_cpm': min_cpm,
-                'geographic_data': geo_data,
-                'activity_score': min(100, (row['total_packets'] / 1000) * 10)  # Normalized activity score
+                'total_packets': int(packets[i]),
+                'avg_cpm': float(avg_cpm[i]),
+                'median_cpm': float(median_cpm[i]),
+                'max_cpm': float(max_cpm[i]),
+                'min_cpm': float(min_cpm[i]),
+                'geographic_data': geo_data[i],
+                'activity_score': float(activity_scores[i])
             }
             
             # Create searchable text for embeddings
@@ -154,35 +400,79 @@ class AdvertiserVectorDB:
             
             advertisers.append(advertiser)
         
-        # Sort by activity (total packets) and limit to top advertisers for performance
-        advertisers.sort(key=lambda x: x['total_packets'], reverse=True)
-        return advertisers[:5000]  # Limit to top 5000 most active advertisers
+        return advertisers
     
-    def _extract_geographic_data(self, advertiser_df: pd.DataFrame, zip_columns: List[str]) -> Dict[str, Any]:
-        """Extract geographic distribution data for an advertiser"""
-        geo_data = {'top_zip_codes': [], 'geographic_reach': 0}
+    def _extract_geographic_data(self, grouped, zip_columns: List[str], adomains: pd.Index) -> List[Dict[str, Any]]:
+        """
+        Top ZIP codes and reach for each advertiser
         
-        try:
-            # Sum up activity across ZIP codes
-            zip_sums = {}
-            for zip_col in zip_columns[:100]:  # Limit to first 100 ZIP columns for performance
-                if zip_col in advertiser_df.columns:
-                    zip_sum = advertiser_df[zip_col].sum()
-                    if zip_sum > 0:
-                        zip_code = zip_col.replace('zip_', '')
-                        zip_sums[zip_code] = zip_sum
-            
-            # Get top ZIP codes
-            if zip_sums:
-                top_zips = sorted(zip_sums.items(), key=lambda x: x[1], reverse=True)[:10]
-                geo_data['top_zip_codes'] = [{'zip': zip_code, 'activity': float(activity)} for zip_code, activity in top_zips]
-                geo_data['geographic_reach'] = len([z for z in zip_sums.values() if z > 0])
+        Sums every ZIP column per advertiser in column blocks, keeping a running
+        top-N (argpartition) and count of active ZIPs, so memory stays at one
+        block of grouped sums.
         
+        Args:
+            grouped: DataFrame grouped by adomain
+            zip_columns: zip_* columns to aggregate
+            adomains: Advertisers to report, in output order
+        """
+        n_advertisers = len(adomains)
+        top_values = np.zeros((n_advertisers, 0), dtype=np.float64)
+        top_columns = np.zeros((n_advertisers, 0), dtype=np.int64)
+        reach = np.zeros(n_advertisers, dtype=np.int64)
+        
+        try:
+            for block_start in range(0, len(zip_columns), ZIP_BLOCK_COLUMNS):
+                block = zip_columns[block_start:block_start + ZIP_BLOCK_COLUMNS]
+                sums = grouped[block].sum().reindex(adomains).to_numpy(dtype=np.float64)
+                reach += (sums > 0).sum(axis=1)
+                
+                # Merge this block's columns into the running candidates, keep top N
+                top_values = np.concatenate([top_values, sums], axis=1)
+                top_columns = np.concatenate([
+                    top_columns,
+                    np.broadcast_to(np.arange(block_start, block_start + len(block)), sums.shape)
+                ], axis=1)
+                if top_values.shape[1] > TOP_ZIP_CODES:
+                    keep = self._top_n_positions(top_values, TOP_ZIP_CODES)
+                    top_values = np.take_along_axis(top_values, keep, axis=1)
+                    top_columns = np.take_along_axis(top_columns, keep, axis=1)
         except Exception as e:
             logger.warning(f"Error processing geographic data: {e}")
+            return [{'top_zip_codes': [], 'geographic_reach': 0} for _ in range(n_advertisers)]
+        
+        # Highest activity first, earlier ZIP column on ties
+        order = np.lexsort((top_columns, -top_values), axis=1) if top_values.size else top_columns
+        top_values = np.take_along_axis(top_values, order, axis=1)
+        top_columns = np.take_along_axis(top_columns, order, axis=1)
+        zip_codes = [col.replace('zip_', '') for col in zip_columns]
         
+        geo_data = []
+        for i in range(n_advertisers):
+            active = top_values[i] > 0
+            geo_data.append({
+                'top_zip_codes': [
+                    {'zip': zip_codes[column], 'activity': float(activity)}
+                    for column, activity in zip(top_columns[i][active], top_values[i][active])
+                ],
+                'geographic_reach': int(reach[i])
+            })
         return geo_data
     
+    @staticmethod
+    def _top_n_positions(values: np.ndarray, n: int) -> np.ndarray:
+        """
+        Positions of the n largest values in each row, ties going to the earlier position
+        
+        np.partition finds each row's n-th largest value; everything above it is
+        kept and the remaining slots go to the leftmost values equal to it.
+        """
+        threshold = -np.partition(-values, n - 1, axis=1)[:, n - 1:n]
+        above = values > threshold
+        tied = values == threshold
+        slots_left = n - above.sum(axis=1, keepdims=True)
+        keep = above | (tied & (np.cumsum(tied, axis=1) <= slots_left))
+        return np.nonzero(keep)[1].reshape(len(values), n)
+    
     def _extract_brand_name(self, domain: str) -> str:
         """Extract brand name from domain"""
         # Remove common TLD extensions and clean up
@@ -236,79 +526,274 @@ class AdvertiserVectorDB:
         
         return " | ".join(text_parts)
     
+    def _build_metadata(self, adv: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Metadata stored alongside an advertiser's embedding
+        
+        Only the fields used by where-filters and stats; the full record lives
+        in the record store.
+        """
+        content = f"{METADATA_VERSION}\x00{json.dumps(adv)}"
+        return {
+            'domain': adv['domain'],
+            'brand': adv['brand'],
+            'category': adv['category'],
+            'avg_cpm': adv['avg_cpm'],
+            'total_packets': adv['total_packets'],
+            'activity_score': adv['activity_score'],
+            'geographic_reach': adv['geographic_data']['geographic_reach'],
+            # Identifies the record's content so re-ingest can skip unchanged rows
+            'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest()
+        }
+    
     def _store_advertisers_in_vector_db(self, advertisers: List[Dict[str, Any]]):
-        """Store advertisers in ChromaDB with embeddings"""
-        
-        # Clear existing data if force reload
-        if self.collection.count() > 0:
-            logger.info("Clearing existing data...")
-            # Delete all data by getting all IDs and deleting them
-            try:
-                all_data = self.collection.get()
-                if all_data['ids']:
-                    self.collection.delete(ids=all_data['ids'])
-            except Exception as e:
-                logger.warning(f"Could not clear existing data: {e}. Continuing with new data...")
+        """
+        Sync advertisers into the vector store incrementally
+        
+        Only records whose document or metadata changed are upserted, IDs that
+        disappeared are deleted, and embeddings come from the content-hash
+        cache so the encoder only runs on text it hasn't seen before.
+        """
+        # Start from whatever another worker may have synced meanwhile
+        self._sync_generation()
+        
+        # Content hashes of what is stored now (no embeddings needed to diff)
+        existing = self.collection.get(include=['metadatas'])
+        existing_hashes = {
+            advertiser_id: (metadata or {}).get('content_hash')
+            for advertiser_id, metadata in zip(existing['ids'], existing['metadatas'] or [])
+        }
+        if not self._stats.ready or self._stats_generation != self.generation:
+            self._stats.rebuild(existing['ids'], existing['metadatas'] or [])
+            self._stats_generation = self.generation
+        
+        new_ids = {adv['advertiser_id'] for adv in advertisers}
+        removed_ids = [advertiser_id for advertiser_id in existing_hashes if advertiser_id not in new_ids]
+        
+        changed = []
+        built = [(adv, self._build_metadata(adv)) for adv in advertisers]
+        for adv, metadata in built:
+            if existing_hashes.get(adv['advertiser_id']) != metadata['content_hash']:
+                changed.append((adv, metadata))
+        
+        # Upserts merge metadata in Chroma, so records carrying keys the current
+        # layout dropped (e.g. the old full_data blob) are deleted and re-added
+        metadata_keys = set(built[0][1]) if built else set()
+        changed_ids = {adv['advertiser_id'] for adv, _ in changed}
+        outdated_ids = [
+            advertiser_id for advertiser_id, metadata in zip(existing['ids'], existing['metadatas'] or [])
+            if advertiser_id in changed_ids and set(metadata or {}) - metadata_keys
+        ]
+        
+        # Record store follows the same diff against its own hashes
+        record_hashes = self.records.content_hashes()
+        stale_records = [advertiser_id for advertiser_id in record_hashes if advertiser_id not in new_ids]
+        changed_records = [
+            (adv, metadata['content_hash']) for adv, metadata in built
+            if record_hashes.get(adv['advertiser_id']) != metadata['content_hash']
+        ]
+        self.records.delete(stale_records)
+        self.records.upsert([adv for adv, _ in changed_records], [content_hash for _, content_hash in changed_records])
+        
+        logger.info(
+            f"Vector DB sync: {len(changed)} new/changed, {len(removed_ids)} removed, "
+            f"{len(advertisers) - len(changed)} unchanged"
+        )
         
         # Process in batches for memory efficiency
         batch_size = 100
-        total_advertisers = len(advertisers)
         
-        for i in range(0, total_advertisers, batch_size):
-            batch = advertisers[i:i + batch_size]
+        for i in range(0, len(removed_ids), batch_size):
+            self.collection.delete(ids=removed_ids[i:i + batch_size])
+        for advertiser_id in removed_ids:
+            self._stats.remove(advertiser_id)
+        for i in range(0, len(outdated_ids), batch_size):
+            self.collection.delete(ids=outdated_ids[i:i + batch_size])
+        
+        total_batches = (len(changed) + batch_size - 1) // batch_size
+        for i in range(0, len(changed), batch_size):
+            batch = changed[i:i + batch_size]
             
             # Prepare batch data
-            ids = [adv['advertiser_id'] for adv in batch]
-            documents = [adv['searchable_text'] for adv in batch]
-            metadatas = []
-            
-            for adv in batch:
-                metadata = {
-                    'domain': adv['domain'],
-                    'brand': adv['brand'],
-                    'category': adv['category'],
-                    'avg_cpm': adv['avg_cpm'],
-                    'total_packets': adv['total_packets'],
-                    'activity_score': adv['activity_score'],
-                    'geographic_reach': adv['geographic_data']['geographic_reach'],
-                    'full_data': json.dumps(adv)  # Store full data as JSON
-                }
-                metadatas.append(metadata)
-            
-            # Generate embeddings
-            logger.info(f"Generating embeddings for batch {i//batch_size + 1}/{(total_advertisers + batch_size - 1)//batch_size}")
-            embeddings = self.model.encode(documents).tolist()
-            
-            # Add to collection
-            self.collection.add(
+            ids = [adv['advertiser_id'] for adv, _ in batch]
+            documents = [adv['searchable_text'] for adv, _ in batch]
+            metadatas = [metadata for _, metadata in batch]
+            
+            # Cached embeddings where the text is known, encoder for the rest
+            embeddings = self.embedding_cache.encode(documents, self.model.encode)
+            
+            self.collection.upsert(
                 ids=ids,
                 documents=documents,
                 metadatas=metadatas,
-                embeddings=embeddings
+                embeddings=embeddings.tolist()
             )
             
-            logger.info(f"Stored batch {i//batch_size + 1}: {len(batch)} advertisers")
+            for advertiser_id, metadata in zip(ids, metadatas):
+                self._stats.upsert(advertiser_id, metadata)
+            
+            logger.info(f"Upserted batch {i//batch_size + 1}/{total_batches}: {len(batch)} advertisers")
+        
+        self.collection.persist()
+        
+        # Keep the cache to the current documents
+        self.embedding_cache.retain(adv['searchable_text'] for adv in advertisers)
+        self.embedding_cache.save()
+        
+        if changed or removed_ids or changed_records or stale_records:
+            self._bump_generation()
+        self._get_lexical_index()
         
-        logger.info(f"Successfully stored {total_advertisers} advertisers in vector database")
+        logger.info(f"Vector database in sync with {len(advertisers)} advertisers")
     
-    def search_advertisers(self, query: str, limit: int = 10, filters: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    def _bump_generation(self):
+        """Publish a change to every worker: new generation plus the matching stats"""
+        self.generation = self.records.bump_generation(self._stats.snapshot())
+        self._stats_generation = self.generation
+        self._search_results.clear()
+    
+    def _sync_generation(self):
+        """
+        Follow syncs run by other worker processes sharing this database
+        
+        A newer generation in the record store means another process changed
+        the advertisers: reload the vector store (the NumPy backend keeps it in
+        memory), drop cached results; the lexical index rebuilds on next use
+        and stats come from the published copy.
+        """
+        generation = self.records.generation()
+        if generation != self.generation:
+            self.collection.refresh()
+            self.generation = generation
+            self._search_results.clear()
+    
+    def _encode_query(self, query: str) -> List[float]:
+        """
+        Query embedding, served from the LRU for repeated queries
+        
+        Misses go through the embedding batcher, so concurrent searches
+        (run in worker threads by the API) share one encoder call.
+        """
+        embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            if self.embedder is None:
+                self.embedder = EmbeddingBatcher(self.model.encode)
+            embedding = self.embedder.submit(query).result().tolist()
+            self._query_embeddings.put(query, embedding)
+        return embedding
+    
+    def _get_lexical_index(self) -> LexicalIndex:
+        """Lexical index for the current generation, built from the record store when stale"""
+        with self._lexical_lock:
+            if self._lexical is None or self._lexical_generation != self.generation:
+                generation = self.generation
+                records, _ = self.records.page(
+                    max(self.records.count(), 1), fields=['brand', 'domain', 'category', 'avg_cpm']
+                )
+                self._lexical = LexicalIndex(records)
+                self._lexical_generation = generation
+                logger.info(f"Built lexical index over {len(records)} advertisers")
+            return self._lexical
+    
+    def is_name_query(self, query: str) -> bool:
+        """Whether search_advertisers() tries the lexical index alone before any vector search"""
+        if not self.is_initialized:
+            self.initialize()
+        return self._get_lexical_index().is_name_query(query)
+    
+    async def prepare_search_async(self, query: str):
         """
-        Search advertisers using semantic similarity
+        Warm the query embedding on the event loop unless the query is a name lookup
+        
+        Name lookups usually never reach the encoder, so they don't take a
+        batcher slot; one that matches nothing lexically is encoded
+        synchronously by search_advertisers().
+        """
+        if not self.is_initialized:
+            await asyncio.to_thread(self.initialize)
+        lexical_index = self._lexical
+        if lexical_index is None or self._lexical_generation != self.generation:
+            # Rebuilding after an ingest scans every record; keep it off the event loop
+            lexical_index = await asyncio.to_thread(self._get_lexical_index)
+        if not lexical_index.is_name_query(query):
+            await self.encode_query_async(query)
+    
+    async def encode_query_async(self, query: str) -> List[float]:
+        """
+        Query embedding awaited on the event loop
+        
+        Lets API handlers wait for the batcher without holding a worker
+        thread; the result lands in the query LRU, so a following
+        search_advertisers() call doesn't encode again.
+        """
+        if not self.is_initialized:
+            await asyncio.to_thread(self.initialize)
+        
+        embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            if self.embedder is None:
+                self.embedder = EmbeddingBatcher(self.model.encode)
+            embedding = (await self.embedder.encode_async(query)).tolist()
+            self._query_embeddings.put(query, embedding)
+        return embedding
+    
+    def search_advertisers(self, query: str, limit: int = 10, filters: Optional[Dict] = None,
+                           fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Search advertisers using lexical and semantic similarity
+        
+        Name-like queries ("nike.com", "Toyota") are answered by the lexical
+        index without encoding; other queries fuse BM25 and vector rankings
+        with reciprocal rank fusion. Whenever nothing matches lexically
+        (including name-like queries, e.g. an unknown domain or a brand the
+        filters exclude) the search falls back to pure semantic results.
+        Each hit carries match_type: lexical, semantic or hybrid.
         
         Args:
             query: Search query
             limit: Maximum number of results
             filters: Optional metadata filters
+            fields: Record fields to return (all when None; advertiser_id is always included)
             
         Returns:
             List of matching advertisers with similarity scores
         """
         if not self.is_initialized:
             self.initialize()
+        AdvertiserRecordStore.columns_for(fields)  # reject unknown fields before searching
+        self._sync_generation()
         
-        # Generate query embedding
-        query_embedding = self.model.encode([query]).tolist()[0]
+        cache_key = (
+            self.generation, query, tuple(sorted((filters or {}).items())), limit,
+            tuple(fields) if fields is not None else None
+        )
+        try:
+            cached = self._search_results.get(cache_key)
+        except TypeError:  # unhashable filter values - skip the result cache
+            cache_key, cached = None, None
+        if cached is not None:
+            return copy.deepcopy(cached)
         
+        lexical_index = self._get_lexical_index()
+        name_query = lexical_index.is_name_query(query)
+        lexical_hits = lexical_index.search(query, limit if name_query else limit * HYBRID_CANDIDATE_FACTOR, filters)
+        query_embedding, semantic_hits = None, []
+        if not lexical_hits or not name_query:
+            query_embedding = self._encode_query(query)
+            semantic_limit = limit * HYBRID_CANDIDATE_FACTOR if lexical_hits else limit
+            semantic_hits = self._semantic_search(query_embedding, semantic_limit, filters)
+        
+        advertisers = self._fuse_hits(semantic_hits, lexical_hits, limit, fields, query_embedding)
+        
+        if cache_key is None:
+            return advertisers
+        
+        # Callers get copies so they can't alter the cached entry
+        self._search_results.put(cache_key, advertisers)
+        return copy.deepcopy(advertisers)
+    
+    def _semantic_search(self, query_embedding: List[float], limit: int, filters: Optional[Dict]) -> List[tuple]:
+        """(advertiser_id, similarity) pairs from the vector store, best first"""
         # Prepare where clause for filters
         where_clause = {}
         if filters:
@@ -320,55 +805,144 @@ class AdvertiserVectorDB:
                 elif key == 'max_cpm_range':
                     where_clause['avg_cpm'] = {"$lte": value}
         
-        # Search in ChromaDB
+        # Search the vector store
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=limit,
-            where=where_clause if where_clause else None
+            where=where_clause if where_clause else None,
+            include=['distances']
         )
         
-        # Process results
-        advertisers = []
-        for i in range(len(results['ids'][0])):
-            advertiser_data = json.loads(results['metadatas'][0][i]['full_data'])
-            advertiser_data['similarity_score'] = 1 - results['distances'][0][i]  # Convert distance to similarity
-            advertisers.append(advertiser_data)
+        # Convert distance to similarity
+        return [
+            (advertiser_id, 1 - distance)
+            for advertiser_id, distance in zip(results['ids'][0], results['distances'][0])
+        ]
+    
+    def _fuse_hits(self, semantic_hits: List[tuple], lexical_hits: List[tuple],
+                   limit: int, fields: Optional[List[str]],
+                   query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Merge semantic and lexical rankings and hydrate the top results
+        
+        Reciprocal rank fusion sums 1 / (RRF_K + rank) over both lists, so the
+        differently scaled scores never need calibrating; the fused score is
+        returned as relevance_score. similarity_score is only ever the vector
+        similarity: lexical-only hits get theirs from the stored embedding, and
+        is None when the query was never encoded (name lookups).
+        """
+        fused: Dict[str, float] = {}
+        for hits in (semantic_hits, lexical_hits):
+            for rank, (advertiser_id, _) in enumerate(hits):
+                fused[advertiser_id] = fused.get(advertiser_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        # Stable sort: semantic order breaks ties
+        ranked = sorted(fused, key=lambda advertiser_id: -fused[advertiser_id])[:limit]
         
+        similarities = dict(semantic_hits)
+        semantic_ids = set(similarities)
+        lexical_ids = {advertiser_id for advertiser_id, _ in lexical_hits}
+        unscored = [advertiser_id for advertiser_id in ranked if advertiser_id not in semantic_ids]
+        if unscored and query_embedding is not None:
+            stored = self.collection.get(ids=unscored, include=['embeddings'])
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            for advertiser_id, embedding in zip(stored['ids'], stored['embeddings']):
+                # Same 1 - squared L2 the vector search reports
+                difference = query_vector - np.asarray(embedding, dtype=np.float32)
+                similarities[advertiser_id] = float(1 - difference @ difference)
+        
+        # Hydrate the hits from the record store
+        advertisers = self.records.get_many(ranked, fields)
+        for advertiser_data in advertisers:
+            advertiser_id = advertiser_data['advertiser_id']
+            in_semantic = advertiser_id in semantic_ids
+            in_lexical = advertiser_id in lexical_ids
+            advertiser_data['similarity_score'] = similarities.get(advertiser_id)
+            advertiser_data['relevance_score'] = fused[advertiser_id]
+            advertiser_data['match_type'] = (
+                'hybrid' if in_semantic and in_lexical else 'semantic' if in_semantic else 'lexical'
+            )
         return advertisers
     
-    def get_advertiser_by_id(self, advertiser_id: str) -> Optional[Dict[str, Any]]:
+    def get_advertiser_by_id(self, advertiser_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """Get a specific advertiser by ID"""
         if not self.is_initialized:
             self.initialize()
         
         try:
-            results = self.collection.get(ids=[advertiser_id])
-            if results['ids']:
-                return json.loads(results['metadatas'][0]['full_data'])
+            return self.records.get(advertiser_id, fields)
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error retrieving advertiser {advertiser_id}: {e}")
         
         return None
     
-    def get_all_advertisers(self, limit: int = 1000, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get all advertisers with pagination"""
+    def get_all_advertisers(self, limit: int = 1000, offset: int = 0,
+                            fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all advertisers with pagination, most active (total_packets) first"""
         if not self.is_initialized:
             self.initialize()
         
-        # ChromaDB doesn't support direct offset, so we'll use a workaround
-        # Get all results and slice them (not ideal for very large datasets)
-        results = self.collection.get(limit=limit + offset)
+        advertisers, _ = self.records.page(limit, offset=offset, fields=fields)
+        return advertisers
+    
+    @staticmethod
+    def _encode_cursor(sort_by: str, category: Optional[str], key: tuple) -> str:
+        payload = json.dumps({'s': sort_by, 'c': category, 'v': key[0], 'id': key[1]}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: str, category: Optional[str]) -> tuple:
+        """
+        Listing key from a cursor token
         
-        advertisers = []
-        start_idx = offset
-        end_idx = min(offset + limit, len(results['ids']))
+        Raises:
+            ValueError: For malformed tokens or ones issued for another sort/category
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            key = (payload['v'], payload['id'])
+            issued_for = (payload['s'], payload['c'])
+        except Exception:
+            raise ValueError("Invalid pagination cursor")
+        if issued_for != (sort_by, category):
+            raise ValueError("Pagination cursor was issued for a different sort or category")
+        return key
+    
+    def get_advertisers_page(self,
+                             limit: int = 100,
+                             cursor: Optional[str] = None,
+                             sort_by: str = 'total_packets',
+                             category: Optional[str] = None,
+                             fields: Optional[List[str]] = None,
+                             offset: int = 0) -> Dict[str, Any]:
+        """
+        Keyset-paginated advertiser listing in a stable order
         
-        for i in range(start_idx, end_idx):
-            if i < len(results['metadatas']):
-                advertiser_data = json.loads(results['metadatas'][i]['full_data'])
-                advertisers.append(advertiser_data)
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page (None for the first page)
+            sort_by: 'total_packets' or 'activity_score' (highest first)
+            category: Only advertisers in this category
+            fields: Record fields to return
+            offset: Rows to skip before the page (OFFSET cost; ignored with a cursor)
+            
+        Returns:
+            Dict with advertisers and next_cursor (None on the last page)
+        """
+        if not self.is_initialized:
+            self.initialize()
         
-        return advertisers
+        after = self._decode_cursor(cursor, sort_by, category) if cursor else None
+        advertisers, last_key = self.records.page(
+            limit, sort_by=sort_by, after=after, category=category,
+            offset=0 if after is not None else offset, fields=fields
+        )
+        return {
+            'advertisers': advertisers,
+            'next_cursor': self._encode_cursor(sort_by, category, last_key) if last_key else None
+        }
     
     def find_similar_advertisers(self, advertiser_id: str, limit: int = 10, exclude_self: bool = True) -> List[Dict[str, Any]]:
         """
@@ -382,59 +956,93 @@ class AdvertiserVectorDB:
         Returns:
             List of similar advertisers with similarity scores
         """
+        results = self.find_similar_advertisers_batch([advertiser_id], limit=limit, exclude_self=exclude_self)
+        return results.get(advertiser_id, [])
+    
+    def find_similar_advertisers_batch(self,
+                                       advertiser_ids: List[str],
+                                       limit: int = 10,
+                                       exclude_self: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Similar advertisers for many references with one get and one multi-query
+        
+        Uses the embeddings already stored for the reference advertisers, so
+        the sentence transformer is never run.
+        
+        Args:
+            advertiser_ids: IDs of the reference advertisers
+            limit: Maximum number of similar advertisers per reference
+            exclude_self: Whether to exclude each reference from its own results
+            
+        Returns:
+            Dict of reference ID -> similar advertisers (unknown IDs are omitted)
+        """
         if not self.is_initialized:
             self.initialize()
+        self._sync_generation()
+        
+        advertiser_ids = list(dict.fromkeys(advertiser_ids))
+        if not advertiser_ids:
+            return {}
         
         try:
-            # Get the reference advertiser
-            reference_advertiser = self.get_advertiser_by_id(advertiser_id)
-            if not reference_advertiser:
-                logger.error(f"Reference advertiser {advertiser_id} not found")
-                return []
-            
-            # Get the embedding for the reference advertiser
-            reference_results = self.collection.get(ids=[advertiser_id])
-            if not reference_results['ids']:
-                logger.error(f"No embedding found for advertiser {advertiser_id}")
-                return []
-            
-            # Use the document text to find similar advertisers
-            reference_text = reference_advertiser['searchable_text']
-            reference_embedding = self.model.encode([reference_text]).tolist()[0]
+            # Reference records and their stored embeddings in one round trip
+            references = self.collection.get(ids=advertiser_ids, include=['embeddings'])
+            found_ids = references['ids']
+            missing = set(advertiser_ids) - set(found_ids)
+            if missing:
+                logger.error(f"Reference advertisers not found: {sorted(missing)}")
+            if not found_ids:
+                return {}
             
             # Search for similar advertisers
             search_limit = limit + 1 if exclude_self else limit
             results = self.collection.query(
-                query_embeddings=[reference_embedding],
-                n_results=search_limit
+                query_embeddings=[list(embedding) for embedding in references['embeddings']],
+                n_results=search_limit,
+                include=['distances']
             )
             
-            # Process results
-            similar_advertisers = []
-            for i in range(len(results['ids'][0])):
-                result_id = results['ids'][0][i]
-                
-                # Skip self if requested
-                if exclude_self and result_id == advertiser_id:
+            # Hydrate every reference and hit with one record-store read
+            hit_ids = [result_id for row_ids in results['ids'] for result_id in row_ids]
+            records = {
+                record['advertiser_id']: record
+                for record in self.records.get_many(list(dict.fromkeys(list(found_ids) + hit_ids)))
+            }
+            
+            similar_by_reference = {}
+            for row, reference_id in enumerate(found_ids):
+                reference_advertiser = records.get(reference_id)
+                if reference_advertiser is None:
                     continue
                 
-                advertiser_data = json.loads(results['metadatas'][0][i]['full_data'])
-                similarity_score = 1 - results['distances'][0][i]  # Convert distance to similarity
-                advertiser_data['similarity_score'] = similarity_score
-                advertiser_data['similarity_reasons'] = self._generate_similarity_reasons(
-                    reference_advertiser, advertiser_data
-                )
+                # Process results
+                similar_advertisers = []
+                for i, result_id in enumerate(results['ids'][row]):
+                    # Skip self if requested
+                    if exclude_self and result_id == reference_id:
+                        continue
+                    if result_id not in records:
+                        continue
+                    
+                    advertiser_data = copy.deepcopy(records[result_id])
+                    advertiser_data['similarity_score'] = 1 - results['distances'][row][i]  # Convert distance to similarity
+                    advertiser_data['similarity_reasons'] = self._generate_similarity_reasons(
+                        reference_advertiser, advertiser_data
+                    )
+                    
+                    similar_advertisers.append(advertiser_data)
+                    
+                    if len(similar_advertisers) >= limit:
+                        break
                 
-                similar_advertisers.append(advertiser_data)
-                
-                if len(similar_advertisers) >= limit:
-                    break
+                similar_by_reference[reference_id] = similar_advertisers
             
-            return similar_advertisers
+            return similar_by_reference
             
         except Exception as e:
-            logger.error(f"Error finding similar advertisers for {advertiser_id}: {e}")
-            return []
+            logger.error(f"Error finding similar advertisers for {advertiser_ids}: {e}")
+            return {}
     
     def _generate_similarity_reasons(self, reference: Dict[str, Any], similar: Dict[str, Any]) -> List[str]:
         """Generate human-readable reasons why two advertisers are similar"""
@@ -496,52 +1104,37 @@ class AdvertiserVectorDB:
             self.initialize()
         
         try:
-            # Search for advertisers in the specific category
-            results = self.collection.get(
-                where={"category": category},
-                limit=limit
-            )
-            
-            advertisers = []
-            for i, metadata in enumerate(results['metadatas']):
-                advertiser_data = json.loads(metadata['full_data'])
-                advertisers.append(advertiser_data)
-            
-            # Sort by activity score (highest first)
-            advertisers.sort(key=lambda x: x.get('activity_score', 0), reverse=True)
-            
-            return advertisers[:limit]
+            # Highest activity score first, straight from the record store's category index
+            return self.records.top_by_activity(category, limit)
             
         except Exception as e:
             logger.error(f"Error getting category recommendations for {category}: {e}")
             return []
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get database statistics"""
+        """
+        Get database statistics
+        
+        Served from the incrementally maintained totals in the process that
+        ran the sync, and from the copy it published to the record store in
+        other workers; the vector store is only scanned when no stats have been
+        published for the current generation.
+        """
         if not self.is_initialized:
             self.initialize()
+        self._sync_generation()
         
-        total_count = self.collection.count()
-        
-        # Get category distribution
-        results = self.collection.get()
-        categories = {}
-        total_packets = 0
-        cpm_values = []
+        if self._stats.ready and self._stats_generation == self.generation:
+            return self._stats.snapshot()
         
-        for metadata in results['metadatas']:
-            category = metadata.get('category', 'Unknown')
-            categories[category] = categories.get(category, 0) + 1
-            total_packets += metadata.get('total_packets', 0)
-            cpm_values.append(metadata.get('avg_cpm', 0))
+        generation, stats = self.records.published_stats()
+        if stats is not None and generation == self.generation:
+            return stats
         
-        return {
-            'total_advertisers': total_count,
-            'categories': categories,
-            'total_activity': total_packets,
-            'avg_cpm': np.mean(cpm_values) if cpm_values else 0,
-            'median_cpm': np.median(cpm_values) if cpm_values else 0
-        }
+        results = self.collection.get(include=['metadatas'])
+        self._stats.rebuild(results['ids'], results['metadatas'] or [])
+        self._stats_generation = self.generation
+        return self._stats.snapshot()
 
 # Global instance
 advertiser_vector_db = AdvertiserVectorDB()